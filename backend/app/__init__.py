@@ -13,6 +13,11 @@ def create_app(config_class=Config):
     # Initialize DB
     init_app(app)
 
+    # Load the embedding model once in the gunicorn master so workers share it
+    if app.config.get('RAG_PRELOAD_MODEL'):
+        from app.services.rag.embeddings import Embedder
+        Embedder.preload(app.config)
+
     # Initialize Swagger
     from flasgger import Swagger
     swagger_config = {
@@ -116,6 +121,12 @@ Most endpoints require a JWT token.
     def health():
         return {'status': 'healthy'}
 
+    @app.route('/health/db')
+    def health_db():
+        # Pool usage (waits, timeouts) and statement latency of this worker process
+        from app.db import Database
+        return Database.stats()
+
     @app.route('/')
     def index():
         from flask import redirect
@@ -9,12 +9,90 @@ class Config:
     DB_NAME = os.environ.get('DB_NAME', 'techmplish_ats')
     DB_USER = os.environ.get('DB_USER', 'postgres')
     DB_PASSWORD = os.environ.get('DB_PASSWORD', 'postgres_password')
+    DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))  # connections opened per process (gunicorn / resume worker)
+    DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '20'))  # per process; Postgres needs processes x this
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))  # seconds to wait for a free connection
+    DB_SLOW_QUERY_MS = int(os.environ.get('DB_SLOW_QUERY_MS', '500'))  # statements at least this slow are logged
+    DB_LOG_STATEMENTS = os.environ.get('DB_LOG_STATEMENTS', 'false').lower() == 'true'  # log every statement's latency
     
     # LLM
     LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    OLLAMA_BASE_URL = os.environ.get('OLLAMA_BASE_URL', 'http://host.docker.internal:11434')
+    OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'llama3')
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', '5'))  # seconds
+    LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT', '60'))  # seconds
+    LLM_RETRIES = int(os.environ.get('LLM_RETRIES', '2'))  # retries of a timed out / 5xx / 429 call
+    LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', '10'))  # pooled HTTP connections per provider
+    LLM_BREAKER_FAILURES = int(os.environ.get('LLM_BREAKER_FAILURES', '5'))  # failed calls in a row that open the circuit
+    LLM_BREAKER_RESET = int(os.environ.get('LLM_BREAKER_RESET', '30'))  # seconds before a trial call is let through
+    LLM_RESUME_TOKEN_BUDGET = int(os.environ.get('LLM_RESUME_TOKEN_BUDGET', '1500'))  # resume text tokens per parse prompt
+    LLM_CONTEXT_TOKENS = int(os.environ.get('LLM_CONTEXT_TOKENS', '0'))  # 0 = the provider model's context window
+    LLM_MAP_REDUCE_TOKENS = int(os.environ.get('LLM_MAP_REDUCE_TOKENS', '4000'))  # longer resumes are parsed in chunks
+    LLM_MAX_CHUNKS = int(os.environ.get('LLM_MAX_CHUNKS', '4'))
+    LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'  # llm_cache table, exact prompt match
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', str(7 * 24 * 3600)))  # seconds
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '50000'))  # least recently used beyond this are deleted
+    LLM_SEMANTIC_CACHE = os.environ.get('LLM_SEMANTIC_CACHE', 'false').lower() == 'true'  # reuse answers to similar questions
+    LLM_SEMANTIC_THRESHOLD = float(os.environ.get('LLM_SEMANTIC_THRESHOLD', '0.92'))  # cosine similarity
+    LLM_SEMANTIC_CANDIDATES = int(os.environ.get('LLM_SEMANTIC_CANDIDATES', '200'))  # cached entries compared per lookup
+    LLM_BATCH_CONCURRENCY = int(os.environ.get('LLM_BATCH_CONCURRENCY', '4'))  # parallel requests in batch parsing
+    LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', '60'))  # 0 = unlimited
+    LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', '0'))  # estimated tokens, 0 = unlimited
+    LLM_BATCH_PACK_SIZE = int(os.environ.get('LLM_BATCH_PACK_SIZE', '1'))  # short resumes per request (1 = no packing)
+    LLM_BATCH_PACK_MAX_CHARS = int(os.environ.get('LLM_BATCH_PACK_MAX_CHARS', '2500'))  # longer resumes get their own request
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '5'))  # batch parsing: further retries of a rate-limited request
+    LLM_COST_PER_1K_INPUT = float(os.environ.get('LLM_COST_PER_1K_INPUT', '0'))  # for batch cost reports
+    LLM_COST_PER_1K_OUTPUT = float(os.environ.get('LLM_COST_PER_1K_OUTPUT', '0'))
     
     # Uploads
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    BLOB_FOLDER = os.environ.get('BLOB_FOLDER', os.path.join(UPLOAD_FOLDER, 'blobs'))  # content-addressed uploads
+    BLOB_RELEASE_GRACE = int(os.environ.get('BLOB_RELEASE_GRACE', '300'))  # seconds a freshly uploaded blob is never deleted
+
+    # Resume Pipeline (resume_worker.py)
+    RESUME_JOB_TIMEOUT = int(os.environ.get('RESUME_JOB_TIMEOUT', '600'))  # seconds before a 'running' job is reclaimed
+    RESUME_JOB_MAX_ATTEMPTS = int(os.environ.get('RESUME_JOB_MAX_ATTEMPTS', '3'))
+    RESUME_PIPELINE_EMBED = os.environ.get('RESUME_PIPELINE_EMBED', 'true').lower() == 'true'
+    PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))  # processes per long PDF
+    PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', '16'))  # shorter PDFs are extracted serially
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', '0'))  # 0 = every page
+    EXTRACT_SANDBOX = os.environ.get('EXTRACT_SANDBOX', 'true').lower() == 'true'  # extract in rlimited subprocesses
+    EXTRACT_SANDBOX_WORKERS = int(os.environ.get('EXTRACT_SANDBOX_WORKERS', '2'))  # per resume worker process
+    EXTRACT_SANDBOX_MAX_TASKS = int(os.environ.get('EXTRACT_SANDBOX_MAX_TASKS', '100'))  # documents before a sandbox process is recycled
+    EXTRACT_SANDBOX_GRACE = int(os.environ.get('EXTRACT_SANDBOX_GRACE', '5'))  # seconds past a backend's timeout before the kill
+    PARSE_CACHE_ENABLED = os.environ.get('PARSE_CACHE_ENABLED', 'true').lower() == 'true'  # reuse parses of identical files
+    PARSE_CACHE_STALE_TTL = int(os.environ.get('PARSE_CACHE_STALE_TTL', str(7 * 24 * 3600)))  # purge_parse_cache.py: seconds an old version's entry must be unused
+
+    # Vector Store
+    VECTOR_STORE_PATH = os.environ.get('VECTOR_STORE_PATH', os.path.join(os.getcwd(), 'vectorstore'))
+    RAG_EMBEDDING_MODEL = os.environ.get('RAG_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    RAG_PRELOAD_MODEL = os.environ.get('RAG_PRELOAD_MODEL', 'false').lower() == 'true'  # load once in the gunicorn master
+    RAG_EMBEDDING_CACHE_DIR = os.environ.get('RAG_EMBEDDING_CACHE_DIR', os.path.join(VECTOR_STORE_PATH, 'embedding_cache'))
+    RAG_EMBEDDING_CACHE_SIZE = int(os.environ.get('RAG_EMBEDDING_CACHE_SIZE', '10000'))  # in-memory LRU entries
+    RAG_INDEX_TYPE = os.environ.get('RAG_INDEX_TYPE', 'flat')  # flat, ivfpq, hnsw
+    RAG_IVF_NLIST = int(os.environ.get('RAG_IVF_NLIST', '1024'))
+    RAG_PQ_M = int(os.environ.get('RAG_PQ_M', '48'))  # must divide the embedding dimension (384)
+    RAG_HNSW_M = int(os.environ.get('RAG_HNSW_M', '32'))
+    RAG_HNSW_EF_CONSTRUCTION = int(os.environ.get('RAG_HNSW_EF_CONSTRUCTION', '200'))
+    RAG_NPROBE = int(os.environ.get('RAG_NPROBE', '16'))  # default IVF lists probed per query
+    RAG_EF_SEARCH = int(os.environ.get('RAG_EF_SEARCH', '64'))  # default HNSW candidate list per query
+    RAG_SNAPSHOT_EVERY = int(os.environ.get('RAG_SNAPSHOT_EVERY', '1000'))  # WAL records between compacted snapshots
+    RAG_WAL_FSYNC = os.environ.get('RAG_WAL_FSYNC', 'true').lower() == 'true'
+    RAG_ENCODE_BATCH_SIZE = int(os.environ.get('RAG_ENCODE_BATCH_SIZE', '64'))
+    RAG_ASK_TOP_K = int(os.environ.get('RAG_ASK_TOP_K', '5'))
+    RAG_MAX_K = int(os.environ.get('RAG_MAX_K', '50'))  # upper bound on a /rag/ask request's k
+    RAG_RERANK = os.environ.get('RAG_RERANK', 'true').lower() == 'true'
+    RAG_RERANK_CANDIDATES = int(os.environ.get('RAG_RERANK_CANDIDATES', '20'))  # neighbours re-scored lexically
+    RAG_LEXICAL_WEIGHT = float(os.environ.get('RAG_LEXICAL_WEIGHT', '0.3'))
+
+    # Candidate Search
+    SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', '50'))
+    SEARCH_MAX_PAGE_SIZE = int(os.environ.get('SEARCH_MAX_PAGE_SIZE', '200'))  # upper bound on a request's ?limit=
+    SEARCH_CANDIDATE_POOL = int(os.environ.get('SEARCH_CANDIDATE_POOL', '200'))  # ids taken from each ranker before fusion
+    SEARCH_RRF_K = int(os.environ.get('SEARCH_RRF_K', '60'))
+
+    # Scoring
+    SCORING_SEMANTIC_WEIGHT = float(os.environ.get('SCORING_SEMANTIC_WEIGHT', '0.6'))  # rest is keyword coverage
@@ -1,84 +1,354 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
 import psycopg2
 from psycopg2 import pool
-from flask import current_app, g
+from psycopg2.extensions import cursor as _cursor
+from flask import g, has_app_context
+
+
+class PoolTimeout(pool.PoolError):
+    """No pooled connection became free within DB_POOL_TIMEOUT seconds."""
+
+
+class TimedCursor(_cursor):
+    """Cursor that reports every statement's latency to Database._record."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            Database._record(query, time.perf_counter() - start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            Database._record(query, time.perf_counter() - start)
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            Database._record(sql, time.perf_counter() - start)
+
+
+_local = threading.local()
+
+
+def _scope():
+    # The current connection lives in the app context (one per request or job) or, outside Flask, per thread
+    return g if has_app_context() else _local
+
 
 class Database:
+    """
+    psycopg2 access layer over one ThreadedConnectionPool per process.
+
+    The pool holds DB_POOL_MIN to DB_POOL_MAX connections per process, i.e.
+    per gunicorn or resume worker, so Postgres' max_connections must cover
+    processes x DB_POOL_MAX. When every connection is in use a caller waits
+    up to DB_POOL_TIMEOUT seconds for one (PoolTimeout after that) and the
+    waits are counted in stats(). A forked child (gunicorn preload_app,
+    multiprocessing) opens its own pool instead of sharing the parent's sockets.
+
+    In an app context the connection is checked out on first use and
+    returned at teardown. Outside one (scripts, bare threads), query(),
+    execute() and execute_values() check one out per call and return it
+    straight away. transaction() runs a block of statements on one
+    connection with a single commit.
+
+    Every statement is timed; those over DB_SLOW_QUERY_MS are logged, and
+    all of them with DB_LOG_STATEMENTS.
+    """
     _pool = None
+    _pid = None
+    _slots = None
+    _settings = None
+    _inherited = []
+    _lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    _stats = {}
 
     @classmethod
-    def initialize(cls):
-        if cls._pool is None:
-            import time
+    def _read_settings(cls, config=None):
+        if config is None:
+            from app.config import Config
+            config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+        return {
+            'host': config.get('DB_HOST', 'db'),
+            'port': config.get('DB_PORT', '5432'),
+            'dbname': config.get('DB_NAME', 'techmplish_ats'),
+            'user': config.get('DB_USER', 'postgres'),
+            'password': config.get('DB_PASSWORD', 'postgres_password'),
+            'min': config.get('DB_POOL_MIN', 1),
+            'max': config.get('DB_POOL_MAX', 20),
+            'timeout': config.get('DB_POOL_TIMEOUT', 10.0),
+            'slow_ms': config.get('DB_SLOW_QUERY_MS', 500),
+            'log_statements': config.get('DB_LOG_STATEMENTS', False),
+        }
+
+    @classmethod
+    def initialize(cls, config=None):
+        """Creates this process' pool from `config` (the app config), or from Config when called without an app."""
+        if cls._pool is not None and cls._pid == os.getpid():
+            return
+        with cls._lock:
+            if cls._pool is not None and cls._pid == os.getpid():
+                return
+            if cls._pool is not None:
+                # Inherited through fork: closing (or garbage collecting) these would end the parent's sessions
+                cls._inherited.append(cls._pool)
+                cls._pool = None
+            if config is not None or cls._settings is None:
+                cls._settings = cls._read_settings(config)
+            settings = cls._settings
+
             retries = 5
             while retries > 0:
                 try:
                     cls._pool = psycopg2.pool.ThreadedConnectionPool(
-                        minconn=1,
-                        maxconn=20,
-                        host=os.environ.get("DB_HOST", "db"),
-                        port=os.environ.get("DB_PORT", "5432"),
-                        dbname=os.environ.get("DB_NAME", "techmplish_ats"),
-                        user=os.environ.get("DB_USER", "postgres"),
-                        password=os.environ.get("DB_PASSWORD", "postgres_password")
+                        minconn=settings['min'],
+                        maxconn=settings['max'],
+                        host=settings['host'],
+                        port=settings['port'],
+                        dbname=settings['dbname'],
+                        user=settings['user'],
+                        password=settings['password'],
+                        cursor_factory=TimedCursor
                     )
-                    print("Database connection pool created successfully.")
+                    print(f"Database connection pool created successfully ({settings['min']}-{settings['max']} connections).")
                     break
                 except Exception as e:
                     print(f"Error creating connection pool: {e}. Retrying in 2 seconds...")
                     time.sleep(2)
                     retries -= 1
-            
+
             if cls._pool is None:
                 raise Exception("Could not connect to the database after multiple retries.")
+            cls._pid = os.getpid()
+            cls._slots = threading.BoundedSemaphore(settings['max'])
+            with cls._stats_lock:
+                cls._stats = {
+                    'checkouts': 0, 'in_use': 0, 'waits': 0, 'wait_ms': 0.0, 'max_wait_ms': 0.0, 'timeouts': 0,
+                    'statements': 0, 'statement_ms': 0.0, 'max_statement_ms': 0.0, 'slow_statements': 0
+                }
+
+    @classmethod
+    def _checkout(cls):
+        cls.initialize()
+        slots = cls._slots
+        if not slots.acquire(blocking=False):
+            # Pool exhausted: wait for a connection to come back rather than fail the request outright
+            timeout = cls._settings['timeout']
+            start = time.perf_counter()
+            acquired = slots.acquire(timeout=timeout)
+            waited = (time.perf_counter() - start) * 1000
+            with cls._stats_lock:
+                cls._stats['waits'] += 1
+                cls._stats['wait_ms'] += waited
+                cls._stats['max_wait_ms'] = max(cls._stats['max_wait_ms'], waited)
+                cls._stats['timeouts'] += int(not acquired)
+            if not acquired:
+                raise PoolTimeout(f"No database connection free after {timeout}s ({cls._settings['max']} in use)")
+            print(f"WARNING: Database pool exhausted; waited {waited:.0f} ms for a connection.")
+        try:
+            conn = cls._pool.getconn()
+        except Exception:
+            slots.release()
+            raise
+        with cls._stats_lock:
+            cls._stats['checkouts'] += 1
+            cls._stats['in_use'] += 1
+        return conn
+
+    @classmethod
+    def _checkin(cls, conn):
+        if cls._pid != os.getpid():
+            return  # checked out from a parent's pool before a fork
+        with cls._stats_lock:
+            cls._stats['in_use'] -= 1
+        try:
+            # putconn rolls back a connection left in a transaction, and drops a broken one
+            cls._pool.putconn(conn)
+        finally:
+            cls._slots.release()
 
     @classmethod
     def get_db(cls):
-        if 'db' not in g:
-            g.db = cls._pool.getconn()
-        return g.db
+        """The app context's connection (returned at teardown) or, outside one, this thread's (see close_db)."""
+        scope = _scope()
+        conn = getattr(scope, 'db', None)
+        if conn is None:
+            conn = scope.db = cls._checkout()
+        return conn
 
     @classmethod
     def close_db(cls, e=None):
-        db = g.pop('db', None)
+        db = _scope().__dict__.pop('db', None)
         if db is not None:
-            cls._pool.putconn(db)
+            cls._checkin(db)
+
+    @classmethod
+    @contextmanager
+    def connection(cls):
+        """
+        A connection for a block: the current one if the app context (or an
+        open transaction) has one, else one from the pool, returned after.
+        """
+        conn = getattr(_scope(), 'db', None)
+        if conn is not None:
+            yield conn
+        elif has_app_context():
+            yield cls.get_db()
+        else:
+            conn = cls._checkout()
+            try:
+                yield conn
+            finally:
+                cls._checkin(conn)
 
     @staticmethod
-    def query(sql, params=None, fetchone=False, fetchall=False, commit=False):
-        conn = Database.get_db()
+    def in_transaction():
+        return getattr(_scope(), 'db_transaction', 0) > 0
+
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        """
+        Unit of work: yields a cursor, and every statement in the block
+        (through it or through query()/execute()/execute_values(), which
+        don't commit inside it) is committed once at the end, or rolled back
+        if the block raises. A nested block joins the outer transaction.
+
+            with Database.transaction() as cursor:
+                cursor.execute("UPDATE ...", params)
+                Database.execute("INSERT ...", params)
+        """
+        scope = _scope()
+        depth = getattr(scope, 'db_transaction', 0)
+        owned = getattr(scope, 'db', None) is None and not has_app_context()
+        conn = cls.get_db()
+        scope.db_transaction = depth + 1
         cursor = conn.cursor()
         try:
-            cursor.execute(sql, params)
-            if commit:
-                conn.commit()
-                return cursor.lastrowid # Note: This might not work for all INSERTs in PG without RETURNING
-            
-            if fetchone:
-                return cursor.fetchone()
-            if fetchall:
-                return cursor.fetchall()
-        except Exception as e:
-            conn.rollback()
-            raise e
+            yield cursor
+            if depth == 0:
+                cls._commit(conn)
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            raise
         finally:
             cursor.close()
+            scope.db_transaction = depth
+            if owned:
+                cls.close_db()
+
+    @staticmethod
+    def _commit(conn):
+        start = time.perf_counter()
+        conn.commit()
+        Database._record('COMMIT', time.perf_counter() - start)
+
+    @classmethod
+    def _record(cls, statement, seconds):
+        ms = seconds * 1000
+        settings = cls._settings or {}
+        slow = ms >= settings.get('slow_ms', 500)
+        with cls._stats_lock:
+            if cls._stats:
+                cls._stats['statements'] += 1
+                cls._stats['statement_ms'] += ms
+                cls._stats['max_statement_ms'] = max(cls._stats['max_statement_ms'], ms)
+                cls._stats['slow_statements'] += int(slow)
+        if slow or settings.get('log_statements'):
+            if isinstance(statement, bytes):
+                statement = statement.decode('utf-8', 'replace')
+            label = ' '.join(str(statement).split())[:200]
+            print(f"{'WARNING: Slow query' if slow else 'DEBUG: Query'} ({ms:.1f} ms): {label}")
+
+    @classmethod
+    def stats(cls):
+        """Pool usage and statement latency in this process."""
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        if not stats:
+            return {'initialized': False}
+        settings = cls._settings
+        stats.update(initialized=True, pool_min=settings['min'], pool_max=settings['max'])
+        stats['avg_statement_ms'] = round(stats['statement_ms'] / stats['statements'], 2) if stats['statements'] else 0.0
+        stats['avg_wait_ms'] = round(stats['wait_ms'] / stats['waits'], 1) if stats['waits'] else 0.0
+        for key in ('statement_ms', 'max_statement_ms', 'wait_ms', 'max_wait_ms'):
+            stats[key] = round(stats[key], 1)
+        return stats
+
+    @staticmethod
+    def query(sql, params=None, fetchone=False, fetchall=False, commit=False):
+        with Database.connection() as conn:
+            in_transaction = Database.in_transaction()
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                # With commit, fetchone/fetchall return e.g. the rows of an INSERT ... RETURNING
+                if fetchone:
+                    result = cursor.fetchone()
+                elif fetchall:
+                    result = cursor.fetchall()
+                elif commit:
+                    result = cursor.lastrowid # Note: This might not work for all INSERTs in PG without RETURNING
+                else:
+                    result = None
+                if commit and not in_transaction:
+                    Database._commit(conn)
+                return result
+            except Exception as e:
+                if not in_transaction:
+                    conn.rollback()
+                raise e
+            finally:
+                cursor.close()
 
     @staticmethod
     def execute(sql, params=None):
-        """Executes a query and returns the cursor for further processing if needed, or just commits."""
-        conn = Database.get_db()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(sql, params)
-            conn.commit()
-            return cursor
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
+        """Executes a statement and commits (at the end of the block inside transaction()). Returns the closed cursor."""
+        with Database.connection() as conn:
+            in_transaction = Database.in_transaction()
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                if not in_transaction:
+                    Database._commit(conn)
+                return cursor
+            except Exception as e:
+                if not in_transaction:
+                    conn.rollback()
+                raise e
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def execute_values(sql, rows, template=None, page_size=1000):
+        """Runs a multi-row `VALUES %s` statement over all rows and commits once."""
+        from psycopg2.extras import execute_values
+        with Database.connection() as conn:
+            in_transaction = Database.in_transaction()
+            cursor = conn.cursor()
+            try:
+                execute_values(cursor, sql, rows, template=template, page_size=page_size)
+                if not in_transaction:
+                    Database._commit(conn)
+            except Exception as e:
+                if not in_transaction:
+                    conn.rollback()
+                raise e
+            finally:
+                cursor.close()
 
 def init_app(app):
-    Database.initialize()
+    Database.initialize(app.config)
     app.teardown_appcontext(Database.close_db)
@@ -8,12 +8,36 @@ candidates_bp = Blueprint('candidates', __name__)
 @token_required
 def get_candidates():
     """
-    Get all candidates
+    Search candidates
+    Hybrid full-text + semantic search when `q` is given, newest first otherwise.
+    The next page cursor is returned in the X-Next-Cursor header and per-stage
+    timings in the Server-Timing header.
     ---
     tags:
       - Candidates
     security:
       - Bearer: []
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: false
+        description: Free-text search over names, skills and resume text
+      - name: experience
+        in: query
+        type: integer
+        required: false
+        description: Minimum years of experience
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (defaults to SEARCH_PAGE_SIZE, at most SEARCH_MAX_PAGE_SIZE)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Value of X-Next-Cursor from the previous page
     responses:
       200:
         description: List of candidates
@@ -32,48 +56,33 @@ def get_candidates():
                 type: string
               phone:
                 type: string
+      400:
+        description: Invalid cursor
       500:
         description: Internal server error
     """
     try:
+        from app.services.search_service import CandidateSearchService
+
         # Get query parameters
-        query = request.args.get('q', '')
-        location = request.args.get('location', '')
+        query = request.args.get('q', '').strip()
         min_experience = request.args.get('experience', type=int)
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        # location is not in the candidates schema yet, so it isn't filtered on
 
-        sql = "SELECT id, first_name, last_name, email, phone, linkedin_url, created_at, skills, experience_years FROM candidates WHERE 1=1"
-        params = []
-
-        if query:
-            # Search in name or skills
-            sql += " AND (first_name ILIKE %s OR last_name ILIKE %s OR skills ILIKE %s)"
-            search_term = f"%{query}%"
-            params.extend([search_term, search_term, search_term])
-        
-        if location:
-            # Assuming location is stored in a column or we just skip for now if not in schema
-            # Checking schema... location is not in candidates table, maybe in future.
-            # For now let's skip location filter or add it to schema if needed.
-            # But user asked for it. Let's check if we can add it or if it's in resume text.
-            pass 
-
-        if min_experience is not None:
-            sql += " AND experience_years >= %s"
-            params.append(min_experience)
-
-        sql += " ORDER BY created_at DESC"
+        candidates, next_cursor, timings = CandidateSearchService.search(query, min_experience, limit, cursor)
 
-        rows = Database.query(sql, tuple(params), fetchall=True)
-        
-        candidates = [
-            {
-                'id': r[0], 'first_name': r[1], 'last_name': r[2], 
-                'email': r[3], 'phone': r[4], 'linkedin_url': r[5],
-                'created_at': r[6], 'skills': r[7], 'experience_years': r[8]
-            }
-            for r in rows
-        ]
-        return jsonify(candidates), 200
+        response = jsonify(candidates)
+        response.headers['Server-Timing'] = ", ".join(f"{stage};dur={ms}" for stage, ms in timings.items())
+        expose = ['Server-Timing']
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+            expose.append('X-Next-Cursor')
+        response.headers['Access-Control-Expose-Headers'] = ", ".join(expose)
+        return response, 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -302,23 +311,25 @@ def update_candidate_profile():
         # Add candidate_id to values for WHERE clause
         values.append(candidate_id)
         
-        query = f"UPDATE candidates SET {', '.join(fields)} WHERE id = %s"
-        Database.execute(query, tuple(values))
-        
-        # Also update the users table to keep names in sync
-        user_fields = []
-        user_values = []
-        if 'first_name' in data:
-            user_fields.append("first_name = %s")
-            user_values.append(data['first_name'])
-        if 'last_name' in data:
-            user_fields.append("last_name = %s")
-            user_values.append(data['last_name'])
-            
-        if user_fields:
-            user_values.append(g.user_id)
-            user_query = f"UPDATE users SET {', '.join(user_fields)} WHERE id = %s"
-            Database.execute(user_query, tuple(user_values))
+        # Candidate and user names change together or not at all
+        with Database.transaction():
+            query = f"UPDATE candidates SET {', '.join(fields)} WHERE id = %s"
+            Database.execute(query, tuple(values))
+
+            # Also update the users table to keep names in sync
+            user_fields = []
+            user_values = []
+            if 'first_name' in data:
+                user_fields.append("first_name = %s")
+                user_values.append(data['first_name'])
+            if 'last_name' in data:
+                user_fields.append("last_name = %s")
+                user_values.append(data['last_name'])
+
+            if user_fields:
+                user_values.append(g.user_id)
+                user_query = f"UPDATE users SET {', '.join(user_fields)} WHERE id = %s"
+                Database.execute(user_query, tuple(user_values))
         
         return jsonify({'message': 'Profile updated successfully'}), 200
         
@@ -1,4 +1,3 @@
-import os
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.utils import secure_filename
 from app.db import Database
@@ -45,12 +44,8 @@ def upload_jd():
         
     if file:
         filename = secure_filename(file.filename)
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-            
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
+        from app.services.blob_store import BlobStore
+        file_path, content_hash, deduplicated = BlobStore.from_config(current_app.config).save(file.stream, filename)
         
         job_id = request.form.get('job_id')
         if job_id:
@@ -62,4 +57,4 @@ def upload_jd():
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
-        return jsonify({'message': 'JD uploaded successfully', 'file_path': file_path}), 201
+        return jsonify({'message': 'JD uploaded successfully', 'file_path': file_path, 'deduplicated': deduplicated}), 201
@@ -1,5 +1,4 @@
-from flask import Blueprint, request, jsonify
-from app.services.rag_service import RAGService
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from app.routes.auth import token_required
 
 rag_bp = Blueprint('rag', __name__)
@@ -22,26 +21,65 @@ def analyze_application(app_id):
     responses:
       200:
         description: Analysis completed
+      404:
+        description: Application not found
       500:
         description: Internal server error
     """
-    # This would normally trigger the LLM analysis
-    # For now, we'll mock the LLM part but save to DB as required
     try:
-        # Mock analysis result
-        import random
-        score = random.randint(60, 95)
-        text = "Candidate has strong Python skills but lacks recent cloud experience."
-        keywords = "Python, Flask, SQL"
-        missing = "AWS, Docker"
-        
-        RAGService.save_analysis(app_id, score, text, keywords, missing)
-        
-        # Also update application score
         from app.db import Database
-        Database.execute("UPDATE applications SET score = %s WHERE id = %s", (score, app_id))
-        
-        return jsonify({'message': 'Analysis completed', 'score': score}), 200
+        from app.services.scoring_service import ScoringService
+
+        row = Database.query("SELECT job_id FROM applications WHERE id = %s", (app_id,), fetchone=True)
+        if not row:
+            return jsonify({'error': 'Application not found'}), 404
+
+        results = ScoringService.score_job(row[0], [app_id])
+        if not results:
+            return jsonify({'error': 'Application not found'}), 404
+
+        return jsonify({'message': 'Analysis completed', 'score': results[0]['score']}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@rag_bp.route('/analyze/job/<int:job_id>', methods=['POST'])
+@token_required
+def analyze_job(job_id):
+    """
+    Score every application for a job in one batch
+    ---
+    tags:
+      - AI Analysis
+    security:
+      - Bearer: []
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Applications scored
+      404:
+        description: Job not found
+      500:
+        description: Internal server error
+    """
+    try:
+        import time
+        from app.services.scoring_service import ScoringService
+
+        start = time.perf_counter()
+        results = ScoringService.score_job(job_id)
+        return jsonify({
+            'message': 'Analysis completed',
+            'job_id': job_id,
+            'scored': len(results),
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+            'scores': [{'application_id': r['application_id'], 'score': r['score']} for r in results]
+        }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -67,11 +105,17 @@ def ask():
             question:
               type: string
               example: "Show me candidates with Python experience"
+            k:
+              type: integer
+              description: Number of sources to retrieve (defaults to RAG_ASK_TOP_K, at most RAG_MAX_K)
+            stream:
+              type: boolean
+              description: Stream the answer as server-sent events (also enabled by Accept text/event-stream)
     responses:
       200:
-        description: AI response
+        description: AI response with cited sources, or an event stream of sources, token and done events
       400:
-        description: Question is required
+        description: Question is required, or k is not an integer
       500:
         description: Internal server error
     """
@@ -79,11 +123,48 @@ def ask():
     question = data.get('question')
     if not question:
         return jsonify({'error': 'Question is required'}), 400
-        
+
+    k = data.get('k')
+    if k is not None:
+        try:
+            k = int(k)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'k must be an integer'}), 400
+        k = max(1, min(k, current_app.config.get('RAG_MAX_K', 50)))
+
+    from app.services.rag.qa_service import QAService
+    if data.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+        return Response(
+            stream_with_context(QAService.stream_answer(question, k)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     try:
-        # Mock RAG response for now as we don't have the vector DB setup in this raw SQL version yet
-        # In a real implementation, this would query the vector DB
-        answer = f"This is a mock AI response to: {question}. (RAG not fully implemented in raw SQL mode yet)"
-        return jsonify({'answer': answer, 'sources': []}), 200
+        return jsonify(QAService.answer(question, k)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@rag_bp.route('/stats', methods=['GET'])
+@token_required
+def stats():
+    """
+    Embedding model and vector store metrics for this worker
+    ---
+    tags:
+      - AI Analysis
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Embedding latency metrics, LLM circuit breaker state and LLM cache hit ratio
+    """
+    from app.services.rag.embeddings import Embedder
+    from app.services.llm_provider.llm import LLMProvider
+    from app.services.llm_provider.response_cache import LLMCache
+    embedder = Embedder.get_instance().stats() if Embedder.loaded() else None
+    try:
+        llm_cache = LLMCache.stats()
+    except Exception as e:
+        llm_cache = {'error': str(e)}
+    return jsonify({'embedder': embedder, 'llm': LLMProvider.stats(), 'llm_cache': llm_cache}), 200
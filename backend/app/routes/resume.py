@@ -30,8 +30,8 @@ def upload_resume():
         required: false
         description: Optional candidate ID to link the resume to
     responses:
-      201:
-        description: File uploaded successfully
+      202:
+        description: File saved and queued for processing; poll status_url for the parsed data
       400:
         description: No file part or no selected file
       500:
@@ -45,111 +45,99 @@ def upload_resume():
         
     if file:
         filename = secure_filename(file.filename)
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-            
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
-        
-        # Parse the resume
-        from app.services.parsing.resume_parser import ResumeParser
-        parsed_data = ResumeParser.parse_resume(file_path)
+        from app.services.blob_store import BlobStore
+        file_path, content_hash, deduplicated = BlobStore.from_config(current_app.config).save(file.stream, filename)
         
         # If candidate_id is provided, link it. Otherwise try to infer from logged in user.
         candidate_id = request.form.get('candidate_id')
         
+        from flask import g
+        from app.services.candidate_service import CandidateService
         if not candidate_id:
-            from flask import g
-            # Try to find candidate linked to this user
-            user_email_row = Database.query("SELECT email FROM users WHERE id = %s", (g.user_id,), fetchone=True)
-            if user_email_row:
-                email = user_email_row[0]
-                cand_row = Database.query("SELECT id FROM candidates WHERE email = %s", (email,), fetchone=True)
-                if cand_row:
-                    candidate_id = cand_row[0]
+            candidate_id = CandidateService.find_candidate_for_user(g.user_id)
+        
+        # Extraction, LLM parsing, candidate merge and embedding run in resume_worker.py
+        try:
+            from app.services.resume_pipeline import ResumePipeline
+            job_id = ResumePipeline.enqueue(file_path, filename, g.user_id, candidate_id)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
         
-        if candidate_id:
-            try:
-                # Update candidate skills/experience if missing or if we want to append
-                if parsed_data.get('skills') or parsed_data.get('experience_years'):
-                    # Fetch current data
-                    curr = Database.query("SELECT skills, experience_years FROM candidates WHERE id = %s", (candidate_id,), fetchone=True)
-                    if curr:
-                        current_skills = curr[0] or ""
-                        current_exp = curr[1] or 0
-                        
-                        new_skills = parsed_data.get('skills', [])
-                        if isinstance(new_skills, list):
-                            new_skills = ", ".join(new_skills)
-                        
-                        # Merge skills (simple concatenation for now, or overwrite if empty)
-                        final_skills = current_skills
-                        if new_skills:
-                            if final_skills:
-                                final_skills += ", " + new_skills
-                            else:
-                                final_skills = new_skills
-                        
-                        # Update experience if new one is found and greater (or just take new one)
-                        new_exp = parsed_data.get('experience_years', 0)
-                        final_exp = max(current_exp, new_exp)
-                        
-                        Database.execute(
-                            "UPDATE candidates SET skills = %s, experience_years = %s WHERE id = %s",
-                            (final_skills, final_exp, candidate_id)
-                        )
+        return jsonify({
+            'message': 'File uploaded, processing queued',
+            'job_id': job_id,
+            'status_url': f"/resume/jobs/{job_id}",
+            'file_path': file_path,
+            'content_hash': content_hash,
+            'deduplicated': deduplicated
+        }), 202
 
 
+@resume_bp.route('/jobs/stats', methods=['GET'])
+@token_required
+def get_resume_job_stats():
+    """
+    Extraction timings and sandbox kill counts for recently processed resumes
+    ---
+    tags:
+      - Files
+    security:
+      - Bearer: []
+    parameters:
+      - name: hours
+        in: query
+        type: integer
+        default: 24
+    responses:
+      200:
+        description: Done/failed counts, timeouts, memory kills and extract_ms (avg, p95, max)
+      403:
+        description: Admins and recruiters only
+      500:
+        description: Internal server error
+    """
+    from flask import g
+    if g.user_role not in ('admin', 'recruiter'):
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        from app.services.resume_pipeline import ResumePipeline
+        return jsonify(ResumePipeline.extraction_stats(request.args.get('hours', 24, type=int))), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-                # Resume Versioning Logic: Check count before inserting
-                existing_resumes = Database.query(
-                    "SELECT id, file_path FROM resumes WHERE candidate_id = %s ORDER BY uploaded_at ASC",
-                    (candidate_id,),
-                    fetchall=True
-                )
-                
-                if existing_resumes and len(existing_resumes) >= 3:
-                    # Delete the oldest ones until we have space for the new one (keep 2, so new one makes 3)
-                    # Actually requirement says "As soon as candidate enters 4th... 1st should get deleted"
-                    # So if we have 3, we delete the oldest 1.
-                    
-                    # Calculate how many to delete. We want (current + 1) <= 3 is impossible if current is 3. 
-                    # So if current is 3, we delete 1. If current is 4 (error state), we delete 2.
-                    num_to_delete = len(existing_resumes) - 2 
-                    
-                    to_delete = existing_resumes[:num_to_delete]
-                    
-                    for res in to_delete:
-                        res_id = res[0]
-                        res_path = res[1]
-                        
-                        # Delete from DB
-                        Database.execute("DELETE FROM resumes WHERE id = %s", (res_id,))
-                        
-                        # Delete from Disk
-                        if os.path.exists(res_path):
-                            try:
-                                os.remove(res_path)
-                                print(f"Deleted old resume version: {res_path}")
-                            except Exception as del_err:
-                                print(f"Error deleting file {res_path}: {del_err}")
-                    
-                    # Notify user (Mock notification via print for now, frontend will see updated list)
-                    print(f"Notification: Old versions of resume were deleted to save space.")
 
-                Database.execute(
-                    "INSERT INTO resumes (candidate_id, file_path, file_name, parsed_text) VALUES (%s, %s, %s, %s)",
-                    (candidate_id, file_path, filename, parsed_data.get('text', ''))
-                )
-            except Exception as e:
-                return jsonify({'error': str(e)}), 500
-        
-        return jsonify({
-            'message': 'File uploaded successfully', 
-            'file_path': file_path,
-            'parsed_data': parsed_data
-        }), 201
+@resume_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@token_required
+def get_resume_job(job_id):
+    """
+    Get the processing status of an uploaded resume
+    ---
+    tags:
+      - Files
+    security:
+      - Bearer: []
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job status (queued, running, done or failed); when done, result holds parsed_data
+      404:
+        description: Job not found
+      500:
+        description: Internal server error
+    """
+    try:
+        from flask import g
+        from app.services.resume_pipeline import ResumePipeline
+        job = ResumePipeline.get_status(job_id)
+        if not job or (str(job['user_id']) != str(g.user_id) and g.user_role not in ('admin', 'recruiter')):
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 @resume_bp.route('/history/<int:candidate_id>', methods=['GET'])
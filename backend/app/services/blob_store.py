@@ -0,0 +1,108 @@
+import os
+import time
+import hashlib
+import tempfile
+
+CHUNK_SIZE = 1024 * 1024
+
+# Rows that keep a blob alive; finished resume jobs have handed their file over to a resume row
+REFERENCES_SQL = """
+    SELECT (SELECT COUNT(*) FROM resumes WHERE file_path = %(path)s)
+         + (SELECT COUNT(*) FROM jd_files WHERE file_path = %(path)s)
+         + (SELECT COUNT(*) FROM resume_jobs WHERE file_path = %(path)s AND status IN ('queued', 'running'))
+"""
+
+
+class BlobStore:
+    """
+    Content-addressed file store for uploads.
+
+    A file lives at `root/<h[:2]>/<h[2:4]>/<h><ext>` where h is the SHA-256 of
+    its bytes, hashed while the upload is streamed to a temp file, so identical
+    uploads share one file and different files with the same name never
+    collide. There is no separate counter to drift: a blob's reference count is
+    the number of resumes/jd_files rows (and pending resume jobs) whose
+    file_path points at it, and `release()` only deletes the file at zero.
+    """
+
+    def __init__(self, root, grace_seconds=300):
+        self.root = root
+        # A blob touched this recently may belong to an upload whose row isn't written yet
+        self.grace_seconds = grace_seconds
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['BLOB_FOLDER'], config.get('BLOB_RELEASE_GRACE', 300))
+
+    def path_for(self, content_hash, ext=''):
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash + ext.lower())
+
+    def hash_of(self, path):
+        """The content hash encoded in a blob path, or None for files outside the store."""
+        if not path or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(path)))) != os.path.abspath(self.root):
+            return None
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def save(self, stream, filename):
+        """
+        Streams a file-like object into the store. Returns (path, content_hash,
+        deduplicated), where deduplicated means an identical blob already existed.
+        """
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+            return self._commit(tmp_path, digest.hexdigest(), filename)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def save_bytes(self, data, filename):
+        """Like save() for content already in memory."""
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(content_hash, os.path.splitext(filename)[1])
+        if os.path.exists(path):
+            os.utime(path)
+            return path, content_hash, True
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            return self._commit(tmp_path, content_hash, filename)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _commit(self, tmp_path, content_hash, filename):
+        path = self.path_for(content_hash, os.path.splitext(filename)[1])
+        if os.path.exists(path):
+            # Refresh mtime so a concurrent release() sees the blob as in use
+            os.utime(path)
+            return path, content_hash, True
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return path, content_hash, False
+
+    def release(self, path):
+        """
+        Deletes the file at `path` if no row references it any more. Call it
+        after deleting a referencing row. Returns True if the file was removed.
+        """
+        from app.db import Database
+
+        if Database.query(REFERENCES_SQL, {'path': path}, fetchone=True)[0]:
+            return False
+        try:
+            if self.hash_of(path) and time.time() - os.path.getmtime(path) < self.grace_seconds:
+                return False
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
@@ -1,4 +1,6 @@
+from flask import current_app
 from app.db import Database
+from app.services.blob_store import BlobStore
 
 class CandidateService:
     @staticmethod
@@ -93,3 +95,99 @@ class CandidateService:
     @staticmethod
     def update_application_stage(app_id, stage):
         Database.execute("UPDATE applications SET stage = %s WHERE id = %s", (stage, app_id))
+
+    @staticmethod
+    def find_candidate_for_user(user_id):
+        """Returns the id of the candidate whose email matches the user's, if any."""
+        user_email_row = Database.query("SELECT email FROM users WHERE id = %s", (user_id,), fetchone=True)
+        if user_email_row:
+            cand_row = Database.query("SELECT id FROM candidates WHERE email = %s", (user_email_row[0],), fetchone=True)
+            if cand_row:
+                return cand_row[0]
+        return None
+
+    @staticmethod
+    def attach_resume(candidate_id, file_path, filename, parsed_data, text):
+        """
+        Merges parsed skills/experience into the candidate, applies resume
+        versioning (at most 3 kept) and records the new resume with its
+        extracted text. Returns the new resume id.
+        """
+        blob_store = BlobStore.from_config(current_app.config)
+        released = []
+
+        # One commit for the merge, the pruning of old versions and the new row
+        with Database.transaction():
+            # Update candidate skills/experience if missing or if we want to append
+            if parsed_data.get('skills') or parsed_data.get('experience_years'):
+                # Fetch current data
+                curr = Database.query("SELECT skills, experience_years FROM candidates WHERE id = %s FOR UPDATE", (candidate_id,), fetchone=True)
+                if curr:
+                    current_skills = curr[0] or ""
+                    current_exp = curr[1] or 0
+
+                    new_skills = parsed_data.get('skills', [])
+                    if isinstance(new_skills, list):
+                        new_skills = ", ".join(new_skills)
+
+                    # Merge skills (simple concatenation for now, or overwrite if empty)
+                    final_skills = current_skills
+                    if new_skills:
+                        if final_skills:
+                            final_skills += ", " + new_skills
+                        else:
+                            final_skills = new_skills
+
+                    # Update experience if new one is found and greater (or just take new one)
+                    new_exp = parsed_data.get('experience_years') or 0
+                    final_exp = max(current_exp, new_exp)
+
+                    Database.execute(
+                        "UPDATE candidates SET skills = %s, experience_years = %s WHERE id = %s",
+                        (final_skills, final_exp, candidate_id)
+                    )
+
+            # Resume Versioning Logic: Check count before inserting
+            existing_resumes = Database.query(
+                "SELECT id, file_path FROM resumes WHERE candidate_id = %s ORDER BY uploaded_at ASC",
+                (candidate_id,),
+                fetchall=True
+            )
+
+            if existing_resumes and len(existing_resumes) >= 3:
+                # Delete the oldest ones until we have space for the new one (keep 2, so new one makes 3)
+                # Actually requirement says "As soon as candidate enters 4th... 1st should get deleted"
+                # So if we have 3, we delete the oldest 1.
+
+                # Calculate how many to delete. We want (current + 1) <= 3 is impossible if current is 3.
+                # So if current is 3, we delete 1. If current is 4 (error state), we delete 2.
+                num_to_delete = len(existing_resumes) - 2
+
+                to_delete = existing_resumes[:num_to_delete]
+
+                for res in to_delete:
+                    res_id = res[0]
+                    res_path = res[1]
+
+                    # Delete from DB; the file goes after the commit
+                    Database.execute("DELETE FROM resumes WHERE id = %s", (res_id,))
+                    released.append(res_path)
+
+                # Notify user (Mock notification via print for now, frontend will see updated list)
+                print(f"Notification: Old versions of resume were deleted to save space.")
+
+            row = Database.query(
+                "INSERT INTO resumes (candidate_id, file_path, file_name, parsed_text, content_hash) VALUES (%s, %s, %s, %s, %s) RETURNING id",
+                (candidate_id, file_path, filename, text, blob_store.hash_of(file_path)),
+                fetchone=True,
+                commit=True
+            )
+
+        # Delete from Disk, unless another resume or JD still shares the (content-addressed) file
+        for res_path in released:
+            try:
+                if blob_store.release(res_path):
+                    print(f"Deleted old resume version: {res_path}")
+            except Exception as del_err:
+                print(f"Error deleting file {res_path}: {del_err}")
+        return row[0]
@@ -3,36 +3,32 @@ from app.db import Database
 class JobService:
     @staticmethod
     def create_job(data, user_id):
-        Database.execute(
-            """
-            INSERT INTO job_postings (title, department, location, description, requirements, created_by, salary_min, salary_max, currency, custom_job_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                data['title'], 
-                data['department'], 
-                data['location'], 
-                data['description'], 
-                data['requirements'], 
-                user_id,
-                data.get('salary_min'),
-                data.get('salary_max'),
-                data.get('currency', 'USD'),
-                data.get('custom_job_id') 
-            )
-        )
-        
-        # If custom_job_id wasn't provided, generate it based on the new ID
-        if not data.get('custom_job_id'):
-            # Get the ID of the job we just created (assuming title/created_by unique enough for latest, or use RETURNING if DB wrapper supported)
-            # Safe way: Select max ID for this user? Or assume title unique?
-            # Let's try finding by title + created_at desc
+        # Insert and custom id in one commit, so a job is never visible without its JOB-<id>
+        with Database.transaction():
             job = Database.query(
-                "SELECT id FROM job_postings WHERE title=%s AND created_by=%s ORDER BY id DESC LIMIT 1",
-                (data['title'], user_id),
-                fetchone=True
+                """
+                INSERT INTO job_postings (title, department, location, description, requirements, created_by, salary_min, salary_max, currency, custom_job_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (
+                    data['title'], 
+                    data['department'], 
+                    data['location'], 
+                    data['description'], 
+                    data['requirements'], 
+                    user_id,
+                    data.get('salary_min'),
+                    data.get('salary_max'),
+                    data.get('currency', 'USD'),
+                    data.get('custom_job_id') 
+                ),
+                fetchone=True,
+                commit=True
             )
-            if job:
+
+            # If custom_job_id wasn't provided, generate it based on the new ID
+            if not data.get('custom_job_id'):
                 job_id = job[0]
                 custom_id = f"JOB-{job_id}"
                 Database.execute("UPDATE job_postings SET custom_job_id = %s WHERE id = %s", (custom_id, job_id))
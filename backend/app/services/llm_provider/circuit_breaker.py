@@ -0,0 +1,70 @@
+import time
+import threading
+
+
+class CircuitOpenError(Exception):
+    """The provider failed repeatedly and calls are being refused until the reset timeout passes."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, shared by every thread of a process.
+
+    Closed: calls go through; `failure_threshold` failures in a row open it.
+    Open: `before_call()` raises CircuitOpenError without touching the
+    network, so callers fall back straight away. After `reset_seconds` one
+    trial call is let through (half-open): success closes the breaker,
+    failure opens it for another `reset_seconds`.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_seconds=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if time.monotonic() - self.opened_at >= self.reset_seconds else 'open'
+
+    def before_call(self):
+        with self.lock:
+            self.stats['calls'] += 1
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at >= self.reset_seconds and not self.trial_running:
+                self.trial_running = True
+                return
+            self.stats['rejected'] += 1
+            raise CircuitOpenError(f"LLM provider '{self.name}' is unavailable (circuit open after {self.failures} failures)")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release(self):
+        """The call ended without an outcome (e.g. it was cancelled): let another trial through."""
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.stats['failures'] += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.trial_running:
+                    self.stats['opened'] += 1
+                self.opened_at = time.monotonic()
+                self.trial_running = False
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, state=self.state, consecutive_failures=self.failures)
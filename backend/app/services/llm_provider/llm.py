@@ -1,42 +1,66 @@
-import os
-import google.generativeai as genai
-from openai import OpenAI
-from flask import current_app
+import json
+import time
+import random
+import asyncio
+import threading
+import weakref
+from contextlib import closing
+from flask import current_app, has_app_context
+from app.services.llm_provider.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.llm_provider.response_cache import LLMCache
+from app.services.llm_provider.structured import IncrementalJSONParser, SchemaError, gemini_schema, openai_response_format
+
+GEMINI_MODEL = 'gemini-1.5-flash'
+OPENAI_MODEL = 'gpt-4o-mini'
+CHARS_PER_TOKEN = 4  # token estimate where the provider doesn't report usage
+
+# Exception class names (OpenAI/httpx, requests, google-api-core) that mean "try again later"
+TRANSIENT_ERRORS = ('Timeout', 'Connect', 'DeadlineExceeded', 'ServiceUnavailable', 'ResourceExhausted', 'RateLimit', 'InternalServer')
+
+
+def _status(error):
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(error):
+    if _status(error) == 429:
+        return True
+    name = type(error).__name__
+    message = str(error).lower()
+    return ('RateLimit' in name or 'ResourceExhausted' in name or '429' in message
+            or 'rate limit' in message or 'resource exhausted' in message or 'quota' in message)
 
-class LLMProvider:
-    def __init__(self, provider=None):
-        self.provider = provider or current_app.config['LLM_PROVIDER']
-        self.gemini_key = current_app.config['GEMINI_API_KEY']
-        self.openai_key = current_app.config['OPENAI_API_KEY']
-        
-        if self.provider == 'gemini':
-            genai.configure(api_key=self.gemini_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        elif self.provider == 'openai':
-            self.client = OpenAI(api_key=self.openai_key)
-        
-    def chat(self, messages: list[dict], max_tokens=800):
-        """
-        Unified chat interface.
-        messages: list of dicts with 'role' ('user', 'system', 'assistant') and 'content'.
-        """
-        if self.provider == 'gemini':
-            return self._chat_gemini(messages, max_tokens)
-        elif self.provider == 'openai':
-            return self._chat_openai(messages, max_tokens)
-        elif self.provider == 'local_llama':
-            return self._chat_local_llama(messages, max_tokens)
-        else:
-            raise ValueError(f"Unknown provider: {self.provider}")
 
-    def _chat_gemini(self, messages, max_tokens):
+def is_transient(error):
+    """Timeouts, connection failures, 429s and 5xxs: worth retrying, unlike bad requests or auth errors."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = _status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(marker in type(error).__name__ for marker in TRANSIENT_ERRORS)
+
+
+class _GeminiBackend:
+    def __init__(self, settings):
+        import google.generativeai as genai
+        genai.configure(api_key=settings['gemini_key'])
+        self.model = genai.GenerativeModel(GEMINI_MODEL)
+        self.model_name = GEMINI_MODEL
+        self.request_options = {'timeout': settings['connect_timeout'] + settings['read_timeout']}
+
+    @staticmethod
+    def prompt(messages):
         # Gemini python lib uses a different history format
         # Convert standard messages to Gemini format
         # System prompt is usually set at model init or as first part
-        
+
         history = []
         system_instruction = ""
-        
+
         for msg in messages:
             if msg['role'] == 'system':
                 system_instruction += msg['content'] + "\n"
@@ -44,44 +68,538 @@ class LLMProvider:
                 history.append({'role': 'user', 'parts': [msg['content']]})
             elif msg['role'] == 'assistant':
                 history.append({'role': 'model', 'parts': [msg['content']]})
-        
+
         # Simple generation for now (stateless for the model object, but we pass history)
         # For 1.5 flash we can just generate content with the full context
-        
+
         full_prompt = system_instruction + "\n\n"
         for h in history:
             role = "User" if h['role'] == 'user' else "Model"
             full_prompt += f"{role}: {h['parts'][0]}\n"
         full_prompt += "Model: "
-        
-        response = self.model.generate_content(full_prompt)
+        return full_prompt
+
+    @staticmethod
+    def generation_config(schema):
+        if schema is None:
+            return None
+        return {'response_mime_type': 'application/json', 'response_schema': gemini_schema(schema)}
+
+    def chat(self, messages, max_tokens, schema=None):
+        response = self.model.generate_content(
+            self.prompt(messages), generation_config=self.generation_config(schema), request_options=self.request_options
+        )
+        return response.text
+
+    async def achat(self, messages, max_tokens, schema=None):
+        response = await self.model.generate_content_async(
+            self.prompt(messages), generation_config=self.generation_config(schema), request_options=self.request_options
+        )
         return response.text
 
-    def _chat_openai(self, messages, max_tokens):
+    def stream(self, messages, max_tokens, schema=None):
+        response = self.model.generate_content(
+            self.prompt(messages), generation_config=self.generation_config(schema), stream=True,
+            request_options=self.request_options
+        )
+        for chunk in response:
+            if chunk.parts:  # safety-blocked or empty chunks have no text
+                yield {'text': chunk.text}
+        usage = getattr(response, 'usage_metadata', None)
+        yield {'text': '', 'output_tokens': getattr(usage, 'candidates_token_count', None)}
+
+
+class _OpenAIBackend:
+    def __init__(self, settings):
+        import httpx
+        from openai import OpenAI
+
+        self.settings = settings
+        self.model_name = OPENAI_MODEL
+        self.timeout = httpx.Timeout(settings['read_timeout'], connect=settings['connect_timeout'])
+        self.limits = httpx.Limits(max_connections=settings['pool_size'], max_keepalive_connections=settings['pool_size'])
+        # Retries are done (with jitter, and counted by the circuit breaker) in LLMProvider
+        self.client = OpenAI(
+            api_key=settings['openai_key'], timeout=self.timeout, max_retries=0,
+            http_client=httpx.Client(timeout=self.timeout, limits=self.limits)
+        )
+        # httpx async connections belong to one event loop
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+
+    @staticmethod
+    def options(schema):
+        return {'response_format': openai_response_format(schema)} if schema is not None else {}
+
+    def chat(self, messages, max_tokens, schema=None):
         response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=OPENAI_MODEL,
             messages=messages,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            **self.options(schema)
         )
         return response.choices[0].message.content
 
-    def _chat_local_llama(self, messages, max_tokens):
-        # Support for Ollama
+    def stream(self, messages, max_tokens, schema=None):
+        stream = self.client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            stream=True,
+            **self.options(schema)
+        )
+        try:
+            finish_reason = None
+            for event in stream:
+                if not event.choices:
+                    continue
+                choice = event.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                if choice.delta.content:
+                    yield {'text': choice.delta.content}
+            yield {'text': '', 'finish_reason': finish_reason}
+        finally:
+            # Closing the HTTP response stops generation when the consumer goes away
+            stream.response.close()
+
+    def _async_client(self):
+        import httpx
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=self.settings['openai_key'], timeout=self.timeout, max_retries=0,
+                    http_client=httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+                )
+                self._async_clients[loop] = client
+        return client
+
+    async def achat(self, messages, max_tokens, schema=None):
+        response = await self._async_client().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            **self.options(schema)
+        )
+        return response.choices[0].message.content
+
+
+class _OllamaBackend:
+    def __init__(self, settings):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.settings = settings
+        self.model_name = settings['ollama_model']
+        self.url = f"{settings['ollama_base_url']}/api/chat"
+        self.timeout = (settings['connect_timeout'], settings['read_timeout'])
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=settings['pool_size']))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=settings['pool_size']))
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+
+    def payload(self, messages, stream=False, schema=None):
+        payload = {
+            "model": self.settings['ollama_model'],
+            "messages": messages,
+            "stream": stream
+        }
+        if schema is not None:
+            # JSON mode constrains decoding to valid JSON; the fields are still described in the prompt
+            payload["format"] = "json"
+        return payload
+
+    def chat(self, messages, max_tokens, schema=None):
+        response = self.session.post(self.url, json=self.payload(messages, schema=schema), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['message']['content']
+
+    def stream(self, messages, max_tokens, schema=None):
+        # Ollama streams one JSON object per line; the last has done=true and the eval counts
+        response = self.session.post(
+            self.url, json=self.payload(messages, stream=True, schema=schema), timeout=self.timeout, stream=True
+        )
         try:
-            import requests
-            ollama_base_url = current_app.config.get('OLLAMA_BASE_URL', 'http://host.docker.internal:11434')
-            ollama_model = current_app.config.get('OLLAMA_MODEL', 'llama3')
-            
-            payload = {
-                "model": ollama_model,
-                "messages": messages,
-                "stream": False
-            }
-            
-            response = requests.post(f"{ollama_base_url}/api/chat", json=payload)
             response.raise_for_status()
-            
-            return response.json()['message']['content']
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get('error'):
+                    raise RuntimeError(f"Ollama error: {event['error']}")
+                content = event.get('message', {}).get('content')
+                if content:
+                    yield {'text': content}
+                if event.get('done'):
+                    yield {'text': '', 'output_tokens': event.get('eval_count'), 'finish_reason': event.get('done_reason', 'stop')}
+                    return
+        finally:
+            response.close()
+
+    def _async_client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                    limits=httpx.Limits(max_connections=self.settings['pool_size'])
+                )
+                self._async_clients[loop] = client
+        return client
+
+    async def achat(self, messages, max_tokens, schema=None):
+        response = await self._async_client().post(self.url, json=self.payload(messages, schema=schema))
+        response.raise_for_status()
+        return response.json()['message']['content']
+
+
+BACKENDS = {
+    'gemini': _GeminiBackend,
+    'openai': _OpenAIBackend,
+    'local_llama': _OllamaBackend,
+}
+
+
+class LLMProvider:
+    """
+    Chat interface over the configured provider.
+
+    Backends (the SDK client or HTTP session, and its connection pool) are
+    built once per process and provider settings, not per instance, so
+    creating an LLMProvider per resume is cheap. Every call has connect/read
+    timeouts, transient failures are retried with jittered exponential
+    backoff, and a per-provider circuit breaker makes calls fail fast with
+    CircuitOpenError while the provider is down, so callers drop straight
+    to their fallback (the regex parser) instead of waiting on timeouts.
+    """
+    _backends = {}
+    _breakers = {}
+    _stream_stats = {}
+    _structured_stats = {}
+    _lock = threading.Lock()
+
+    def __init__(self, provider=None):
+        config = current_app.config
+        self.provider = provider or config['LLM_PROVIDER']
+        self.settings = {
+            'gemini_key': config['GEMINI_API_KEY'],
+            'openai_key': config['OPENAI_API_KEY'],
+            'ollama_base_url': config.get('OLLAMA_BASE_URL', 'http://host.docker.internal:11434'),
+            'ollama_model': config.get('OLLAMA_MODEL', 'llama3'),
+            'connect_timeout': config.get('LLM_CONNECT_TIMEOUT', 5),
+            'read_timeout': config.get('LLM_READ_TIMEOUT', 60),
+            'pool_size': config.get('LLM_POOL_SIZE', 10),
+        }
+        self.retries = config.get('LLM_RETRIES', 2)
+        self.cache_enabled = config.get('LLM_CACHE_ENABLED', True)
+        if self.provider not in BACKENDS:
+            raise ValueError(f"Unknown provider: {self.provider}")
+        self.backend = self._shared(self.provider, self.settings)
+        self.breaker = self._breaker(self.provider, config)
+
+    @classmethod
+    def _shared(cls, provider, settings):
+        key = (provider,) + tuple(sorted(settings.items()))
+        backend = cls._backends.get(key)
+        if backend is None:
+            with cls._lock:
+                backend = cls._backends.get(key)
+                if backend is None:
+                    backend = cls._backends[key] = BACKENDS[provider](settings)
+        return backend
+
+    @classmethod
+    def _breaker(cls, provider, config):
+        with cls._lock:
+            if provider not in cls._breakers:
+                cls._breakers[provider] = CircuitBreaker(
+                    provider,
+                    failure_threshold=config.get('LLM_BREAKER_FAILURES', 5),
+                    reset_seconds=config.get('LLM_BREAKER_RESET', 30)
+                )
+            return cls._breakers[provider]
+
+    @classmethod
+    def stats(cls):
+        """Circuit breaker state, streaming latency and structured reply failures per provider used in this process."""
+        with cls._lock:
+            breakers = dict(cls._breakers)
+            streams = {name: dict(stats) for name, stats in cls._stream_stats.items()}
+            structured = {name: dict(stats) for name, stats in cls._structured_stats.items()}
+        result = {}
+        for name, breaker in breakers.items():
+            result[name] = breaker.snapshot()
+            stream = streams.get(name)
+            if stream:
+                timed = stream.pop('timed') or 1
+                result[name]['stream'] = dict(
+                    stream,
+                    avg_ttft_ms=round(stream.pop('ttft_ms') / (stream['streams'] or 1), 1),
+                    avg_tokens_per_sec=round(stream.pop('tokens_per_sec') / timed, 1)
+                )
+            replies = structured.get(name)
+            if replies:
+                result[name]['structured'] = dict(replies, failure_rate=round(replies['invalid'] / replies['replies'], 3))
+        return result
+
+    @classmethod
+    def _record_stream(cls, provider, ttft, tokens, generation_seconds, cancelled, cached=False):
+        with cls._lock:
+            stats = cls._stream_stats.setdefault(
+                provider,
+                {'streams': 0, 'cached': 0, 'cancelled': 0, 'output_tokens': 0, 'ttft_ms': 0.0, 'tokens_per_sec': 0.0, 'timed': 0}
+            )
+            if cached:
+                # Counted apart so cache hits don't flatter the provider's latency
+                stats['cached'] += 1
+                return
+            stats['streams'] += 1
+            stats['cancelled'] += int(cancelled)
+            stats['output_tokens'] += tokens
+            stats['ttft_ms'] += ttft * 1000
+            if generation_seconds > 0 and tokens and not cancelled:
+                stats['tokens_per_sec'] += tokens / generation_seconds
+                stats['timed'] += 1
+
+    @classmethod
+    def _record_structured(cls, provider, valid, tokens, cancelled=False):
+        with cls._lock:
+            stats = cls._structured_stats.setdefault(
+                provider, {'replies': 0, 'invalid': 0, 'cancelled_early': 0, 'wasted_tokens': 0}
+            )
+            stats['replies'] += 1
+            if not valid:
+                stats['invalid'] += 1
+                stats['cancelled_early'] += int(cancelled)
+                stats['wasted_tokens'] += tokens
+
+    def available(self):
+        return self.breaker.state != 'open'
+
+    def chat(self, messages: list[dict], max_tokens=800, cache=True, semantic=None, schema=None):
+        """
+        Unified chat interface.
+        messages: list of dicts with 'role' ('user', 'system', 'assistant') and 'content'.
+        Replies are served from / stored in the LLMCache unless `cache` is False;
+        `semantic` = (scope, text) also allows a similar-text hit within scope.
+        With a JSON `schema` the provider is put in structured-output mode (see
+        chat_json for the validated variant).
+        """
+        entry, hit = self._cache_lookup(messages, max_tokens, cache, semantic, schema)
+        if hit:
+            return hit[0]
+        self.breaker.before_call()
+        for attempt in range(self.retries + 1):
+            try:
+                result = self.backend.chat(messages, max_tokens, schema=schema)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            self._cache_store(entry, messages, result)
+            return result
+
+    def _cache_lookup(self, messages, max_tokens, cache, semantic, schema=None):
+        """
+        Returns (entry, hit): entry is (key, semantic, model) for _cache_store,
+        so a reply is stored under the same model string its key was built
+        from, and hit is (response, level) or None.
+        """
+        if not (cache and self.cache_enabled and has_app_context()):
+            return None, None
+        # A broken cache must never break the call itself
+        try:
+            model = self.backend.model_name
+            if schema is not None:  # a JSON-mode reply differs from a free-form one to the same prompt
+                model += ':json:' + schema.get('title', 'response')
+            key = LLMCache.key(self.provider, model, messages, max_tokens)
+            if semantic:
+                semantic = (LLMCache.scope_key(self.provider, model, semantic[0]), semantic[1])
+            return (key, semantic, model), LLMCache.get(key, semantic)
+        except Exception as e:
+            print(f"WARNING: LLM cache lookup failed: {e}")
+            return None, None
+
+    def _cache_store(self, entry, messages, response):
+        if entry is None or not response:
+            return
+        try:
+            key, semantic, model = entry
+            LLMCache.put(key, self.provider, model, messages, response, semantic)
         except Exception as e:
-            print(f"Error calling Ollama: {e}")
-            return f"Error: Failed to connect to Ollama. {str(e)}"
+            print(f"WARNING: Could not cache the LLM reply: {e}")
+
+    def chat_stream(self, messages: list[dict], max_tokens=800, cache=True, semantic=None, schema=None):
+        """
+        Generator over the reply as it is produced, in the same chunk format
+        for every provider: {'text': delta, 'done': False} chunks, then one
+        {'text': '', 'done': True, 'finish_reason', 'metrics'} chunk with
+        time-to-first-token and tokens/sec. Failures before the first token
+        are retried like chat(). Closing the generator (e.g. when the HTTP
+        client disconnects) closes the provider stream, which stops generation.
+        A cached reply (see chat()) is yielded as one chunk.
+        """
+        start = time.perf_counter()
+        entry, hit = self._cache_lookup(messages, max_tokens, cache, semantic, schema)
+        if hit:
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            self._record_stream(self.provider, ttft=elapsed / 1000, tokens=0, generation_seconds=0.0, cancelled=False, cached=True)
+            yield {'text': hit[0], 'done': False}
+            yield {'text': '', 'done': True, 'finish_reason': 'cached',
+                   'metrics': {'ttft_ms': elapsed, 'total_ms': elapsed, 'output_tokens': 0, 'tokens_per_sec': None, 'cached': hit[1]}}
+            return
+
+        self.breaker.before_call()
+        parts = []
+        first = None
+        chars = 0
+        final = {}
+        finished = False
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    with closing(self.backend.stream(messages, max_tokens, schema=schema)) as chunks:
+                        for chunk in chunks:
+                            if chunk['text']:
+                                if first is None:
+                                    first = time.perf_counter()
+                                chars += len(chunk['text'])
+                                parts.append(chunk['text'])
+                                yield {'text': chunk['text'], 'done': False}
+                            else:
+                                final = chunk
+                except Exception as e:
+                    # Text already sent can't be taken back, so only a stream that hasn't started is retried
+                    if not self._should_retry(e, attempt if first is None else self.retries):
+                        finished = True
+                        raise
+                    time.sleep(self._backoff(attempt))
+                    continue
+                break
+            finished = True
+            self.breaker.record_success()
+            self._cache_store(entry, messages, ''.join(parts))
+            end = time.perf_counter()
+            tokens = final.get('output_tokens') or -(-chars // CHARS_PER_TOKEN)
+            yield {
+                'text': '',
+                'done': True,
+                'finish_reason': final.get('finish_reason'),
+                'metrics': {
+                    'ttft_ms': round(((first or end) - start) * 1000, 1),
+                    'total_ms': round((end - start) * 1000, 1),
+                    'output_tokens': tokens,
+                    'tokens_per_sec': round(tokens / (end - first), 1) if first and end > first else None
+                }
+            }
+        finally:
+            # Runs on completion, failure and on close() by a disconnected client (counted as cancelled)
+            end = time.perf_counter()
+            if not finished:
+                # A provider that was producing tokens is healthy; otherwise just free a half-open trial
+                if first is not None:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.release()
+            self._record_stream(
+                self.provider,
+                ttft=(first or end) - start,
+                tokens=final.get('output_tokens') or -(-chars // CHARS_PER_TOKEN),
+                generation_seconds=(end - first) if first else 0.0,
+                cancelled=not finished
+            )
+
+    def chat_json(self, messages: list[dict], schema, max_tokens=800, cache=True):
+        """
+        Structured reply: the provider is asked for JSON matching `schema`
+        (OpenAI structured outputs, Gemini response_schema, Ollama JSON mode)
+        and the reply is streamed through an IncrementalJSONParser that
+        validates each field as soon as it is complete. The first invalid
+        field cancels the stream, so a bad reply costs the tokens up to that
+        field instead of a whole reply and a re-ask. Only valid replies are
+        cached. Returns the validated object; raises SchemaError.
+        """
+        entry, hit = self._cache_lookup(messages, max_tokens, cache, None, schema)
+        if hit:
+            try:
+                return IncrementalJSONParser(schema).feed(hit[0]).result()
+            except SchemaError:
+                pass  # written by an older schema; ask again and overwrite it
+
+        parser = IncrementalJSONParser(schema)
+        parts = []
+        finished = False
+        try:
+            with closing(self.chat_stream(messages, max_tokens, cache=False, schema=schema)) as chunks:
+                for chunk in chunks:
+                    if chunk['done']:
+                        finished = True
+                        continue
+                    parts.append(chunk['text'])
+                    parser.feed(chunk['text'])
+            data = parser.result()
+        except SchemaError:
+            self._record_structured(self.provider, False, -(-parser.chars // CHARS_PER_TOKEN), cancelled=not finished)
+            raise
+        self._record_structured(self.provider, True, 0)
+        self._cache_store(entry, messages, ''.join(parts))
+        return data
+
+    def _should_retry(self, error, attempt):
+        transient = is_transient(error)
+        if transient and attempt < self.retries:
+            return True
+        # A rate limit means the provider is up; only outages and timeouts count toward opening the circuit
+        if transient and not is_rate_limited(error):
+            self.breaker.record_failure()
+        elif not transient:
+            self.breaker.record_success()
+        return False
+
+    @staticmethod
+    def _backoff(attempt):
+        # Full jitter: concurrent callers spread their retries out instead of retrying in lockstep
+        return random.uniform(0, min(10.0, 0.5 * 2 ** attempt))
+
+
+class AsyncLLMProvider(LLMProvider):
+    """
+    asyncio variant sharing LLMProvider's settings, retries and circuit
+    breaker; for fanning many prompts out concurrently from one thread.
+    """
+
+    async def chat(self, messages: list[dict], max_tokens=800, schema=None):
+        self.breaker.before_call()
+        for attempt in range(self.retries + 1):
+            try:
+                result = await self.backend.achat(messages, max_tokens, schema=schema)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def chat_many(self, conversations, max_tokens=800, concurrency=None, schema=None):
+        """
+        Runs chat() over a list of message lists with at most `concurrency`
+        (default LLM_POOL_SIZE) in flight. Returns replies in order; a failed
+        conversation's slot holds its exception.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.settings['pool_size'])
+
+        async def one(messages):
+            async with semaphore:
+                return await self.chat(messages, max_tokens, schema=schema)
+
+        return await asyncio.gather(*(one(messages) for messages in conversations), return_exceptions=True)
@@ -0,0 +1,171 @@
+import re
+import json
+import hashlib
+import threading
+import numpy as np
+from flask import current_app
+from app.db import Database
+
+WHITESPACE_RE = re.compile(r'\s+')
+CHARS_PER_TOKEN = 4
+PURGE_EVERY = 100  # stores between TTL / size eviction passes, per process
+
+
+class LLMCache:
+    """
+    LLM replies cached in the llm_cache table, shared by every worker.
+
+    Exact level: the key is a hash of provider, model, max_tokens and the
+    messages with whitespace normalized, so a re-sent prompt (e.g. the same
+    resume text parsed again) costs one indexed lookup instead of a call.
+
+    Semantic level (opt-in per call, LLM_SEMANTIC_CACHE): the caller passes a
+    `scope` that must match exactly (e.g. the sources a RAG answer was built
+    from) and the text to compare (e.g. the question). The text is embedded
+    with the RAG MiniLM model and a cached reply in the same scope is reused
+    when cosine similarity is at least LLM_SEMANTIC_THRESHOLD.
+
+    Entries expire after LLM_CACHE_TTL seconds; beyond LLM_CACHE_MAX_ENTRIES
+    the least recently used are deleted. Counters are per process.
+    """
+    _lock = threading.Lock()
+    _stats = {'lookups': 0, 'exact_hits': 0, 'semantic_hits': 0, 'stores': 0, 'tokens_saved': 0}
+
+    @staticmethod
+    def enabled():
+        return current_app.config.get('LLM_CACHE_ENABLED', True)
+
+    @staticmethod
+    def key(provider, model, messages, max_tokens):
+        normalized = [[m['role'], WHITESPACE_RE.sub(' ', m['content']).strip()] for m in messages]
+        payload = json.dumps([provider, model, max_tokens, normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def scope_key(provider, model, scope):
+        return hashlib.sha256(f"{provider}\0{model}\0{scope}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _embed(text):
+        from app.services.rag.embeddings import Embedder
+        vector = Embedder.from_config(current_app.config).encode([text])[0]
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    @staticmethod
+    def get(key, semantic=None):
+        """
+        Returns (response, level) for a cached reply or None. `semantic` is an
+        optional (scope_key, text) pair for the similarity lookup.
+        """
+        ttl = current_app.config.get('LLM_CACHE_TTL', 7 * 24 * 3600)
+        LLMCache._count('lookups')
+        row = Database.query(
+            """
+            UPDATE llm_cache SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP
+            WHERE cache_key = %s AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+            RETURNING response, input_tokens + output_tokens
+            """,
+            (key, ttl),
+            fetchone=True,
+            commit=True
+        )
+        if row:
+            LLMCache._count('exact_hits', tokens=row[1])
+            return row[0], 'exact'
+        if not semantic or not current_app.config.get('LLM_SEMANTIC_CACHE', False):
+            return None
+
+        scope, text = semantic
+        rows = Database.query(
+            """
+            SELECT cache_key, embedding FROM llm_cache
+            WHERE scope_key = %s AND embedding IS NOT NULL
+              AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+            ORDER BY last_hit_at DESC NULLS LAST
+            LIMIT %s
+            """,
+            (scope, ttl, current_app.config.get('LLM_SEMANTIC_CANDIDATES', 200)),
+            fetchall=True
+        )
+        if not rows:
+            return None
+        matrix = np.frombuffer(b''.join(bytes(r[1]) for r in rows), dtype='float32').reshape(len(rows), -1)
+        similarities = matrix @ LLMCache._embed(text)
+        best = int(np.argmax(similarities))
+        if similarities[best] < current_app.config.get('LLM_SEMANTIC_THRESHOLD', 0.92):
+            return None
+        row = Database.query(
+            """
+            UPDATE llm_cache SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP
+            WHERE cache_key = %s
+            RETURNING response, input_tokens + output_tokens
+            """,
+            (rows[best][0],),
+            fetchone=True,
+            commit=True
+        )
+        if not row:
+            return None
+        LLMCache._count('semantic_hits', tokens=row[1])
+        return row[0], 'semantic'
+
+    @staticmethod
+    def put(key, provider, model, messages, response, semantic=None):
+        scope, embedding = None, None
+        if semantic and current_app.config.get('LLM_SEMANTIC_CACHE', False):
+            scope = semantic[0]
+            embedding = LLMCache._embed(semantic[1]).astype('float32').tobytes()
+        input_tokens = sum(len(m['content']) for m in messages) // CHARS_PER_TOKEN
+        Database.execute(
+            """
+            INSERT INTO llm_cache (cache_key, provider, model, scope_key, embedding, response, input_tokens, output_tokens)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (cache_key) DO UPDATE
+            SET response = EXCLUDED.response, scope_key = EXCLUDED.scope_key, embedding = EXCLUDED.embedding,
+                input_tokens = EXCLUDED.input_tokens, output_tokens = EXCLUDED.output_tokens,
+                created_at = CURRENT_TIMESTAMP, hits = 0
+            """,
+            (key, provider, model, scope, embedding, response, input_tokens, len(response) // CHARS_PER_TOKEN)
+        )
+        if LLMCache._count('stores') % PURGE_EVERY == 0:
+            LLMCache.purge()
+
+    @staticmethod
+    def purge():
+        """Deletes expired entries, then the least recently used beyond LLM_CACHE_MAX_ENTRIES."""
+        config = current_app.config
+        Database.execute(
+            "DELETE FROM llm_cache WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)",
+            (config.get('LLM_CACHE_TTL', 7 * 24 * 3600),)
+        )
+        Database.execute(
+            """
+            DELETE FROM llm_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_cache
+                ORDER BY COALESCE(last_hit_at, created_at) DESC
+                OFFSET %s
+            )
+            """,
+            (config.get('LLM_CACHE_MAX_ENTRIES', 50000),)
+        )
+
+    @staticmethod
+    def _count(key, tokens=0):
+        with LLMCache._lock:
+            LLMCache._stats[key] += 1
+            LLMCache._stats['tokens_saved'] += tokens or 0
+            return LLMCache._stats[key]
+
+    @staticmethod
+    def stats():
+        """Hit ratio and estimated tokens saved in this process, plus table-wide totals."""
+        with LLMCache._lock:
+            stats = dict(LLMCache._stats)
+        hits = stats['exact_hits'] + stats['semantic_hits']
+        stats['hit_ratio'] = round(hits / stats['lookups'], 3) if stats['lookups'] else 0.0
+        row = Database.query(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * (input_tokens + output_tokens)), 0) FROM llm_cache",
+            fetchone=True
+        )
+        stats['table'] = {'entries': row[0], 'hits': row[1], 'tokens_saved': row[2]}
+        return stats
@@ -0,0 +1,192 @@
+import re
+import json
+
+# Structured (JSON-mode) replies: a JSON Schema, translated per provider for
+# constrained decoding, and validated as the reply streams in.
+
+
+def schema_type(schema):
+    """(type, nullable) of a schema node; a ['string', 'null'] union is ('string', True)."""
+    types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+    return next(t for t in types if t != 'null'), 'null' in types
+
+
+def openai_response_format(schema):
+    """OpenAI structured outputs; strict mode needs every property required and additionalProperties false."""
+    return {
+        'type': 'json_schema',
+        'json_schema': {'name': schema.get('title', 'response'), 'schema': schema, 'strict': True}
+    }
+
+
+def gemini_schema(schema):
+    """Gemini's OpenAPI subset: upper-case types, `nullable` instead of type unions, no additionalProperties."""
+    kind, nullable = schema_type(schema)
+    result = {'type': kind.upper()}
+    if nullable:
+        result['nullable'] = True
+    if schema.get('description'):
+        result['description'] = schema['description']
+    if kind == 'object':
+        result['properties'] = {name: gemini_schema(field) for name, field in schema['properties'].items()}
+        result['required'] = list(schema.get('required', []))
+    elif kind == 'array':
+        result['items'] = gemini_schema(schema['items'])
+    return result
+
+
+class SchemaError(ValueError):
+    """An LLM reply that isn't valid JSON or doesn't match the schema."""
+
+
+NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def _default(schema):
+    kind, nullable = schema_type(schema)
+    if nullable:
+        return None
+    return {'string': '', 'integer': 0, 'array': []}.get(kind, {})
+
+
+def coerce(value, schema, path='$'):
+    """
+    Validates a value against a schema node, repairing the harmless mistakes
+    models make (null for a required field, "5 years" for an integer, a
+    number for a string). Raises SchemaError for anything else.
+    """
+    kind, nullable = schema_type(schema)
+    if value is None:
+        return None if nullable else _default(schema)
+    if kind == 'string':
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+    elif kind == 'integer':
+        if isinstance(value, bool):
+            pass
+        elif isinstance(value, (int, float)):
+            return int(round(value))
+        elif isinstance(value, str):
+            match = NUMBER_RE.search(value)
+            if match:
+                return int(round(float(match.group(0))))
+            if not value.strip():
+                return 0
+    elif kind == 'array':
+        if isinstance(value, str) and schema_type(schema['items'])[0] == 'string':
+            return [item.strip() for item in value.split(',') if item.strip()]
+        if isinstance(value, list):
+            return [coerce(item, schema['items'], f"{path}[{i}]") for i, item in enumerate(value)]
+    elif kind == 'object':
+        if isinstance(value, dict):
+            return {name: coerce(value.get(name), field, f"{path}.{name}") for name, field in schema['properties'].items()}
+    raise SchemaError(f"{path}: expected {kind}, got {type(value).__name__}")
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object reply as it streams in, one top-level field at a
+    time: each field is decoded and validated against the schema as soon as
+    its value is complete, so a stream can be cancelled at the first bad
+    field instead of after the whole reply. Text before the opening brace
+    and after the closing one (markdown fences, chatter) is ignored.
+
+        parser = IncrementalJSONParser(schema)
+        for chunk in stream:
+            parser.feed(chunk)  # raises SchemaError
+        data = parser.result()
+    """
+
+    def __init__(self, schema=None):
+        self.schema = schema
+        self.fields = {}
+        self.chars = 0
+        self._state = 'start'
+        self._buffer = []
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self):
+        return self._state == 'done'
+
+    def feed(self, text):
+        for char in text:
+            self.chars += 1
+            state = self._state
+            if state == 'value':
+                self._value_char(char)
+            elif state == 'start':
+                if char == '{':
+                    self._state = 'key'
+            elif state == 'key':
+                if char == '"':
+                    self._state, self._buffer, self._escaped = 'key_string', [], False
+                elif char == '}':
+                    self._state = 'done'
+                elif not (char.isspace() or char == ','):
+                    raise SchemaError(f"unexpected {char!r} where a field name should be")
+            elif state == 'key_string':
+                if char == '"' and not self._escaped:
+                    self._key = json.loads('"' + ''.join(self._buffer) + '"')
+                    self._state = 'colon'
+                else:
+                    self._escaped = char == '\\' and not self._escaped
+                    self._buffer.append(char)
+            elif state == 'colon':
+                if char == ':':
+                    self._state, self._buffer = 'value', []
+                    self._depth, self._in_string, self._escaped = 0, False, False
+                elif not char.isspace():
+                    raise SchemaError(f"expected ':' after {self._key!r}")
+        return self
+
+    def _value_char(self, char):
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == '\\':
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+        elif char == '"':
+            self._in_string = True
+        elif char in '[{':
+            self._depth += 1
+        elif char in ']}' and self._depth > 0:
+            self._depth -= 1
+        elif char in ',}' and self._depth == 0:
+            self._field(''.join(self._buffer))
+            self._state = 'done' if char == '}' else 'key'
+            return
+        self._buffer.append(char)
+
+    def _field(self, raw):
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            raise SchemaError(f"{self._key}: invalid JSON value {raw.strip()[:40]!r}")
+        if self.schema is None:
+            self.fields[self._key] = value
+            return
+        field_schema = self.schema['properties'].get(self._key)
+        if field_schema is not None:  # unknown fields are dropped
+            self.fields[self._key] = coerce(value, field_schema, self._key)
+
+    def result(self):
+        """The parsed object, with missing schema fields defaulted. Raises SchemaError if it never closed."""
+        if not self.done:
+            raise SchemaError("incomplete JSON object" if self._state != 'start' else "no JSON object in the reply")
+        if self.schema is None:
+            return dict(self.fields)
+        return {name: self.fields[name] if name in self.fields else _default(field)
+                for name, field in self.schema['properties'].items()}
+
+
+def loads(text, schema=None):
+    """Parses and validates a complete reply. Raises SchemaError."""
+    return IncrementalJSONParser(schema).feed(text).result()
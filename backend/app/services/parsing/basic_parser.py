@@ -0,0 +1,243 @@
+import re
+from app.services.skill_matcher import SKILL_DICTIONARY
+
+# Section headers in priority order: a short line containing any of the keys starts that section
+SECTION_HEADERS = [
+    ('education', re.compile(r'education|academic|qualifications')),
+    ('experience', re.compile(r'experience|work history|employment')),
+    ('projects', re.compile(r'projects')),
+    ('skills', re.compile(r'skills|technologies|competencies')),
+]
+HEADER_MAX_CHARS = 40
+
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Matches: +91 97696 86972, 97696 86972, +1-555-555-5555
+PHONE_RE = re.compile(r'(\+\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}|(\+\d{1,3}[\s.-]?)?\d{5}[\s.-]?\d{5}')
+YEARS_RE = re.compile(r'(\d+)\+?\s*years?', re.IGNORECASE)
+DATE_RE = re.compile(r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*\d{4})|(\d{4}\s*-\s*(?:present|current|\d{4}))', re.IGNORECASE)
+YEAR_RE = re.compile(r'\d{4}')
+DIGIT_RE = re.compile(r'\d')
+DEGREE_RE = re.compile(r'bachelor|master|b\.tech|m\.tech|phd|diploma|bsc|msc|bca|mca|university|college|institute|school')
+SKILL_SPLIT_RE = re.compile(r'[,|•]')
+
+# Dictionary skills are found by tokenizing once and looking tokens (and, for tokens that can
+# start a multi-word alias, the following n-grams) up in a table of SKILL_DICTIONARY aliases.
+# Tokens keep dots, so "js" never matches inside "node.js".
+SKILL_TOKEN_RE = re.compile(r'\.?[a-z0-9][a-z0-9+#.]*')
+
+
+def _skill_key(alias):
+    return ' '.join(t.rstrip('.') for t in SKILL_TOKEN_RE.findall(alias.lower()))
+
+
+SKILL_ALIASES = {_skill_key(alias): skill for skill, aliases in SKILL_DICTIONARY.items() for alias in aliases}
+SKILL_NGRAM_STARTS = {key.split(' ')[0]: key.count(' ') + 1 for key in sorted(SKILL_ALIASES, key=lambda k: k.count(' ')) if ' ' in key}
+
+NAME_SCAN_LINES = 10
+NOT_A_NAME = {'resume', 'curriculum', 'vitae', 'cv', 'profile', 'summary', 'education', 'experience', 'skills', 'projects', 'contact'}
+
+
+def section_of(line):
+    """The section a (stripped) header line starts, or None."""
+    if not line or len(line) >= HEADER_MAX_CHARS:
+        return None
+    line_lower = line.lower()
+    for section, pattern in SECTION_HEADERS:
+        if pattern.search(line_lower):
+            return section
+    return None
+
+
+def split_sections(text):
+    """
+    Splits text into [section, text] pairs in document order, by the same
+    header rule as ResumeScanner. Header lines stay with their section; lines
+    before the first header are the 'header' section (name, contact details).
+    """
+    sections = [['header', []]]
+    for line in text.split('\n'):
+        section = section_of(line.strip())
+        if section:
+            sections.append([section, []])
+        sections[-1][1].append(line)
+    return [[name, '\n'.join(lines)] for name, lines in sections if any(l.strip() for l in lines)]
+
+
+def is_likely_name(line):
+    """Check if a line is likely a name (not email, phone, header, or too long)"""
+    if line.count(' ') >= 5:
+        return False  # Names usually aren't sentences
+    if '@' in line or DIGIT_RE.search(line):
+        return False  # Email, phone or address
+    return line.lower() not in NOT_A_NAME
+
+
+def dictionary_skills(text):
+    """SKILL_DICTIONARY names found in the text, in order of first occurrence."""
+    tokens = [t.rstrip('.') for t in SKILL_TOKEN_RE.findall(text.lower())]
+    found = []
+    for i, token in enumerate(tokens):
+        skill = SKILL_ALIASES.get(token)
+        if skill:
+            found.append(skill)
+        longest = SKILL_NGRAM_STARTS.get(token)
+        if longest:
+            for n in range(2, longest + 1):
+                skill = SKILL_ALIASES.get(' '.join(tokens[i:i + n]))
+                if skill:
+                    found.append(skill)
+    return found
+
+
+class ResumeScanner:
+    """
+    Single-pass regex/keyword resume parser.
+
+    `scan()` walks the lines once as a small state machine: the current
+    section is switched by header lines, and each content line is handed to
+    that section's handler (education/experience entries are built as the
+    lines stream past). Email, phone and years of experience are single
+    compiled-regex searches over the text, and dictionary skills come from
+    one tokenizer pass. Nothing is split or compiled more than once.
+    """
+
+    def scan(self, text):
+        self.first_name = self.last_name = ''
+        self._entities(text)
+        self.section = None
+        self.section_lines = {'education': [], 'experience': [], 'projects': [], 'skills': []}
+        self.education, self.experience, self.section_skills = [], [], []
+        self._education_entry = self._experience_entry = None
+
+        named = False
+        nonblank = 0
+        for line in text.split('\n'):
+            stripped = line.strip()
+            if stripped:
+                nonblank += 1
+                if not named and nonblank <= NAME_SCAN_LINES and is_likely_name(stripped):
+                    self._set_name(stripped)
+                    named = True
+            section = section_of(stripped)
+            if section:
+                self.section = section
+                continue
+            if self.section:
+                self.section_lines[self.section].append(line)
+                getattr(self, '_' + self.section)(line)
+
+        return self._result(text)
+
+    def _set_name(self, line):
+        parts = line.split(' ')
+        self.first_name = parts[0]
+        self.last_name = ' '.join(parts[1:])
+
+    def _entities(self, text):
+        # One C-level search each over the whole text beats per-line searches when an entity is
+        # missing (every line would be searched), and keeps matches that span a line break
+        match = EMAIL_RE.search(text)
+        self.email = match.group(0) if match else None
+        match = PHONE_RE.search(text)
+        self.phone = match.group(0) if match else None
+        match = YEARS_RE.search(text)
+        self.experience_years = int(match.group(1)) if match else 0
+
+    def _education(self, line):
+        if DEGREE_RE.search(line.lower()):
+            self._education_entry = {'degree': line.strip(), 'school': '', 'year': ''}
+            self.education.append(self._education_entry)
+        elif self._education_entry:
+            # Assume next line is school or year
+            if YEAR_RE.search(line):
+                self._education_entry['year'] = line.strip()
+            elif not self._education_entry['school']:
+                self._education_entry['school'] = line.strip()
+
+    def _experience(self, line):
+        # Every date has a 4-digit year; checking for one first keeps the (slow) month
+        # alternation of DATE_RE off the description lines that make up most of the section
+        has_year = YEAR_RE.search(line) is not None
+
+        # Pipe separated lines often contain Role | Company | Date
+        if has_year and '|' in line:
+            parts = [p.strip() for p in line.split('|')]
+            date_part = next((p for p in parts if DATE_RE.search(p)), None)
+            if date_part:
+                self._experience_entry = {
+                    'title': parts[0], 'company': parts[1] if len(parts) > 1 else '', 'duration': date_part, 'description': ''
+                }
+                self.experience.append(self._experience_entry)
+                return
+
+        match = DATE_RE.search(line) if has_year else None
+        entry = self._experience_entry
+        if match:
+            self._experience_entry = {'title': 'Role', 'company': line.strip(), 'duration': match.group(0), 'description': ''}
+            self.experience.append(self._experience_entry)
+        elif entry:
+            if not entry['title'] or entry['title'] == 'Role':
+                entry['title'] = line.strip()
+            else:
+                entry['description'] += line.strip() + ' '
+
+    def _projects(self, line):
+        pass  # Only the raw section text is kept
+
+    def _skills(self, line):
+        for item in SKILL_SPLIT_RE.split(line):
+            item = item.strip()
+            if 2 < len(item) < 30:  # Reasonable length for a skill
+                self.section_skills.append(item)
+
+    def _section_text(self, section):
+        lines = self.section_lines[section]
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def _result(self, text):
+        if self.section_lines['experience']:
+            # The section text always ended in a newline, and its empty last line was parsed too
+            self._experience('')
+
+        education = self.education
+        if not education and self.section_lines['education']:
+            education_text = self._section_text('education')
+            if education_text.strip():
+                education = [{'degree': 'Education Details', 'school': education_text[:200], 'year': ''}]
+
+        experience = self.experience
+        if not experience and self.section_lines['experience']:
+            experience_text = self._section_text('experience')
+            if experience_text.strip():
+                experience = [{'title': 'Work Experience', 'company': '', 'duration': '', 'description': experience_text[:500]}]
+
+        projects_text = self._section_text('projects')
+        projects = [{'title': 'Project Details', 'description': projects_text[:500], 'link': ''}] if projects_text else []
+
+        # Skills section items first, then dictionary skills found anywhere in the text
+        skills = []
+        seen = set()
+        for skill in self.section_skills + dictionary_skills(text):
+            if skill.lower() not in seen:
+                seen.add(skill.lower())
+                skills.append(skill)
+
+        return {
+            'text': text,
+            'email': self.email,
+            'phone': self.phone,
+            'skills': skills,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'experience_years': self.experience_years,
+            'headline': f"{self.first_name} {self.last_name} - Resume",  # Default headline
+            'summary': text[:500] + "...",
+            'education': education,
+            'experience': experience,
+            'projects': projects,
+            'languages': []
+        }
+
+
+def parse_basic(text):
+    return ResumeScanner().scan(text)
@@ -0,0 +1,217 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.services.llm_provider.llm import is_rate_limited
+from app.services.parsing import prompt_builder
+from app.services.parsing.resume_parser import ResumeParser, LLM_FIELDS
+from app.services.parsing.resume_schema import RESUME_SCHEMA, BATCH_SCHEMA
+
+BATCH_PROMPT = """
+You are an expert ATS Resume Parser. Below are {count} resumes, each starting with a line "=== RESUME <id> ===".
+Extract the following details from every resume and return ONLY a valid JSON object {"resumes": [...]} with one
+object per resume, in the same order. Each object must have "resume_id" (the <id> from its header line) plus these fields.
+Do not include markdown formatting like ```json ... ```. Just the raw JSON string.
+
+Fields to extract:
+""" + LLM_FIELDS + """
+Resumes:
+{resumes}
+"""
+
+CHARS_PER_TOKEN = 4  # reply tokens are estimated; prompts are counted with prompt_builder.count_tokens
+OUTPUT_TOKENS_PER_RESUME = 800  # same budget as a single ResumeParser LLM call
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursting to `capacity`.
+    `acquire(n)` blocks until n tokens are available. A rate of 0 disables it.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n=1):
+        if not self.rate:
+            return
+        n = min(n, self.capacity)  # an oversized request waits for a full bucket rather than forever
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchResumeParser:
+    """
+    Parses many resume texts with the configured LLM, for bulk imports.
+
+    Requests run on `concurrency` threads (calls are network-bound), paced by
+    two token buckets: requests per minute and estimated tokens per minute.
+    Requests still rate-limited after LLMProvider's own retries are retried
+    here with longer exponential backoff and jitter.
+    With `pack_size` > 1, resumes shorter than `pack_max_chars` are packed
+    several to a prompt that asks for a JSON array; a pack whose reply can't
+    be matched up is retried one resume per request. Requests use the
+    provider's structured-output mode and replies are validated against the
+    resume schema. Anything the LLM still
+    can't parse falls back to the regex parser, marked incomplete like
+    ResumeParser._parse does.
+    """
+
+    def __init__(self, concurrency=4, requests_per_minute=60, tokens_per_minute=0, pack_size=1, pack_max_chars=2500,
+                 max_retries=5, cost_per_1k_input=0.0, cost_per_1k_output=0.0):
+        self.concurrency = max(1, concurrency)
+        self.requests = TokenBucket(requests_per_minute / 60.0, max(1, requests_per_minute // 6))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, max(1, tokens_per_minute // 6))
+        self.pack_size = max(1, pack_size)
+        self.pack_max_chars = pack_max_chars
+        self.max_retries = max_retries
+        self.cost_per_1k_input = cost_per_1k_input
+        self.cost_per_1k_output = cost_per_1k_output
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            concurrency=config.get('LLM_BATCH_CONCURRENCY', 4),
+            requests_per_minute=config.get('LLM_REQUESTS_PER_MINUTE', 60),
+            tokens_per_minute=config.get('LLM_TOKENS_PER_MINUTE', 0),
+            pack_size=config.get('LLM_BATCH_PACK_SIZE', 1),
+            pack_max_chars=config.get('LLM_BATCH_PACK_MAX_CHARS', 2500),
+            max_retries=config.get('LLM_MAX_RETRIES', 5),
+            cost_per_1k_input=config.get('LLM_COST_PER_1K_INPUT', 0.0),
+            cost_per_1k_output=config.get('LLM_COST_PER_1K_OUTPUT', 0.0)
+        )
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {
+                'resumes': 0, 'parsed': 0, 'fallbacks': 0, 'requests': 0, 'packed_requests': 0, 'retries': 0,
+                'rate_limited': 0, 'input_tokens': 0, 'output_tokens': 0, 'seconds': 0.0
+            }
+
+    def parse_many(self, texts):
+        """
+        Parses {key: text}. Returns {key: (data, complete)}; complete is False
+        for regex fallbacks, so callers can skip caching them.
+        """
+        from app.services.llm_provider.llm import LLMProvider
+
+        start = time.perf_counter()
+        app = current_app._get_current_object()
+        llm = LLMProvider()
+        results = {}
+
+        def run(group):
+            with app.app_context():
+                results.update(self._parse_group(llm, group))
+
+        groups = self._groups(texts)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for future in [executor.submit(run, group) for group in groups]:
+                future.result()
+
+        with self._stats_lock:
+            self._stats['resumes'] += len(texts)
+            self._stats['seconds'] += time.perf_counter() - start
+        return results
+
+    def _groups(self, texts):
+        groups, pack = [], []
+        for key, text in texts.items():
+            if self.pack_size > 1 and len(text) <= self.pack_max_chars:
+                pack.append((key, text))
+                if len(pack) == self.pack_size:
+                    groups.append(pack)
+                    pack = []
+            else:
+                groups.append([(key, text)])
+        return groups + ([pack] if pack else [])
+
+    def _parse_group(self, llm, group):
+        if len(group) > 1:
+            try:
+                return self._parse_pack(llm, group)
+            except Exception as e:
+                print(f"WARNING: Packed parse of {len(group)} resumes failed ({e}); retrying them one by one.")
+        results = {}
+        for key, text in group:
+            try:
+                prompts = ResumeParser.llm_prompts(text)['prompts']
+                parts = [ResumeParser.parse_llm_response(self._call(llm, prompt, 1, RESUME_SCHEMA)) for prompt in prompts]
+                data = parts[0] if len(parts) == 1 else prompt_builder.merge_parses(parts)
+                results[key] = (data, True)
+                self._count('parsed')
+            except Exception as e:
+                print(f"WARNING: LLM Parsing failed for {key} ({e}). Falling back to basic parser.")
+                results[key] = (ResumeParser.parse_basic(text), False)
+                self._count('fallbacks')
+        return results
+
+    def _parse_pack(self, llm, group):
+        # Only resumes under pack_max_chars are packed, so they fit the token budget whole
+        resumes = '\n'.join(f"=== RESUME {i} ===\n{text}" for i, (_, text) in enumerate(group))
+        prompt = BATCH_PROMPT.replace('{count}', str(len(group))).replace('{resumes}', resumes)
+        reply = self._call(llm, prompt, len(group), BATCH_SCHEMA, packed=True)
+        by_id = {item['resume_id']: item for item in ResumeParser.parse_llm_response(reply, BATCH_SCHEMA)['resumes']}
+        if len(by_id) != len(group):
+            raise ValueError(f"expected {len(group)} resumes in the reply, got {len(by_id)}")
+        results = {}
+        for i, (key, _) in enumerate(group):
+            data = by_id[str(i)]
+            data.pop('resume_id', None)
+            results[key] = (data, True)
+        self._count('parsed', len(group))
+        return results
+
+    def _call(self, llm, prompt, resumes, schema, packed=False):
+        input_tokens = prompt_builder.count_tokens(prompt)
+        max_tokens = OUTPUT_TOKENS_PER_RESUME * resumes
+        for attempt in range(self.max_retries + 1):
+            self.requests.acquire()
+            self.tokens.acquire(input_tokens + max_tokens)
+            self._count('requests')
+            if packed:
+                self._count('packed_requests')
+            try:
+                response = llm.chat([{'role': 'user', 'content': prompt}], max_tokens=max_tokens, schema=schema)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self._count('rate_limited')
+                self._count('retries')
+                # Exponential backoff with full jitter, so concurrent threads don't retry in lockstep
+                time.sleep(random.uniform(0, min(60.0, 2.0 ** attempt)))
+                continue
+            self._count('input_tokens', input_tokens)
+            self._count('output_tokens', len(response) // CHARS_PER_TOKEN)
+            return response
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    def stats(self):
+        """Throughput and estimated cost (tokens are estimated from characters)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        minutes = stats['seconds'] / 60.0
+        stats['seconds'] = round(stats['seconds'], 1)
+        stats['resumes_per_minute'] = round(stats['resumes'] / minutes, 1) if minutes else 0.0
+        stats['estimated_cost'] = round(
+            stats['input_tokens'] / 1000.0 * self.cost_per_1k_input + stats['output_tokens'] / 1000.0 * self.cost_per_1k_output, 4
+        )
+        return stats
@@ -0,0 +1,303 @@
+import io
+import os
+import re
+import time
+import zipfile
+from html.parser import HTMLParser
+
+SNIFF_BYTES = 8192
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+RTF_MAGIC = b'{\\rtf'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # legacy binary .doc
+UTF16_BOMS = (b'\xff\xfe', b'\xfe\xff')
+HTML_RE = re.compile(
+    rb'^\s*(?:<\?xml[^>]*>\s*)?(?:<!--.*?-->\s*)*<(?:!doctype\s+html|html|head|body|meta|title)[\s>]',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+class ExtractionError(Exception):
+    """The document can't be extracted: unknown format, over a limit, timed out or corrupt."""
+
+
+class Extractor:
+    """
+    A text extraction backend. `matches()` decides from the leading bytes
+    (not the file extension) whether the backend handles a document.
+
+    Limits are declared per backend: `max_bytes` is checked before any
+    parsing, `timeout` seconds is a deadline passed to `extract()` (checked
+    between pages, paragraphs or chunks), and `max_memory_mb` is the address
+    space budget used where extraction runs in a sandboxed subprocess.
+    """
+    name = None
+    timeout = 30
+    max_bytes = 16 * 1024 * 1024
+    max_memory_mb = 512
+
+    def matches(self, head, file_path, data):
+        raise NotImplementedError
+
+    def extract(self, file_path, data, deadline, **options):
+        raise NotImplementedError
+
+    @staticmethod
+    def check_deadline(deadline, what):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{what} timed out")
+
+    @staticmethod
+    def read(file_path, data):
+        if data is not None:
+            return data
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+
+# Backends in sniffing order; the first match wins
+EXTRACTORS = []
+
+
+def register(cls):
+    """Class decorator adding an Extractor backend to the registry."""
+    EXTRACTORS.append(cls())
+    return cls
+
+
+def get(name):
+    return next((e for e in EXTRACTORS if e.name == name), None)
+
+
+def _head(file_path, data):
+    if data is not None:
+        return bytes(data[:SNIFF_BYTES])
+    with open(file_path, 'rb') as f:
+        return f.read(SNIFF_BYTES)
+
+
+def sniff(file_path, data=None):
+    """Returns the Extractor for the document's content, or None if no backend handles it."""
+    head = _head(file_path, data)
+    return next((e for e in EXTRACTORS if e.matches(head, file_path, data)), None)
+
+
+def check_size(extractor, file_path, data=None):
+    size = len(data) if data is not None else os.path.getsize(file_path)
+    if size > extractor.max_bytes:
+        raise ExtractionError(f"{extractor.name} file of {size} bytes is over the {extractor.max_bytes} byte limit")
+
+
+def extract_text(file_path, data=None, **options):
+    """
+    Extracts text with the backend chosen by sniffing, enforcing its size and
+    time limits. Options (e.g. max_pages, max_chars for PDFs) go to the backend.
+    Raises ExtractionError.
+    """
+    extractor = sniff(file_path, data)
+    if extractor is None:
+        if _head(file_path, data).startswith(OLE_MAGIC):
+            raise ExtractionError("Legacy Word (.doc) files are not supported; save the file as .docx or PDF")
+        raise ExtractionError("Unsupported or unrecognised document format")
+
+    check_size(extractor, file_path, data)
+    deadline = time.monotonic() + extractor.timeout
+    try:
+        return extractor.extract(file_path, data, deadline, **options)
+    except TimeoutError as e:
+        raise ExtractionError(f"{extractor.name} extraction timed out after {extractor.timeout}s ({e})")
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"{extractor.name} extraction failed: {e}")
+
+
+@register
+class PdfExtractor(Extractor):
+    name = 'pdf'
+    timeout = 60
+    max_memory_mb = 1024
+
+    def matches(self, head, file_path, data):
+        # The spec allows up to 1 KB of junk before the header
+        return PDF_MAGIC in head[:1024]
+
+    def extract(self, file_path, data, deadline, max_pages=None, max_chars=None, workers=1, parallel_min_pages=16,
+                private_pool=False):
+        from app.services.parsing import pdf_text
+        return pdf_text.extract_text(
+            file_path, data, max_pages=max_pages, max_chars=max_chars,
+            workers=workers, parallel_min_pages=parallel_min_pages, deadline=deadline, private_pool=private_pool
+        )
+
+
+@register
+class DocxExtractor(Extractor):
+    name = 'docx'
+    timeout = 30
+
+    def matches(self, head, file_path, data):
+        if not head.startswith(ZIP_MAGIC):
+            return False
+        try:
+            with zipfile.ZipFile(io.BytesIO(data) if data is not None else file_path) as archive:
+                return 'word/document.xml' in archive.namelist()
+        except zipfile.BadZipFile:
+            return False
+
+    def extract(self, file_path, data, deadline, **options):
+        import docx
+        document = docx.Document(io.BytesIO(data) if data is not None else file_path)
+        parts = []
+        for i, para in enumerate(document.paragraphs):
+            if i % 200 == 0:
+                self.check_deadline(deadline, "DOCX extraction")
+            parts.append(para.text + "\n")
+        return "".join(parts)
+
+
+@register
+class RtfExtractor(Extractor):
+    name = 'rtf'
+    timeout = 20
+
+    # Destinations whose content is not document text
+    SKIP_DESTINATIONS = {
+        'fonttbl', 'colortbl', 'stylesheet', 'info', 'pict', 'object', 'header', 'footer', 'headerl', 'headerr',
+        'footerl', 'footerr', 'datastore', 'themedata', 'listtable', 'listoverridetable', 'rsidtbl', 'generator',
+        'xmlnstbl', 'latentstyles', 'colorschememapping', 'fldinst', 'filetbl', 'revtbl', 'mmathpr'
+    }
+    SPECIAL = {'par': '\n', 'line': '\n', 'sect': '\n', 'page': '\n', 'tab': '\t', 'cell': ' ', 'row': '\n',
+               'emdash': '\u2014', 'endash': '\u2013', 'bullet': '\u2022', 'lquote': '\u2018', 'rquote': '\u2019',
+               'ldblquote': '\u201c', 'rdblquote': '\u201d'}
+    TOKEN_RE = re.compile(r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([\s\S])|([{}])|[\r\n]+|([^\\{}\r\n]+)", re.IGNORECASE)
+
+    def matches(self, head, file_path, data):
+        return head.lstrip().startswith(RTF_MAGIC)
+
+    def extract(self, file_path, data, deadline, **options):
+        source = self.read(file_path, data).decode('latin-1')
+        out = []
+        stack = []
+        skip = False
+        uc_skip = 1
+        pending_skip = 0
+        for n, match in enumerate(self.TOKEN_RE.finditer(source)):
+            if n % 10000 == 0:
+                self.check_deadline(deadline, "RTF extraction")
+            word, arg, hex_char, symbol, brace, text = match.groups()
+            if brace == '{':
+                stack.append((skip, uc_skip))
+            elif brace == '}':
+                skip, uc_skip = stack.pop() if stack else (False, 1)
+            elif symbol is not None:
+                if symbol == '*':
+                    skip = True  # {\* ...} destinations are optional and ignorable
+                elif skip:
+                    continue
+                elif symbol in '\\{}':
+                    out.append(symbol)
+                elif symbol == '~':
+                    out.append('\u00a0')
+                elif symbol in '\r\n':
+                    out.append('\n')
+            elif word is not None:
+                word = word.lower()
+                if word in self.SKIP_DESTINATIONS:
+                    skip = True
+                elif word == 'uc':
+                    uc_skip = int(arg or 1)
+                elif word == 'u' and arg and not skip:
+                    code = int(arg)
+                    out.append(chr(code + 65536 if code < 0 else code))
+                    pending_skip = uc_skip
+                elif word in self.SPECIAL and not skip:
+                    out.append(self.SPECIAL[word])
+            elif hex_char is not None:
+                if pending_skip:
+                    pending_skip -= 1
+                elif not skip:
+                    out.append(bytes([int(hex_char, 16)]).decode('cp1252', errors='replace'))
+            elif text is not None and not skip:
+                if pending_skip:
+                    dropped = min(pending_skip, len(text))
+                    text = text[dropped:]
+                    pending_skip -= dropped
+                out.append(text)
+        return ''.join(out)
+
+
+class _HTMLText(HTMLParser):
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'article', 'header', 'footer', 'table', 'ul', 'ol'}
+    SKIP_TAGS = {'script', 'style', 'head', 'noscript', 'template', 'svg'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+@register
+class HtmlExtractor(Extractor):
+    name = 'html'
+    timeout = 20
+    max_bytes = 8 * 1024 * 1024
+    CHUNK_CHARS = 64 * 1024
+
+    def matches(self, head, file_path, data):
+        return bool(HTML_RE.match(head.lstrip(b'\xef\xbb\xbf')))
+
+    def extract(self, file_path, data, deadline, **options):
+        source = decode_text(self.read(file_path, data))
+        parser = _HTMLText()
+        for start in range(0, len(source), self.CHUNK_CHARS):
+            self.check_deadline(deadline, "HTML extraction")
+            parser.feed(source[start:start + self.CHUNK_CHARS])
+        parser.close()
+        text = ''.join(parser.parts)
+        return re.sub(r'\n\s*\n+', '\n', re.sub(r'[ \t\xa0]+', ' ', text))
+
+
+def decode_text(raw):
+    if raw[:2] in UTF16_BOMS:
+        return raw.decode('utf-16', errors='replace')
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace')
+
+
+@register
+class TextExtractor(Extractor):
+    name = 'text'
+    timeout = 10
+    max_bytes = 4 * 1024 * 1024
+
+    def matches(self, head, file_path, data):
+        if head[:2] in UTF16_BOMS:
+            return True
+        if b'\x00' in head:
+            return False
+        # Mostly printable: reject other binary formats
+        printable = sum(1 for b in head if b >= 32 or b in (9, 10, 13))
+        return bool(head) and printable / len(head) > 0.95
+
+    def extract(self, file_path, data, deadline, **options):
+        return decode_text(self.read(file_path, data))
@@ -0,0 +1,112 @@
+import json
+import hashlib
+from flask import current_app
+from app.db import Database
+
+
+class ParseCache:
+    """
+    Extracted text and parsed JSON per (file content hash, parser version), in
+    the parse_cache table.
+
+    The version is a digest of PARSER_VERSION, the LLM prompt and the
+    provider/model that would parse the file, so editing any of them starts a
+    fresh cache instead of serving results from the old parser. Entries of
+    older versions are never read again; `purge_stale()` (run by
+    purge_parse_cache.py) deletes them once unused for PARSE_CACHE_STALE_TTL.
+    """
+
+    @staticmethod
+    def version():
+        from app.services.parsing.resume_parser import ResumeParser, PARSER_VERSION, LLM_PROMPT
+
+        config = current_app.config
+        if ResumeParser.llm_enabled():
+            provider = config.get('LLM_PROVIDER')
+            if provider == 'local_llama':
+                provider += ':' + config.get('OLLAMA_MODEL', 'llama3')
+            # How much of a long resume reaches the LLM (see prompt_builder)
+            provider += f":{config.get('LLM_RESUME_TOKEN_BUDGET', 1500)}/{config.get('LLM_MAP_REDUCE_TOKENS', 4000)}/{config.get('LLM_MAX_CHUNKS', 4)}"
+        else:
+            provider = 'basic'
+        return hashlib.sha256(f"{PARSER_VERSION}\0{provider}\0{LLM_PROMPT}".encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def file_hash(file_path):
+        # Blob store paths already carry their content hash
+        from app.services.blob_store import BlobStore
+        content_hash = BlobStore.from_config(current_app.config).hash_of(file_path)
+        if content_hash:
+            return content_hash
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_for(file_path):
+        return ParseCache.file_hash(file_path), ParseCache.version()
+
+    @staticmethod
+    def get(key):
+        """Returns (text, parsed_data) or None."""
+        if not current_app.config.get('PARSE_CACHE_ENABLED', True):
+            return None
+        row = Database.query(
+            """
+            UPDATE parse_cache SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP
+            WHERE content_hash = %s AND version = %s
+            RETURNING extracted_text, parsed_data
+            """,
+            key,
+            fetchone=True,
+            commit=True
+        )
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    @staticmethod
+    def put(key, text, parsed_data):
+        if not current_app.config.get('PARSE_CACHE_ENABLED', True):
+            return
+        Database.execute(
+            """
+            INSERT INTO parse_cache (content_hash, version, extracted_text, parsed_data)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (content_hash, version) DO UPDATE
+            SET extracted_text = EXCLUDED.extracted_text, parsed_data = EXCLUDED.parsed_data
+            """,
+            (key[0], key[1], text.replace('\x00', ''), json.dumps(parsed_data, default=str))
+        )
+
+    @staticmethod
+    def purge_stale(max_age=None):
+        """
+        Deletes entries written by other parser versions that haven't been
+        used for `max_age` seconds (PARSE_CACHE_STALE_TTL by default), so
+        workers still running the previous version keep their cache during a
+        rolling deploy. Returns the number removed.
+        """
+        if max_age is None:
+            max_age = current_app.config.get('PARSE_CACHE_STALE_TTL', 7 * 24 * 3600)
+        with Database.transaction() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM parse_cache
+                WHERE version <> %s
+                  AND COALESCE(last_hit_at, created_at) < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                """,
+                (ParseCache.version(), max_age)
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def stats():
+        row = Database.query(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM parse_cache WHERE version = %s",
+            (ParseCache.version(),),
+            fetchone=True
+        )
+        return {'version': ParseCache.version(), 'entries': row[0], 'hits': int(row[1])}
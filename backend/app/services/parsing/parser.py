@@ -1,37 +0,0 @@
-import fitz  # PyMuPDF
-import docx
-import os
-
-def parse_pdf(file_path):
-    text = ""
-    try:
-        doc = fitz.open(file_path)
-        for page in doc:
-            text += page.get_text()
-    except Exception as e:
-        print(f"Error parsing PDF {file_path}: {e}")
-    return text
-
-def parse_docx(file_path):
-    text = ""
-    try:
-        doc = docx.Document(file_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-    except Exception as e:
-        print(f"Error parsing DOCX {file_path}: {e}")
-    return text
-
-def parse_file(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == '.pdf':
-        return parse_pdf(file_path)
-    elif ext in ['.docx', '.doc']:
-        return parse_docx(file_path)
-    else:
-        # Fallback for text files
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            return ""
@@ -0,0 +1,114 @@
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+import fitz  # PyMuPDF
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _open(file_path, data=None):
+    return fitz.open(stream=data, filetype='pdf') if data is not None else fitz.open(file_path)
+
+
+def iter_pages(file_path, data=None, first_page=0, max_pages=None, max_chars=None, deadline=None):
+    """
+    Yields the text of each page in order, opening the document once. Stops
+    after `max_pages` pages or once `max_chars` characters have been yielded,
+    so callers that only need the head of a long CV don't render the rest.
+    Raises TimeoutError between pages once time.monotonic() passes `deadline`.
+    """
+    with _open(file_path, data) as doc:
+        last_page = doc.page_count if max_pages is None else min(doc.page_count, first_page + max_pages)
+        chars = 0
+        for number in range(first_page, last_page):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"PDF extraction timed out after {number - first_page} pages")
+            text = doc.load_page(number).get_text()
+            yield text
+            chars += len(text)
+            if max_chars is not None and chars >= max_chars:
+                return
+
+
+def page_count(file_path, data=None):
+    with _open(file_path, data) as doc:
+        return doc.page_count
+
+
+def _extract_range(file_path, data, first_page, last_page, timeout=None):
+    # Runs in a pool process; each process opens its own copy of the document
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    return ''.join(iter_pages(file_path, data, first_page, last_page - first_page, deadline=deadline))
+
+
+def _get_pool(workers):
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: the caller may hold DB connections or model threads that must not be forked
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _terminate(pool):
+    """Cancels a pool's queued ranges and kills its processes, e.g. one stuck on a page past the deadline."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None  # the next long PDF starts a fresh shared pool
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def extract_text(file_path, data=None, max_pages=None, max_chars=None, workers=1, parallel_min_pages=16, deadline=None,
+                 private_pool=False):
+    """
+    Extracts a PDF's text, joined once. Documents with at least
+    `parallel_min_pages` pages (in range) are split into contiguous page
+    ranges and extracted across a process pool of `workers` processes;
+    shorter ones, or calls with `max_chars`, are extracted serially since
+    process hand-off costs more than a few pages of text.
+
+    The pool is shared by the process unless `private_pool`, which forks one
+    for this call (the extraction sandbox does, so the pool processes run
+    under the document's limits). A range that fails or passes `deadline`
+    terminates the pool rather than leaving its processes busy.
+    """
+    if workers > 1 and max_chars is None:
+        total = page_count(file_path, data)
+        last_page = total if max_pages is None else min(total, max_pages)
+        if last_page >= parallel_min_pages:
+            step = -(-last_page // workers)
+            if private_pool:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+            else:
+                pool = _get_pool(workers)
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            try:
+                futures = [
+                    pool.submit(_extract_range, file_path, data, first, min(first + step, last_page), timeout)
+                    for first in range(0, last_page, step)
+                ]
+                # The pool processes check the deadline between pages; this also covers a single hung page
+                pages = []
+                for future in futures:
+                    remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                    try:
+                        pages.append(future.result(timeout=remaining))
+                    except FutureTimeout:
+                        raise TimeoutError(f"PDF extraction timed out after {len(pages) * step} pages")
+            except BaseException:
+                _terminate(pool)
+                raise
+            if private_pool:
+                pool.shutdown()
+            return ''.join(pages)
+
+    text = ''.join(iter_pages(file_path, data, max_pages=max_pages, max_chars=max_chars, deadline=deadline))
+    return text if max_chars is None else text[:max_chars]
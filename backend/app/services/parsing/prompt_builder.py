@@ -0,0 +1,189 @@
+import re
+from app.services.parsing.basic_parser import split_sections
+
+try:
+    import tiktoken
+except ImportError:  # optional; token counts are then estimated
+    tiktoken = None
+
+# Context windows (tokens) of the models LLMProvider uses, when LLM_CONTEXT_TOKENS isn't set
+CONTEXT_TOKENS = {'gemini': 1000000, 'openai': 128000, 'local_llama': 8192}
+OUTPUT_TOKENS = 800  # reserved for the reply, same as LLMProvider.chat's default max_tokens
+
+# Sections placed first when a resume doesn't fit. The short ones go before experience,
+# each capped at SMALL_SECTION_SHARE of the budget, and experience (most recent jobs first)
+# is cut to whatever is left.
+SECTION_PRIORITY = ('header', 'skills', 'education', 'projects', 'experience')
+SMALL_SECTION_SHARE = 0.25
+
+TOKEN_ESTIMATE_RE = re.compile(r"\w+|[^\w\s]")
+_encoding = None
+
+
+def count_tokens(text):
+    """
+    Prompt tokens: exact with tiktoken (cl100k_base, close enough for every
+    provider here), otherwise estimated as words and punctuation marks, with
+    long words counted per 4 characters.
+    """
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        return len(_encoding.encode(text, disallowed_special=()))
+    return sum(-(-len(token) // 4) for token in TOKEN_ESTIMATE_RE.findall(text))
+
+
+def _fit(text, budget):
+    """The longest run of whole leading lines of text within budget tokens."""
+    kept, used = [], 0
+    for line in text.split('\n'):
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            break
+        kept.append(line)
+        used += tokens
+    return '\n'.join(kept), used
+
+
+def _priority(sections):
+    """Section indexes in SECTION_PRIORITY order (document order within a rank)."""
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    return sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], len(SECTION_PRIORITY)), i))
+
+
+def select_sections(text, budget):
+    """
+    Fits a resume into `budget` tokens: sections are taken in
+    SECTION_PRIORITY order, those before experience capped at
+    SMALL_SECTION_SHARE of the budget, and a section that doesn't fit is cut
+    at a line boundary. What is kept is emitted in document order. Returns
+    (text, dropped or truncated section names).
+    """
+    sections = split_sections(text)
+    kept = {}
+    dropped = []
+    remaining = budget
+    for i in _priority(sections):
+        name, body = sections[i]
+        limit = remaining
+        if name in SECTION_PRIORITY[:SECTION_PRIORITY.index('experience')] and name != 'header':
+            limit = min(remaining, int(budget * SMALL_SECTION_SHARE))
+        tokens = count_tokens(body) + 1
+        if tokens <= limit:
+            kept[i] = body
+            remaining -= tokens
+        elif limit > 50:
+            kept[i], used = _fit(body, limit)
+            remaining -= used
+            dropped.append(name + ' (truncated)')
+        else:
+            dropped.append(name)
+    return '\n'.join(kept[i] for i in sorted(kept)), dropped
+
+
+def chunk_sections(text, budget, max_chunks):
+    """
+    Splits a long resume into at most `max_chunks` chunks of whole sections
+    (sections longer than the budget are split by lines), each within
+    `budget` tokens, for map-reduce. The header section is repeated in every
+    chunk so each partial parse knows whose resume it is.
+    """
+    sections = split_sections(text)
+    header = sections[0][1] if sections and sections[0][0] == 'header' else ''
+    header, header_tokens = _fit(header, budget // 4)
+    budget -= header_tokens
+
+    # Short sections first, so they land in the first chunk and survive the max_chunks cap
+    pieces = []
+    for i in _priority(sections):
+        name, body = sections[i]
+        if name == 'header':
+            continue
+        lines = body.split('\n')
+        while lines:
+            piece, used = _fit('\n'.join(lines), budget)
+            if not piece:  # a single line longer than the budget
+                piece, used = lines[0][:budget * 4], budget
+            taken = piece.count('\n') + 1
+            pieces.append((piece, used))
+            lines = lines[taken:]
+
+    chunks, current, used = [], [], 0
+    for piece, tokens in pieces:
+        if current and used + tokens > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(piece)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return ['\n'.join([header] + chunk) if header else '\n'.join(chunk) for chunk in chunks[:max_chunks]] or [header]
+
+
+def build_prompts(text, template, provider=None, budget=1500, context_tokens=None, map_reduce_tokens=4000, max_chunks=4):
+    """
+    Plans the LLM prompt(s) for one resume. `template` has a {text}
+    placeholder. Strategies:
+      full        the whole text fits in `budget` tokens
+      sections    up to `map_reduce_tokens`: the most informative sections
+                  that fit the budget (select_sections)
+      map_reduce  longer: up to `max_chunks` section-aligned chunks, each
+                  parsed separately and combined with merge_parses()
+    The budget is also capped by the provider's context window minus the
+    template and the reply. Returns a dict with the prompts, the strategy,
+    token counts and any dropped sections.
+    """
+    template_tokens = count_tokens(template.replace('{text}', ''))
+    context = context_tokens or CONTEXT_TOKENS.get(provider, 8192)
+    budget = max(200, min(budget, context - template_tokens - OUTPUT_TOKENS))
+    text_tokens = count_tokens(text)
+
+    dropped = []
+    if text_tokens <= budget:
+        strategy, parts = 'full', [text]
+    elif text_tokens <= map_reduce_tokens:
+        selected, dropped = select_sections(text, budget)
+        strategy, parts = 'sections', [selected]
+    else:
+        strategy, parts = 'map_reduce', chunk_sections(text, budget, max_chunks)
+
+    prompts = [template.replace('{text}', part) for part in parts]
+    return {
+        'strategy': strategy,
+        'prompts': prompts,
+        'text_tokens': text_tokens,
+        'prompt_tokens': sum(count_tokens(part) for part in parts) + template_tokens * len(parts),
+        'dropped': dropped
+    }
+
+
+def _key(item):
+    return tuple(str(v).strip().lower() for v in item.values()) if isinstance(item, dict) else str(item).strip().lower()
+
+
+def merge_parses(parts):
+    """
+    Reduce step of map_reduce: combines partial parses of one resume. Scalars
+    come from the first chunk that has them (the first chunk holds the top of
+    the resume), lists are concatenated without duplicates, and
+    experience_years is the largest estimate.
+    """
+    merged = {}
+    for part in parts:
+        for field, value in part.items():
+            if isinstance(value, list):
+                existing = merged.setdefault(field, [])
+                seen = set(_key(item) for item in existing)
+                for item in value:
+                    if _key(item) not in seen:
+                        seen.add(_key(item))
+                        existing.append(item)
+            elif field == 'experience_years':
+                try:
+                    merged[field] = max(int(merged.get(field) or 0), int(value or 0))
+                except (TypeError, ValueError):
+                    merged.setdefault(field, value)
+            elif value not in (None, '') and merged.get(field) in (None, ''):
+                merged[field] = value
+    return merged
@@ -0,0 +1,80 @@
+from app.services.llm_provider.structured import schema_type
+
+
+def _string(description=None, nullable=False):
+    schema = {'type': ['string', 'null'] if nullable else 'string'}
+    if description:
+        schema['description'] = description
+    return schema
+
+
+def _object(*fields):
+    # Strict structured outputs (OpenAI) need every property required and no extras
+    return {
+        'type': 'object',
+        'properties': {name: {'type': 'string'} for name in fields},
+        'required': list(fields),
+        'additionalProperties': False
+    }
+
+
+# The parsed resume, defined once: the LLM prompt's field list, every provider's
+# structured-output schema and the validation of replies are all derived from it.
+RESUME_SCHEMA = {
+    'title': 'resume',
+    'type': 'object',
+    'properties': {
+        'first_name': _string('infer from top of resume'),
+        'last_name': _string(),
+        'email': _string(),
+        'phone': _string(),
+        'linkedin_url': _string('null if not found', nullable=True),
+        'portfolio_url': _string('null if not found', nullable=True),
+        'headline': _string('a professional headline e.g. "Senior Java Developer"'),
+        'summary': _string('a brief professional summary'),
+        'skills': {'type': 'array', 'items': {'type': 'string'}},
+        'experience_years': {'type': 'integer', 'description': 'estimate total years of work experience'},
+        'education': {'type': 'array', 'items': _object('degree', 'school', 'year')},
+        'experience': {'type': 'array', 'items': _object('title', 'company', 'duration', 'description')},
+        'projects': {'type': 'array', 'items': _object('title', 'description', 'link')},
+        'languages': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'additionalProperties': False
+}
+RESUME_SCHEMA['required'] = list(RESUME_SCHEMA['properties'])
+
+
+def describe(schema):
+    """The schema's fields as the '- name (type, description)' lines used in prompts."""
+    lines = []
+    for name, field in schema['properties'].items():
+        kind, _ = schema_type(field)
+        if kind == 'array':
+            items = field['items']
+            if schema_type(items)[0] == 'object':
+                kind = 'list of objects: { ' + ', '.join(f'"{k}": string' for k in items['properties']) + ' }'
+            else:
+                kind = 'list of strings'
+        lines.append(f"- {name} ({kind}{', ' + field['description'] if field.get('description') else ''})")
+    return '\n'.join(lines) + '\n'
+
+
+# Packed batch replies (see batch_parser): one resume object per "=== RESUME <id> ===" block.
+# Wrapped in an object since structured outputs need an object at the top level.
+BATCH_SCHEMA = {
+    'title': 'resumes',
+    'type': 'object',
+    'properties': {
+        'resumes': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': dict(resume_id={'type': 'string'}, **RESUME_SCHEMA['properties']),
+                'required': ['resume_id'] + RESUME_SCHEMA['required'],
+                'additionalProperties': False
+            }
+        }
+    },
+    'required': ['resumes'],
+    'additionalProperties': False
+}
@@ -0,0 +1,251 @@
+import os
+import time
+import queue
+import atexit
+import signal
+import threading
+import multiprocessing
+from app.services.parsing import extractors
+from app.services.parsing.extractors import ExtractionError
+
+try:
+    import resource
+except ImportError:  # not available on Windows; limits are then only enforced by the parent
+    resource = None
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+POLL_SECONDS = 0.05
+
+
+def _statm(pid='self'):
+    """(virtual size, resident size) in bytes from /proc, or None where /proc isn't available."""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            fields = f.read().split()
+        return int(fields[0]) * PAGE_SIZE, int(fields[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _children(pid):
+    """Child pids of `pid` (e.g. a worker's PDF page pool) from /proc, or [] where that isn't available."""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(child) for child in f.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _rss(pid):
+    """Resident size in bytes of a worker together with its children, or None without /proc."""
+    usage = _statm(pid)
+    if usage is None:
+        return None
+    return usage[1] + sum((_statm(child) or (0, 0))[1] for child in _children(pid))
+
+
+def _limit(kind, soft):
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(kind, (soft, hard))
+
+
+def _unlimit(kind):
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(kind)
+    resource.setrlimit(kind, (hard, hard))
+
+
+def _worker_main(conn):
+    """Sandbox process: extracts one document per message, under per-document rlimits."""
+    # The parent handles Ctrl-C; a worker killed mid-document is replaced anyway
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()  # so kill() also takes down a PDF page pool forked for the document
+    while True:
+        try:
+            file_path, data, options = conn.recv()
+        except EOFError:
+            return
+        start = time.perf_counter()
+        try:
+            extractor = extractors.sniff(file_path, data)
+            if extractor is not None and resource is not None:
+                # Address space: what is mapped now plus the backend's budget (a backstop for the
+                # parent's RSS check). CPU: seconds used so far plus the backend's timeout.
+                usage = _statm()
+                if usage:
+                    _limit(resource.RLIMIT_AS, usage[0] + extractor.max_memory_mb * 1024 * 1024)
+                cpu = resource.getrusage(resource.RUSAGE_SELF)
+                _limit(resource.RLIMIT_CPU, int(cpu.ru_utime + cpu.ru_stime) + extractor.timeout + 1)
+            reply = ('ok', extractors.extract_text(file_path, data, **options))
+        except MemoryError:
+            reply = ('memory', "allocation failed")
+        except ExtractionError as e:
+            # Backends wrap their own errors; an allocation failure inside one is still a memory kill
+            reply = ('memory' if 'MemoryError' in str(e) or 'malloc' in str(e) else 'error', str(e))
+        except Exception as e:
+            reply = ('error', str(e))
+        finally:
+            if resource is not None:
+                _unlimit(resource.RLIMIT_AS)
+                _unlimit(resource.RLIMIT_CPU)
+        conn.send(reply + ((time.perf_counter() - start) * 1000,))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        # Not daemonic, so it can fork a PDF page pool; it exits on EOF once the parent closes the pipe or dies
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+        self.documents = 0
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            if self.process.is_alive():
+                self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        self.conn.close()  # the worker exits on EOF
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class ExtractionSandbox:
+    """
+    Pool of recyclable subprocesses for text extraction.
+
+    Each document runs in a worker under its backend's limits (see
+    Extractor): the worker lowers its own RLIMIT_AS and RLIMIT_CPU for the
+    document, and the parent watches the worker's RSS and wall clock, killing
+    it once it is over `max_memory_mb` or `timeout` + `grace_seconds`. A killed
+    worker is replaced, and every worker is recycled after
+    `max_tasks_per_child` documents, so a pathological file costs one
+    ExtractionError rather than a stuck or bloated resume worker.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workers=2, max_tasks_per_child=100, grace_seconds=5):
+        self.max_tasks_per_child = max_tasks_per_child
+        self.grace_seconds = grace_seconds
+        self._ctx = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_Worker(self._ctx))
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'documents': 0, 'ok': 0, 'errors': 0, 'timeouts': 0, 'memory_kills': 0, 'crashes': 0,
+            'recycled': 0, 'total_ms': 0.0, 'max_ms': 0.0
+        }
+        # Before multiprocessing's exit handler joins the (non-daemonic) workers
+        atexit.register(self.close)
+
+    @classmethod
+    def get_instance(cls, config):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        workers=config.get('EXTRACT_SANDBOX_WORKERS', 2),
+                        max_tasks_per_child=config.get('EXTRACT_SANDBOX_MAX_TASKS', 100),
+                        grace_seconds=config.get('EXTRACT_SANDBOX_GRACE', 5)
+                    )
+        return cls._instance
+
+    def extract(self, file_path, data=None, **options):
+        """Extracts text in a sandbox worker. Raises ExtractionError, including when the worker is killed."""
+        extractor = extractors.sniff(file_path, data)
+        if extractor is None:
+            # Let extract_text produce the proper "unsupported format" error without a round trip
+            return extractors.extract_text(file_path, data)
+        extractors.check_size(extractor, file_path, data)
+
+        worker = self._idle.get()
+        start = time.perf_counter()
+        outcome, detail = 'error', None
+        try:
+            outcome, detail = self._run(worker, extractor, file_path, data, options)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            replace = outcome in ('timeout', 'memory', 'crash')
+            worker.documents += 1
+            if replace:
+                worker.kill()
+            elif worker.documents >= self.max_tasks_per_child:
+                worker.stop()
+                replace = True
+                self._count('recycled')
+            self._idle.put(_Worker(self._ctx) if replace else worker)
+            self._record(outcome, elapsed)
+
+        if outcome == 'ok':
+            return detail
+        if outcome == 'timeout':
+            raise ExtractionError(f"Extraction killed: {extractor.name} document ran over {extractor.timeout}s")
+        if outcome == 'memory':
+            raise ExtractionError(f"Extraction killed: {extractor.name} document went over {extractor.max_memory_mb} MB ({detail})")
+        if outcome == 'crash':
+            raise ExtractionError(f"Extraction killed: worker exited with code {detail}")
+        raise ExtractionError(detail)
+
+    def _run(self, worker, extractor, file_path, data, options):
+        # A long PDF's page ranges run in a pool forked by the worker, so they inherit its limits for this
+        # document and are counted in its RSS and killed with its process group
+        options = dict(options, private_pool=True) if extractor.name == 'pdf' else options
+        worker.conn.send((file_path, data, options))
+        deadline = time.monotonic() + extractor.timeout + self.grace_seconds
+        memory_limit = _rss(worker.process.pid)
+        memory_limit = memory_limit + extractor.max_memory_mb * 1024 * 1024 if memory_limit else None
+        while True:
+            if worker.conn.poll(POLL_SECONDS):
+                try:
+                    status, detail, _ = worker.conn.recv()
+                except EOFError:
+                    return 'crash', worker.process.exitcode
+                return status, detail
+            if not worker.process.is_alive():
+                # SIGXCPU from RLIMIT_CPU lands here too
+                code = worker.process.exitcode
+                return ('timeout', code) if code == -getattr(signal, 'SIGXCPU', 0) else ('crash', code)
+            if time.monotonic() > deadline:
+                return 'timeout', None
+            if memory_limit:
+                usage = _rss(worker.process.pid)
+                if usage and usage > memory_limit:
+                    return 'memory', f"RSS {usage // (1024 * 1024)} MB"
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _record(self, outcome, elapsed_ms):
+        key = {'ok': 'ok', 'timeout': 'timeouts', 'memory': 'memory_kills', 'crash': 'crashes'}.get(outcome, 'errors')
+        with self._stats_lock:
+            self._stats['documents'] += 1
+            self._stats[key] += 1
+            self._stats['total_ms'] += elapsed_ms
+            self._stats['max_ms'] = max(self._stats['max_ms'], elapsed_ms)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['avg_ms'] = round(stats['total_ms'] / stats['documents'], 2) if stats['documents'] else 0.0
+        stats['total_ms'] = round(stats['total_ms'], 2)
+        stats['max_ms'] = round(stats['max_ms'], 2)
+        return stats
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
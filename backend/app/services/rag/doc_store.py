@@ -0,0 +1,120 @@
+import os
+import mmap
+import numpy as np
+
+
+class DocumentStore:
+    """
+    Columnar, memory-mapped document metadata for the vector store.
+
+    A snapshot holds one int64 array of document ids plus, for each string
+    column, an int64 offsets array (n + 1 entries) into a contiguous UTF-8 blob:
+
+        docs.ids.npy
+        docs.text.offsets.npy    docs.text.bin
+        docs.source.offsets.npy  docs.source.bin
+
+    All of them are mapped read-only, so gunicorn workers share the pages through
+    the OS page cache, opening a store costs no parsing, and a document is only
+    decoded when it is looked up. Documents added after the snapshot (from the
+    WAL or new inserts) live in a small in-memory tail until the next snapshot.
+    """
+    STRING_COLUMNS = ('text', 'source')
+
+    def __init__(self):
+        self._ids = np.zeros(0, dtype='int64')
+        self._offsets = {col: np.zeros(1, dtype='int64') for col in self.STRING_COLUMNS}
+        self._blobs = {col: b'' for col in self.STRING_COLUMNS}
+        self._tail = []
+
+    @classmethod
+    def open(cls, directory):
+        store = cls()
+        store._ids = np.load(os.path.join(directory, 'docs.ids.npy'), mmap_mode='r')
+        for col in cls.STRING_COLUMNS:
+            store._offsets[col] = np.load(os.path.join(directory, f'docs.{col}.offsets.npy'), mmap_mode='r')
+            store._blobs[col] = cls._map_blob(os.path.join(directory, f'docs.{col}.bin'))
+        return store
+
+    @classmethod
+    def from_list(cls, documents):
+        """Wraps a legacy list of document dicts (e.g. an old docs.pkl)."""
+        store = cls()
+        store._tail = list(documents)
+        return store
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, 'docs.ids.npy'))
+
+    @staticmethod
+    def _map_blob(path):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''
+            # The mapping stays valid after the file object is closed
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self._ids) + len(self._tail)
+
+    def __getitem__(self, idx):
+        base = len(self._ids)
+        if idx < 0:
+            idx += len(self)
+        if idx >= base:
+            return self._tail[idx - base]
+        doc = {'id': int(self._ids[idx])}
+        for col in self.STRING_COLUMNS:
+            doc[col] = self._string(col, idx)
+        return doc
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def _string(self, col, idx):
+        offsets = self._offsets[col]
+        return self._blobs[col][int(offsets[idx]):int(offsets[idx + 1])].decode('utf-8')
+
+    def append(self, doc):
+        self._tail.append(doc)
+
+    def extend(self, docs):
+        self._tail.extend(docs)
+
+    def texts(self):
+        for doc in self:
+            yield doc['text']
+
+    def write(self, directory):
+        """Writes every document (mapped base + tail) as a columnar snapshot into `directory`."""
+        base = len(self._ids)
+        ids = np.empty(len(self), dtype='int64')
+        ids[:base] = self._ids
+        for i, doc in enumerate(self._tail):
+            ids[base + i] = doc['id']
+        self._save_array(os.path.join(directory, 'docs.ids.npy'), ids)
+
+        for col in self.STRING_COLUMNS:
+            offsets = np.empty(len(self) + 1, dtype='int64')
+            offsets[:base + 1] = self._offsets[col][:base + 1]
+            with open(os.path.join(directory, f'docs.{col}.bin'), 'wb') as f:
+                # The mapped part is copied as raw bytes, only the tail gets encoded
+                f.write(self._blobs[col][:int(offsets[base])])
+                position = int(offsets[base])
+                for i, doc in enumerate(self._tail):
+                    data = (doc.get(col) or '').encode('utf-8')
+                    f.write(data)
+                    position += len(data)
+                    offsets[base + i + 1] = position
+                f.flush()
+                os.fsync(f.fileno())
+            self._save_array(os.path.join(directory, f'docs.{col}.offsets.npy'), offsets)
+
+    @staticmethod
+    def _save_array(path, array):
+        with open(path, 'wb') as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,100 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def normalize_text(text):
+    """Collapses whitespace so re-extracted copies of the same document hash identically."""
+    return ' '.join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by sha256(model name + normalized text).
+
+    The memory tier is an LRU of at most `max_entries` vectors. The disk tier
+    stores one raw float32 file per key in sha-prefix shard directories under
+    `directory`, written via rename so concurrent workers never read a partial
+    vector; it is shared by every worker on the host and survives restarts.
+    """
+
+    def __init__(self, directory, model_name, dimension, max_entries=10000):
+        self.directory = directory
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return vector
+
+        vector = self._read_disk(key)
+        with self._lock:
+            if vector is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._remember(key, vector)
+        return vector
+
+    def put(self, key, vector):
+        # Copy so a cached row doesn't pin the whole batch matrix it came from
+        vector = np.array(vector, dtype='float32')
+        with self._lock:
+            self._remember(key, vector)
+        self._write_disk(key, vector)
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) != self.dimension * 4:
+            return None
+        return np.frombuffer(data, dtype='float32')
+
+    def _write_disk(self, key, vector):
+        if not self.directory:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(vector.tobytes())
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['memory_entries'] = len(self._memory)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        counters['hit_ratio'] = round((lookups - counters['misses']) / lookups, 4) if lookups else 0.0
+        return counters
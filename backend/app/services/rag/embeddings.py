@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+import numpy as np
+from app.services.rag.embedding_cache import EmbeddingCache
+
+
+class Embedder:
+    """
+    Process-wide SentenceTransformer wrapper.
+
+    Under gunicorn with `preload_app` (see gunicorn.conf.py) `preload()` runs in
+    the master before forking, so the weights are loaded once per host and the
+    workers share them copy-on-write. Each worker then calls `warm_up()` from
+    the post_fork hook, which keeps inference (and its thread pools) out of the
+    master and the first real request. Without preloading the model is loaded
+    lazily on first use, as before.
+
+    Encodes go through an EmbeddingCache keyed by normalized-text hash, so
+    re-uploaded resumes and repeated queries skip the model entirely.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, model_name, cache_dir=None, cache_size=10000):
+        from sentence_transformers import SentenceTransformer
+
+        start = time.perf_counter()
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_in_pid = os.getpid()
+        self._stats_lock = threading.Lock()
+        self._stats = {'calls': 0, 'texts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+        self.cache = EmbeddingCache(cache_dir, model_name, self.dimension, max_entries=cache_size)
+        print(f"Loaded embedding model {model_name} in {self.load_seconds:.1f}s (pid {self.loaded_in_pid}).")
+
+    @classmethod
+    def get_instance(cls, model_name=None, cache_dir=None, cache_size=10000):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls(model_name or 'all-MiniLM-L6-v2', cache_dir, cache_size)
+        return cls._instance
+
+    @classmethod
+    def from_config(cls, config):
+        return cls.get_instance(
+            config.get('RAG_EMBEDDING_MODEL'),
+            cache_dir=config.get('RAG_EMBEDDING_CACHE_DIR'),
+            cache_size=config.get('RAG_EMBEDDING_CACHE_SIZE', 10000)
+        )
+
+    @classmethod
+    def preload(cls, config):
+        """Loads the model without running inference; safe to call before forking."""
+        return cls.from_config(config)
+
+    @classmethod
+    def loaded(cls):
+        return cls._instance is not None
+
+    def warm_up(self):
+        """Runs one tiny encode so the first request doesn't pay for lazy initialisation."""
+        start = time.perf_counter()
+        self.model.encode(['warm up'])
+        print(f"Embedding model warmed up in {(time.perf_counter() - start) * 1000:.0f}ms (pid {os.getpid()}).")
+
+    def encode(self, texts, batch_size=32):
+        """
+        Encodes a list of texts into a float32 matrix. Cached texts are served
+        from the cache; the rest go to the model in one batch and are cached.
+        Model latency is recorded per call.
+        """
+        result = np.empty((len(texts), self.dimension), dtype='float32')
+        keys = [self.cache.key(text) for text in texts]
+        missing = []
+        for i, key in enumerate(keys):
+            vector = self.cache.get(key)
+            if vector is None:
+                missing.append(i)
+            else:
+                result[i] = vector
+
+        if missing:
+            start = time.perf_counter()
+            vectors = self.model.encode([texts[i] for i in missing], batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            vectors = np.asarray(vectors, dtype='float32').reshape(len(missing), self.dimension)
+            for row, i in enumerate(missing):
+                result[i] = vectors[row]
+                self.cache.put(keys[i], vectors[row])
+
+            with self._stats_lock:
+                self._stats['calls'] += 1
+                self._stats['texts'] += len(missing)
+                self._stats['total_seconds'] += elapsed
+                self._stats['max_seconds'] = max(self._stats['max_seconds'], elapsed)
+        return result
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        calls = stats['calls']
+        cache = self.cache.stats()
+        seconds_per_text = stats['total_seconds'] / stats['texts'] if stats['texts'] else 0.0
+        return {
+            'model': self.model_name,
+            'pid': os.getpid(),
+            'shared_from_master': self.loaded_in_pid != os.getpid(),
+            'load_seconds': round(self.load_seconds, 3),
+            'calls': calls,
+            'texts': stats['texts'],
+            'avg_call_ms': round(stats['total_seconds'] / calls * 1000, 2) if calls else 0.0,
+            'max_call_ms': round(stats['max_seconds'] * 1000, 2),
+            'total_encode_seconds': round(stats['total_seconds'], 3),
+            'cache': cache,
+            # Estimated from the average model time per text
+            'saved_encode_seconds': round((cache['memory_hits'] + cache['disk_hits']) * seconds_per_text, 3)
+        }
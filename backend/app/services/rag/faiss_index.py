@@ -0,0 +1,60 @@
+import faiss
+
+INDEX_TYPES = ('flat', 'ivfpq', 'hnsw')
+
+
+def create_index(index_type, dimension, nlist=1024, pq_m=48, hnsw_m=32, ef_construction=200):
+    """Creates an empty FAISS index of the given type.
+
+    'flat' is an exact brute-force scan, 'ivfpq' is an inverted file with
+    product-quantized codes (must be trained before vectors can be added) and
+    'hnsw' is a graph index that needs no training.
+    """
+    if index_type == 'flat':
+        return faiss.IndexFlatL2(dimension)
+    elif index_type == 'ivfpq':
+        quantizer = faiss.IndexFlatL2(dimension)
+        return faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, 8)
+    elif index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        return index
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+
+def index_type_of(index):
+    """Returns the INDEX_TYPES name of an existing index (e.g. one loaded from disk)."""
+    if isinstance(index, faiss.IndexIVF):
+        return 'ivfpq'
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    return 'flat'
+
+
+def min_training_size(index_type, nlist=1024):
+    """Smallest number of vectors we accept for training an index of this type.
+
+    k-means wants ~39 points per centroid and the 8-bit PQ codebooks need at
+    least 256 points, anything less gives FAISS warnings and poor recall.
+    """
+    if index_type == 'ivfpq':
+        return max(nlist * 39, 256)
+    return 0
+
+
+def search_params(index, nprobe=None, ef_search=None):
+    """Builds per-query search parameters so callers can trade recall for latency
+    without mutating the shared index (which would race across threads)."""
+    if isinstance(index, faiss.IndexIVF) and nprobe:
+        return faiss.SearchParametersIVF(nprobe=int(nprobe))
+    if isinstance(index, faiss.IndexHNSW) and ef_search:
+        return faiss.SearchParametersHNSW(efSearch=int(ef_search))
+    return None
+
+
+def train_index(index, vectors):
+    """Trains the index on a float32 matrix if it needs it."""
+    if not index.is_trained:
+        index.train(vectors)
+    return index
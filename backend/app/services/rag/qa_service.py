@@ -0,0 +1,153 @@
+import re
+import json
+from contextlib import closing
+from flask import current_app
+from app.db import Database
+from app.services.rag.rag_service import RAGService
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'candidate', 'candidates', 'do', 'for', 'from',
+    'has', 'have', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'show', 'that', 'the', 'to', 'who',
+    'with', 'which', 'what', 'any', 'find', 'list', 'give', 'experience'
+}
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+
+def tokenize(text):
+    return [t.rstrip('.') for t in TOKEN_RE.findall(text.lower()) if t.rstrip('.') not in STOPWORDS]
+
+
+class QAService:
+    """Retrieval-augmented question answering over the resume vector store."""
+
+    @staticmethod
+    def retrieve(question, k=None, rerank=None):
+        """
+        Returns the top k sources, numbered by `ref`, for the question. With
+        reranking on, a wider set of RAG_RERANK_CANDIDATES nearest neighbours is
+        re-scored by blending semantic similarity with the share of question
+        terms found in the text.
+        """
+        config = current_app.config
+        k = k or config.get('RAG_ASK_TOP_K', 5)
+        rerank = config.get('RAG_RERANK', True) if rerank is None else rerank
+        fetch_k = max(k, config.get('RAG_RERANK_CANDIDATES', 20)) if rerank else k
+
+        hits = RAGService.get_instance().search(question, k=fetch_k)
+        terms = set(tokenize(question))
+        weight = config.get('RAG_LEXICAL_WEIGHT', 0.3)
+
+        scored = []
+        for hit in hits:
+            # Embeddings are unit-normalised, so squared L2 maps to cosine as 1 - d/2
+            semantic = 1.0 - hit['distance'] / 2.0
+            score = semantic
+            if rerank and terms:
+                doc_terms = set(tokenize(hit['document']['text']))
+                lexical = len(terms & doc_terms) / len(terms)
+                score = (1 - weight) * semantic + weight * lexical
+            scored.append((score, hit['document']))
+
+        if rerank:
+            scored.sort(key=lambda s: s[0], reverse=True)
+        return QAService._as_sources(scored[:k])
+
+    @staticmethod
+    def _as_sources(scored):
+        resume_ids = [doc['id'] for _, doc in scored if doc['source'] == 'resume']
+        candidates = {}
+        if resume_ids:
+            rows = Database.query(
+                """
+                SELECT r.id, c.id, c.first_name, c.last_name
+                FROM resumes r
+                JOIN candidates c ON r.candidate_id = c.id
+                WHERE r.id = ANY(%s)
+                """,
+                (resume_ids,),
+                fetchall=True
+            )
+            candidates = {r[0]: {'candidate_id': r[1], 'candidate_name': f"{r[2]} {r[3]}"} for r in rows}
+
+        sources = []
+        for n, (score, doc) in enumerate(scored, start=1):
+            source = {
+                'ref': n,
+                'id': doc['id'],
+                'source': doc['source'],
+                'score': round(float(score), 4),
+                'text': doc['text']
+            }
+            if doc['source'] == 'resume':
+                source.update(candidates.get(doc['id'], {}))
+            sources.append(source)
+        return sources
+
+    @staticmethod
+    def public_sources(sources, snippet_chars=300):
+        """Citations for the client: the full text is swapped for a short snippet."""
+        return [
+            {**{key: value for key, value in s.items() if key != 'text'}, 'snippet': s['text'][:snippet_chars]}
+            for s in sources
+        ]
+
+    @staticmethod
+    def build_messages(question, sources, context_chars=1500):
+        context = []
+        for s in sources:
+            label = s.get('candidate_name') or f"{s['source']} {s['id']}"
+            context.append(f"[{s['ref']}] {label}:\n{s['text'][:context_chars]}")
+
+        system = (
+            "You are a recruiting assistant for an Applicant Tracking System. Answer the recruiter's question "
+            "using only the numbered sources below. Cite sources inline as [n]. If the sources don't contain "
+            "the answer, say so."
+        )
+        user = "Sources:\n\n" + "\n\n".join(context) + f"\n\nQuestion: {question}"
+        return [{'role': 'system', 'content': system}, {'role': 'user', 'content': user}]
+
+    @staticmethod
+    def cache_scope(question, sources):
+        """
+        (scope, text) for the LLM semantic cache: a reworded question can reuse
+        an answer only if it was built from the same sources.
+        """
+        return 'rag-answer:' + ','.join(f"{s['source']}:{s['id']}" for s in sources), question
+
+    @staticmethod
+    def generate(messages, semantic=None):
+        """Yields the answer in chunks as the LLM produces them."""
+        from app.services.llm_provider.llm import LLMProvider
+        with closing(LLMProvider().chat_stream(messages, semantic=semantic)) as chunks:
+            # Time to first token and tokens/sec are recorded in LLMProvider.stats()
+            for chunk in chunks:
+                if not chunk['done']:
+                    yield chunk['text']
+
+    @staticmethod
+    def answer(question, k=None):
+        sources = QAService.retrieve(question, k)
+        answer = ''.join(QAService.generate(QAService.build_messages(question, sources), QAService.cache_scope(question, sources)))
+        return {'answer': answer, 'sources': QAService.public_sources(sources)}
+
+    @staticmethod
+    def stream_answer(question, k=None):
+        """
+        Yields server-sent events: one `sources` event as soon as retrieval is
+        done, `token` events as the answer is generated, then `done` (or `error`).
+        """
+        try:
+            sources = QAService.retrieve(question, k)
+            yield QAService._event('sources', QAService.public_sources(sources))
+            # closing(): a client disconnect closes this generator, which must cancel the LLM stream too
+            messages = QAService.build_messages(question, sources)
+            with closing(QAService.generate(messages, QAService.cache_scope(question, sources))) as chunks:
+                for chunk in chunks:
+                    yield QAService._event('token', {'text': chunk})
+            yield QAService._event('done', {})
+        except Exception as e:
+            yield QAService._event('error', {'error': str(e)})
+
+    @staticmethod
+    def _event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
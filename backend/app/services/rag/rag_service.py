@@ -1,13 +1,31 @@
 import os
+import time
+import fcntl
+import shutil
+import threading
 import faiss
 import pickle
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from contextlib import contextmanager
 from flask import current_app
+from app.services.rag.faiss_index import create_index, index_type_of, min_training_size, search_params, train_index
+from app.services.rag.wal import VectorWAL
+from app.services.rag.doc_store import DocumentStore
+from app.services.rag.embeddings import Embedder
 
 class RAGService:
+    """
+    FAISS vector store shared on disk by every process (gunicorn workers,
+    the resume worker indexer, reindex/rebuild scripts).
+
+    Writers take the store lock exclusively, first catch up on what other
+    processes wrote (a newer snapshot, then WAL records), and only then
+    append, so WAL sequence numbers are global and a snapshot always holds
+    every record the WAL is emptied of. Readers call refresh() before each
+    search, which picks up new snapshots and WAL records under a shared lock.
+    """
     _instance = None
-    
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
@@ -15,50 +33,314 @@ class RAGService:
         return cls._instance
 
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.dimension = 384
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.documents = [] # List of dicts: {'id': int, 'text': str, 'source': str}
-        self.vector_store_path = current_app.config['VECTOR_STORE_PATH']
-        
+        self.config = current_app.config
+        self.embedder = Embedder.from_config(self.config)
+        self.dimension = self.embedder.dimension
+        self.index_type = self.config.get('RAG_INDEX_TYPE', 'flat')
+        self.index = self._empty_index()
+        self.documents = DocumentStore() # Sequence of dicts: {'id': int, 'text': str, 'source': str}
+        self.vector_store_path = self.config['VECTOR_STORE_PATH']
+
         if not os.path.exists(self.vector_store_path):
             os.makedirs(self.vector_store_path)
-            
-        self.load_index()
+
+        # New vectors go to an append-only log; the full index is only rewritten
+        # as a compacted snapshot every RAG_SNAPSHOT_EVERY records.
+        self.wal = VectorWAL(
+            os.path.join(self.vector_store_path, 'wal.log'),
+            self.dimension,
+            fsync=self.config.get('RAG_WAL_FSYNC', True)
+        )
+        self.snapshot_every = self.config.get('RAG_SNAPSHOT_EVERY', 1000)
+        self.wal_records = 0
+        self.wal_offset = 0  # bytes of the WAL applied to self.index
+        self.snapshot_name = None  # CURRENT when the store was last loaded
+
+        self.lock_path = os.path.join(self.vector_store_path, 'store.lock')
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+        with self._store_lock(exclusive=False):
+            self.load_index()
+
+    @contextmanager
+    def _store_lock(self, exclusive=True):
+        """
+        flock on store.lock across processes, plus a thread lock within this
+        one. Re-entrant; a block nested in a shared hold stays shared.
+        """
+        with self._thread_lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self.lock_path, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Picks up vectors other processes added since the last call. Cheap when nothing changed."""
+        if self._current_name() == self.snapshot_name and self.wal.size() == self.wal_offset:
+            return
+        with self._store_lock(exclusive=False):
+            self._catch_up()
+
+    def _catch_up(self):
+        # Caller holds the store lock
+        if self._current_name() != self.snapshot_name:
+            self.load_index()
+            return
+        if self.wal.size() == self.wal_offset:
+            return
+        vectors, documents, self.wal_offset = self.wal.replay(len(self.documents), self.wal_offset)
+        if documents:
+            self.index.add(vectors)
+            self.documents.extend(documents)
+            self.wal_records += len(documents)
+
+    def _new_index(self, index_type):
+        return create_index(
+            index_type,
+            self.dimension,
+            nlist=self.config.get('RAG_IVF_NLIST', 1024),
+            pq_m=self.config.get('RAG_PQ_M', 48),
+            hnsw_m=self.config.get('RAG_HNSW_M', 32),
+            ef_construction=self.config.get('RAG_HNSW_EF_CONSTRUCTION', 200)
+        )
+
+    def _empty_index(self):
+        # Untrained index types can't accept vectors, so an empty store starts as
+        # flat until `rebuild_index.py` has enough data to train on.
+        if min_training_size(self.index_type) == 0:
+            return self._new_index(self.index_type)
+        return self._new_index('flat')
 
     def add_document(self, doc_id, text, source):
         # Split text into chunks if needed, for now simple document level
-        if not text.strip():
-            return
-            
-        vector = self.model.encode([text])
-        self.index.add(vector.astype('float32'))
-        self.documents.append({'id': doc_id, 'text': text, 'source': source})
-        self.save_index()
-
-    def search(self, query, k=3):
-        vector = self.model.encode([query])
-        distances, indices = self.index.search(vector.astype('float32'), k)
-        
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx != -1 and idx < len(self.documents):
-                results.append({
-                    'document': self.documents[idx],
-                    'distance': float(distances[0][i])
-                })
+        self.add_documents([(doc_id, text, source)])
+
+    def add_documents(self, documents, batch_size=None, progress=None):
+        """
+        Streams (doc_id, text, source) tuples into the store.
+
+        Texts are encoded batch_size at a time (RAG_ENCODE_BATCH_SIZE by default)
+        and each batch is written to the WAL and the index in one call, so the
+        iterable can be a lazy DB cursor of any length. `progress`, if given, is
+        called with the running total after every batch. Returns the number of
+        documents added; empty texts are skipped.
+        """
+        batch_size = batch_size or self.config.get('RAG_ENCODE_BATCH_SIZE', 64)
+        added = 0
+        batch = []
+        for doc_id, text, source in documents:
+            if not text or not text.strip():
+                continue
+            batch.append({'id': doc_id, 'text': text, 'source': source})
+            if len(batch) >= batch_size:
+                added += self._add_batch(batch, batch_size)
+                batch = []
+                if progress:
+                    progress(added)
+        if batch:
+            added += self._add_batch(batch, batch_size)
+            if progress:
+                progress(added)
+        return added
+
+    def _add_batch(self, docs, batch_size):
+        vectors = self.embedder.encode([doc['text'] for doc in docs], batch_size=batch_size)
+        with self._store_lock():
+            # Records appended by other processes come first, so this batch's seq is its real position
+            self._catch_up()
+            self.wal_offset = self.wal.append(len(self.documents), vectors, docs)
+            self.index.add(vectors)
+            self.documents.extend(docs)
+
+            self.wal_records += len(docs)
+            if self.wal_records >= self.snapshot_every:
+                self.save_index()
+        return len(docs)
+
+    def search(self, query, k=3, nprobe=None, ef_search=None):
+        """
+        Returns the k nearest documents to the query.
+        nprobe (IVF) and ef_search (HNSW) trade recall for latency per query and
+        default to RAG_NPROBE / RAG_EF_SEARCH; they are ignored by a flat index.
+        """
+        vector = self.embedder.encode([query])
+        self.refresh()
+        with self._thread_lock:
+            params = search_params(
+                self.index,
+                nprobe=nprobe or self.config.get('RAG_NPROBE'),
+                ef_search=ef_search or self.config.get('RAG_EF_SEARCH')
+            )
+            if params is not None:
+                distances, indices = self.index.search(vector, k, params=params)
+            else:
+                distances, indices = self.index.search(vector, k)
+
+            results = []
+            for i, idx in enumerate(indices[0]):
+                if idx != -1 and idx < len(self.documents):
+                    results.append({
+                        'document': self.documents[idx],
+                        'distance': float(distances[0][i])
+                    })
         return results
 
+    def rebuild_index(self, index_type=None):
+        """
+        Trains (if needed) and rebuilds the index as `index_type` from the stored
+        vectors, then swaps it in and saves it. Positions, and therefore the
+        mapping to self.documents, are preserved.
+        """
+        index_type = index_type or self.index_type
+        # Writers wait for the rebuild, so nothing they add can miss the new index
+        with self._store_lock():
+            self._catch_up()
+            vectors = self._stored_vectors()
+
+            if len(vectors) < min_training_size(index_type, self.config.get('RAG_IVF_NLIST', 1024)):
+                print(f"WARNING: {len(vectors)} vectors are not enough to train a '{index_type}' index. Keeping a flat index.")
+                index_type = 'flat'
+
+            index = self._new_index(index_type)
+            if len(vectors):
+                train_index(index, vectors)
+                index.add(vectors)
+
+            self.index = index
+            self.save_index()
+        return index_type
+
+    def reset(self):
+        """Empties the store (e.g. before a full reindex) and snapshots the empty state."""
+        with self._store_lock():
+            self._catch_up()
+            self.index = self._empty_index()
+            self.documents = DocumentStore()
+            self.wal_offset = self.wal.size()  # emptied by save_index: this is a reset, not a catch-up
+            self.save_index()
+
+    def _stored_vectors(self):
+        if self.index.ntotal == 0:
+            return np.zeros((0, self.dimension), dtype='float32')
+        if index_type_of(self.index) == 'ivfpq':
+            # PQ codes are lossy, so go back to the source text instead of reconstructing
+            return self.embedder.encode(list(self.documents.texts()), batch_size=64)
+        return self.index.reconstruct_n(0, self.index.ntotal)
+
     def save_index(self):
-        faiss.write_index(self.index, os.path.join(self.vector_store_path, 'index.faiss'))
-        with open(os.path.join(self.vector_store_path, 'docs.pkl'), 'wb') as f:
-            pickle.dump(self.documents, f)
+        """
+        Writes a compacted snapshot of the index and documents, then empties the WAL.
+
+        The snapshot goes to a fresh directory which is published by atomically
+        replacing the CURRENT pointer, so a crash at any point leaves either the
+        previous snapshot + WAL or the new one, never a truncated index. Runs
+        under the exclusive store lock after catching up, so the snapshot holds
+        every record in the WAL, including other processes'.
+        """
+        with self._store_lock():
+            self._catch_up()
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        name = f"snapshot-{len(self.documents)}-{time.time_ns()}"
+        tmp_dir = os.path.join(self.vector_store_path, name + '.tmp')
+        os.makedirs(tmp_dir)
+
+        faiss.write_index(self.index, os.path.join(tmp_dir, 'index.faiss'))
+        self._fsync_path(os.path.join(tmp_dir, 'index.faiss'))
+        self.documents.write(tmp_dir)
+        snapshot_dir = os.path.join(self.vector_store_path, name)
+        os.rename(tmp_dir, snapshot_dir)
+
+        pointer_tmp = os.path.join(self.vector_store_path, 'CURRENT.tmp')
+        with open(pointer_tmp, 'w') as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(self.vector_store_path, 'CURRENT'))
+        self._fsync_path(self.vector_store_path)
+
+        # Records up to len(self.documents) are now in the snapshot
+        self.wal.reset()
+        self.wal_records = 0
+        self.wal_offset = 0
+        self.snapshot_name = name
+        self.documents = DocumentStore.open(snapshot_dir)
+        self._remove_stale_snapshots(keep=name)
 
     def load_index(self):
-        index_file = os.path.join(self.vector_store_path, 'index.faiss')
-        docs_file = os.path.join(self.vector_store_path, 'docs.pkl')
-        
-        if os.path.exists(index_file) and os.path.exists(docs_file):
+        """
+        Loads the latest snapshot (or a legacy index.faiss/docs.pkl pair) and
+        replays the WAL on top. Document metadata is memory-mapped, not read.
+        Callers hold the store lock.
+        """
+        self.snapshot_name = self._current_name()
+        self.index = self._empty_index()
+        self.documents = DocumentStore()
+        self.wal_records = 0
+        snapshot_dir = self._current_snapshot_dir() or self.vector_store_path
+        index_file = os.path.join(snapshot_dir, 'index.faiss')
+        docs_file = os.path.join(snapshot_dir, 'docs.pkl')
+
+        if os.path.exists(index_file) and (DocumentStore.exists(snapshot_dir) or os.path.exists(docs_file)):
             self.index = faiss.read_index(index_file)
-            with open(docs_file, 'rb') as f:
-                self.documents = pickle.load(f)
+            if DocumentStore.exists(snapshot_dir):
+                self.documents = DocumentStore.open(snapshot_dir)
+            else:
+                # Pre-columnar store: the next snapshot rewrites it in the mapped format
+                with open(docs_file, 'rb') as f:
+                    self.documents = DocumentStore.from_list(pickle.load(f))
+
+            loaded_type = index_type_of(self.index)
+            if loaded_type != self.index_type:
+                print(f"WARNING: Vector store holds a '{loaded_type}' index but RAG_INDEX_TYPE is '{self.index_type}'. Run rebuild_index.py to convert it.")
+
+        vectors, documents, self.wal_offset = self.wal.replay(len(self.documents))
+        if documents:
+            self.index.add(vectors)
+            self.documents.extend(documents)
+            self.wal_records = len(documents)
+            print(f"Replayed {len(documents)} vector store records from the write-ahead log.")
+
+    def _current_name(self):
+        try:
+            with open(os.path.join(self.vector_store_path, 'CURRENT')) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _current_snapshot_dir(self):
+        name = self._current_name()
+        if not name:
+            return None
+        path = os.path.join(self.vector_store_path, name)
+        return path if os.path.isdir(path) else None
+
+    def _remove_stale_snapshots(self, keep):
+        for entry in os.listdir(self.vector_store_path):
+            if entry.startswith('snapshot-') and entry != keep:
+                shutil.rmtree(os.path.join(self.vector_store_path, entry), ignore_errors=True)
+        for legacy in ('index.faiss', 'docs.pkl'):
+            path = os.path.join(self.vector_store_path, legacy)
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _fsync_path(path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
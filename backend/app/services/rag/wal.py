@@ -0,0 +1,121 @@
+import os
+import json
+import zlib
+import fcntl
+import struct
+import numpy as np
+
+
+class VectorWAL:
+    """
+    Append-only write-ahead log of (vector, document) records for the vector store.
+
+    Each record is a fixed header (payload length, CRC32 of the payload, sequence
+    number) followed by the float32 vector and the document as UTF-8 JSON. The
+    sequence number is the record's position in the store, so replay can skip
+    records already folded into a snapshot. A torn or corrupt tail (e.g. a crash
+    mid-write) fails its length/CRC check and is truncated away on replay.
+
+    Several processes share one log: RAGService serializes writers with its
+    store lock and has each catch up on the log before appending, so sequence
+    numbers are global. Readers follow the log by byte offset.
+    """
+    HEADER = struct.Struct('<IIQ')
+
+    def __init__(self, path, dimension, fsync=True):
+        self.path = path
+        self.dimension = dimension
+        self.fsync = fsync
+        self.vector_bytes = dimension * 4
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, start_seq, vectors, documents):
+        """
+        Appends one record per (vector, document) pair with a single write and
+        fsync. Returns the log's size afterwards, i.e. the offset read up to.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        chunks = []
+        for i, doc in enumerate(documents):
+            payload = vectors[i].tobytes() + json.dumps(doc).encode('utf-8')
+            chunks.append(self.HEADER.pack(len(payload), zlib.crc32(payload), start_seq + i))
+            chunks.append(payload)
+
+        with open(self.path, 'ab') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(b''.join(chunks))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                return f.tell()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def replay(self, start_seq, offset=0):
+        """
+        Returns (vectors, documents, end_offset) for every intact record with
+        seq >= start_seq, in order, reading from byte `offset` (records before it
+        have been applied already). A torn/corrupt record is truncated away so
+        later appends start from a clean tail; a sequence gap (records this
+        store can't place) stops the replay with an error, without truncating.
+        """
+        vectors, documents = [], []
+        if not os.path.exists(self.path):
+            return np.zeros((0, self.dimension), dtype='float32'), documents, 0
+
+        expected = start_seq
+        good_offset = offset
+        gap = None
+        with open(self.path, 'r+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if offset > os.fstat(f.fileno()).st_size:
+                    # Emptied by a snapshot since the caller last read it
+                    offset = good_offset = 0
+                f.seek(offset)
+                while True:
+                    header = f.read(self.HEADER.size)
+                    if len(header) < self.HEADER.size:
+                        break
+                    length, crc, seq = self.HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length or length < self.vector_bytes or zlib.crc32(payload) != crc:
+                        break
+                    if seq >= expected:
+                        if seq != expected:
+                            gap = seq
+                            break
+                        vectors.append(np.frombuffer(payload[:self.vector_bytes], dtype='float32'))
+                        documents.append(json.loads(payload[self.vector_bytes:].decode('utf-8')))
+                        expected += 1
+                    good_offset = f.tell()
+
+                if gap is None and good_offset < os.fstat(f.fileno()).st_size:
+                    print(f"WARNING: Truncating torn write-ahead log tail at byte {good_offset} of {self.path}")
+                    f.truncate(good_offset)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+        if gap is not None:
+            print(f"ERROR: Write-ahead log {self.path} jumps to record {gap} after {expected}; "
+                  f"run rebuild_index.py or reindex_resumes.py --reset to repair the vector store.")
+        if not vectors:
+            return np.zeros((0, self.dimension), dtype='float32'), documents, good_offset
+        return np.vstack(vectors), documents, good_offset
+
+    def reset(self):
+        """Empties the log once its records are covered by a snapshot."""
+        with open(self.path, 'ab') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.truncate(0)
+                if self.fsync:
+                    os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -5,6 +5,11 @@ from app.db import Database
 class RAGService:
     @staticmethod
     def save_analysis(app_id, match_score, analysis_text, keywords, missing):
+        # Keyword lists (e.g. from SkillMatcher) are stored as comma-separated text
+        if isinstance(keywords, (list, tuple)):
+            keywords = ", ".join(keywords)
+        if isinstance(missing, (list, tuple)):
+            missing = ", ".join(missing)
         Database.execute(
             """
             INSERT INTO analysis_results (application_id, match_score, analysis_text, keywords_matched, missing_keywords)
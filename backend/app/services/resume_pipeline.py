@@ -0,0 +1,296 @@
+import os
+import json
+import time
+from flask import current_app
+from app.db import Database
+from app.services.parsing.extractors import ExtractionError
+
+STAGES = ('extract', 'parse', 'merge', 'embed')
+
+
+class ResumePipeline:
+    """
+    Durable resume-processing queue backed by the resume_jobs table.
+
+    Uploads only save the file and enqueue a job; resume_worker.py processes
+    jobs out of band through the extract -> parse -> merge -> embed stages.
+    Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+    them can poll the table without handing the same job out twice. A job left
+    'running' by a crashed worker is reclaimed after RESUME_JOB_TIMEOUT seconds.
+
+    The embed stage only queues the resume in vector_index_queue: the vector
+    store has a single writer, run_indexer() in resume_worker.py's parent
+    process, rather than every worker process mutating it.
+    """
+
+    @staticmethod
+    def enqueue(file_path, filename, user_id, candidate_id=None):
+        row = Database.query(
+            """
+            INSERT INTO resume_jobs (user_id, candidate_id, file_path, file_name)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+            """,
+            (user_id, candidate_id, file_path, filename),
+            fetchone=True,
+            commit=True
+        )
+        return row[0]
+
+    @staticmethod
+    def get_status(job_id):
+        row = Database.query(
+            """
+            SELECT id, user_id, status, stage, attempts, error, result, created_at, started_at, finished_at
+            FROM resume_jobs WHERE id = %s
+            """,
+            (job_id,),
+            fetchone=True
+        )
+        if not row:
+            return None
+        return {
+            'id': row[0],
+            'user_id': row[1],
+            'status': row[2],
+            'stage': row[3],
+            'attempts': row[4],
+            'error': row[5],
+            'result': json.loads(row[6]) if row[6] else None,
+            'created_at': row[7].isoformat() if row[7] else None,
+            'started_at': row[8].isoformat() if row[8] else None,
+            'finished_at': row[9].isoformat() if row[9] else None
+        }
+
+    @staticmethod
+    def extraction_stats(hours=24):
+        """
+        Extraction timings and sandbox kills across every resume worker, from
+        jobs finished in the last `hours` hours. Sandbox kills are recorded as
+        "Extraction killed: ..." job errors.
+        """
+        row = Database.query(
+            """
+            SELECT COUNT(*) FILTER (WHERE status = 'done'),
+                   COUNT(*) FILTER (WHERE status = 'failed'),
+                   COUNT(*) FILTER (WHERE error LIKE 'Extraction killed:%%' AND error LIKE '%%ran over%%'),
+                   COUNT(*) FILTER (WHERE error LIKE 'Extraction killed:%%' AND error LIKE '%%went over%%'),
+                   COUNT(*) FILTER (WHERE error LIKE 'Extraction killed:%%'),
+                   AVG((result::json->'timings_ms'->>'extract')::float),
+                   PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY (result::json->'timings_ms'->>'extract')::float),
+                   MAX((result::json->'timings_ms'->>'extract')::float)
+            FROM resume_jobs
+            WHERE finished_at > CURRENT_TIMESTAMP - make_interval(hours => %s)
+            """,
+            (hours,),
+            fetchone=True
+        )
+        return {
+            'hours': hours,
+            'done': row[0],
+            'failed': row[1],
+            'timeouts': row[2],
+            'memory_kills': row[3],
+            'killed': row[4],
+            'extract_ms': {
+                'avg': round(row[5], 1) if row[5] is not None else None,
+                'p95': round(row[6], 1) if row[6] is not None else None,
+                'max': round(row[7], 1) if row[7] is not None else None
+            }
+        }
+
+    @staticmethod
+    def claim_next():
+        """
+        Atomically marks the oldest runnable job as running and returns it, or None.
+
+        A stale 'running' job is only reclaimed while it has attempts left;
+        one that already used RESUME_JOB_MAX_ATTEMPTS (e.g. a file that
+        crashes the worker every time) is marked failed instead.
+        """
+        timeout = current_app.config.get('RESUME_JOB_TIMEOUT', 600)
+        max_attempts = current_app.config.get('RESUME_JOB_MAX_ATTEMPTS', 3)
+        with Database.transaction() as cursor:
+            cursor.execute(
+                """
+                UPDATE resume_jobs
+                SET status = 'failed', finished_at = CURRENT_TIMESTAMP,
+                    error = 'Worker stopped responding on each of ' || attempts || ' attempts (RESUME_JOB_MAX_ATTEMPTS is ' || %s || ')'
+                WHERE status = 'running' AND started_at < CURRENT_TIMESTAMP - make_interval(secs => %s) AND attempts >= %s
+                """,
+                (max_attempts, timeout, max_attempts)
+            )
+            cursor.execute(
+                """
+                UPDATE resume_jobs
+                SET status = 'running', attempts = attempts + 1, started_at = CURRENT_TIMESTAMP, stage = NULL
+                WHERE id = (
+                    SELECT id FROM resume_jobs
+                    WHERE status = 'queued'
+                       OR (status = 'running' AND started_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                           AND attempts < %s)
+                    ORDER BY id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id, candidate_id, file_path, file_name, attempts
+                """,
+                (timeout, max_attempts)
+            )
+            row = cursor.fetchone()
+        if not row:
+            return None
+        return {'id': row[0], 'candidate_id': row[1], 'file_path': row[2], 'file_name': row[3], 'attempts': row[4]}
+
+    @staticmethod
+    def process(job):
+        """Runs every stage for a claimed job and records the outcome."""
+        from app.services.parsing.resume_parser import ResumeParser
+        from app.services.parsing.parse_cache import ParseCache
+        from app.services.candidate_service import CandidateService
+
+        timings = {}
+        try:
+            stage_start = ResumePipeline._stage(job, 'extract')
+            cache_key = ParseCache.key_for(job['file_path'])
+            cached = ParseCache.get(cache_key)
+            if cached:
+                # Same bytes were parsed by this parser version before: no extraction, no LLM call
+                text, parsed_data = cached
+                timings['extract'] = time.perf_counter() - stage_start
+            else:
+                text = ResumeParser.extract(job['file_path'])
+                timings['extract'] = time.perf_counter() - stage_start
+
+                stage_start = ResumePipeline._stage(job, 'parse')
+                parsed_data = ResumeParser.parse_resume(job['file_path'], text=text, cache_key=cache_key)
+                timings['parse'] = time.perf_counter() - stage_start
+
+            resume_id = None
+            if job['candidate_id']:
+                stage_start = ResumePipeline._stage(job, 'merge')
+                resume_id = CandidateService.attach_resume(job['candidate_id'], job['file_path'], job['file_name'], parsed_data, text)
+                timings['merge'] = time.perf_counter() - stage_start
+
+                stage_start = ResumePipeline._stage(job, 'embed')
+                ResumePipeline._queue_embedding(resume_id, text)
+                timings['embed'] = time.perf_counter() - stage_start
+
+            result = {
+                'file_path': job['file_path'],
+                'candidate_id': job['candidate_id'],
+                'resume_id': resume_id,
+                'parsed_data': parsed_data,
+                'parse_cached': bool(cached),
+                'timings_ms': {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()}
+            }
+            Database.execute(
+                """
+                UPDATE resume_jobs
+                SET status = 'done', result = %s, error = NULL, finished_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+                """,
+                (json.dumps(result, default=str), job['id'])
+            )
+            return True
+        except Exception as e:
+            max_attempts = current_app.config.get('RESUME_JOB_MAX_ATTEMPTS', 3)
+            # A document that can't be extracted (or got its sandbox worker killed) fails the same way every time
+            retry = job['attempts'] < max_attempts and not isinstance(e, ExtractionError)
+            status = 'queued' if retry else 'failed'
+            print(f"Resume job {job['id']} failed on attempt {job['attempts']}: {e}")
+            Database.execute(
+                """
+                UPDATE resume_jobs
+                SET status = %s, error = %s, finished_at = CASE WHEN %s = 'failed' THEN CURRENT_TIMESTAMP END
+                WHERE id = %s
+                """,
+                (status, str(e), status, job['id'])
+            )
+            return False
+
+    @staticmethod
+    def _stage(job, stage):
+        Database.execute("UPDATE resume_jobs SET stage = %s WHERE id = %s", (stage, job['id']))
+        return time.perf_counter()
+
+    @staticmethod
+    def _queue_embedding(resume_id, text):
+        if not current_app.config.get('RESUME_PIPELINE_EMBED', True) or not text.strip():
+            return
+        # The vector index is a best-effort extra: a failure here shouldn't fail the upload
+        try:
+            Database.execute(
+                "INSERT INTO vector_index_queue (resume_id) VALUES (%s) ON CONFLICT (resume_id) DO NOTHING",
+                (resume_id,)
+            )
+        except Exception as e:
+            print(f"WARNING: Could not queue resume {resume_id} for the vector store: {e}")
+
+    @staticmethod
+    def index_pending(batch_size=None):
+        """
+        Adds up to `batch_size` queued resumes to the vector store and removes
+        them from the queue in the same transaction, so a failed batch stays
+        queued. Returns the number of resumes taken off the queue.
+        """
+        from app.services.rag.rag_service import RAGService
+
+        batch_size = batch_size or current_app.config.get('RAG_ENCODE_BATCH_SIZE', 64)
+        with Database.transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT q.resume_id, r.parsed_text
+                FROM vector_index_queue q JOIN resumes r ON r.id = q.resume_id
+                ORDER BY q.queued_at, q.resume_id
+                LIMIT %s
+                FOR UPDATE OF q SKIP LOCKED
+                """,
+                (batch_size,)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+            RAGService.get_instance().add_documents(
+                [(resume_id, text or '', 'resume') for resume_id, text in rows], batch_size=batch_size
+            )
+            cursor.execute("DELETE FROM vector_index_queue WHERE resume_id = ANY(%s)", ([row[0] for row in rows],))
+        return len(rows)
+
+    @staticmethod
+    def run_indexer(poll_interval=1.0, running=lambda: True):
+        """Drains vector_index_queue while `running()` is true. Run it in one process only."""
+        print(f"Vector indexer {os.getpid()} started.")
+        while running():
+            try:
+                indexed = ResumePipeline.index_pending()
+            except Exception as e:
+                print(f"WARNING: Could not add queued resumes to the vector store: {e}")
+                indexed = 0
+            if indexed:
+                print(f"Indexed {indexed} resumes into the vector store.")
+            else:
+                time.sleep(poll_interval)
+
+    @staticmethod
+    def _log_sandbox_stats():
+        from app.services.parsing.sandbox import ExtractionSandbox
+        if ExtractionSandbox._instance is not None:
+            print(f"Extraction sandbox (worker {os.getpid()}): {ExtractionSandbox._instance.stats()}")
+
+    @staticmethod
+    def run_worker(poll_interval=1.0, max_jobs=None):
+        """Processes jobs until `max_jobs` have been handled (forever if None)."""
+        handled = 0
+        print(f"Resume worker {os.getpid()} started.")
+        while max_jobs is None or handled < max_jobs:
+            job = ResumePipeline.claim_next()
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            ok = ResumePipeline.process(job)
+            handled += 1
+            print(f"Resume job {job['id']} {'done' if ok else 'failed'} (worker {os.getpid()}).")
+            if handled % 100 == 0:
+                ResumePipeline._log_sandbox_stats()
+        return handled
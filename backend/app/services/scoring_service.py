@@ -0,0 +1,118 @@
+import time
+import numpy as np
+from flask import current_app
+from app.db import Database
+from app.services.skill_matcher import SkillMatcher
+
+class ScoringService:
+    """Scores applications against their job's requirements, a whole job at a time."""
+
+    @staticmethod
+    def score_job(job_id, application_ids=None):
+        """
+        Scores every application for the job (or just `application_ids`) in one pass:
+        the job text is embedded once, all resumes are embedded in one batch, and
+        cosine similarity plus requirement-skill coverage are computed as matrix
+        operations.
+        The results are bulk-written to analysis_results and applications.score.
+        Returns a list of {'application_id', 'score', ...} dicts.
+        """
+        from app.services.rag.embeddings import Embedder
+        start = time.perf_counter()
+
+        job = Database.query(
+            "SELECT title, description, requirements FROM job_postings WHERE id = %s",
+            (job_id,),
+            fetchone=True
+        )
+        if not job:
+            raise ValueError("Job not found")
+
+        sql = """
+            SELECT a.id, COALESCE(r.parsed_text, ''), COALESCE(c.skills, ''), COALESCE(c.headline, ''), COALESCE(c.summary, '')
+            FROM applications a
+            JOIN candidates c ON a.candidate_id = c.id
+            LEFT JOIN LATERAL (
+                SELECT parsed_text FROM resumes
+                WHERE candidate_id = a.candidate_id
+                ORDER BY uploaded_at DESC LIMIT 1
+            ) r ON true
+            WHERE a.job_id = %s
+        """
+        params = [job_id]
+        if application_ids:
+            sql += " AND a.id = ANY(%s)"
+            params.append(list(application_ids))
+        rows = Database.query(sql, tuple(params), fetchall=True)
+        if not rows:
+            return []
+
+        app_ids = [r[0] for r in rows]
+        resume_texts = ["\n".join(part for part in r[1:] if part) for r in rows]
+        job_text = "\n".join(part for part in job if part)
+
+        embedder = Embedder.from_config(current_app.config)
+        job_vector = embedder.encode([job_text])[0]
+        resume_vectors = embedder.encode(resume_texts, batch_size=current_app.config.get('RAG_ENCODE_BATCH_SIZE', 64))
+
+        similarity = ScoringService._cosine(resume_vectors, job_vector)
+        keywords, matched, missing = SkillMatcher.default().match_requirements(resume_texts, job_text)
+
+        weight = current_app.config.get('SCORING_SEMANTIC_WEIGHT', 0.6)
+        if keywords:
+            coverage = matched.mean(axis=1)
+            scores = weight * np.clip(similarity, 0, 1) + (1 - weight) * coverage
+        else:
+            # The JD names no known skills, so only the semantic match is meaningful
+            coverage = np.zeros(len(rows))
+            scores = np.clip(similarity, 0, 1)
+        scores = np.rint(100 * scores).astype(int)
+
+        results = []
+        keyword_array = np.array(keywords, dtype=object)
+        for i, app_id in enumerate(app_ids):
+            results.append({
+                'application_id': app_id,
+                'score': int(scores[i]),
+                'similarity': round(float(similarity[i]), 4),
+                'keyword_coverage': round(float(coverage[i]), 4),
+                'keywords_matched': keyword_array[matched[i]].tolist(),
+                'missing_keywords': keyword_array[missing[i]].tolist()
+            })
+
+        ScoringService._save(results)
+        print(f"Scored {len(results)} applications for job {job_id} in {time.perf_counter() - start:.2f}s")
+        return results
+
+    @staticmethod
+    def _cosine(matrix, vector):
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+        return (matrix @ vector) / np.where(norms == 0, 1, norms)
+
+    @staticmethod
+    def _save(results):
+        rows = [
+            (
+                r['application_id'],
+                r['score'],
+                f"Semantic similarity {r['similarity']:.2f}; covers {len(r['keywords_matched'])} of "
+                f"{len(r['keywords_matched']) + len(r['missing_keywords'])} requirement skills.",
+                ", ".join(r['keywords_matched']),
+                ", ".join(r['missing_keywords'])
+            )
+            for r in results
+        ]
+        # One statement per page both records the analysis and updates the application score
+        Database.execute_values(
+            """
+            WITH scores (application_id, match_score, analysis_text, keywords_matched, missing_keywords) AS (VALUES %s),
+            inserted AS (
+                INSERT INTO analysis_results (application_id, match_score, analysis_text, keywords_matched, missing_keywords)
+                SELECT application_id, match_score, analysis_text, keywords_matched, missing_keywords FROM scores
+            )
+            UPDATE applications a SET score = s.match_score
+            FROM scores s
+            WHERE a.id = s.application_id
+            """,
+            rows
+        )
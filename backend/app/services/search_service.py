@@ -0,0 +1,196 @@
+import json
+import time
+import base64
+from datetime import datetime
+from flask import current_app
+from app.db import Database
+
+CANDIDATE_COLUMNS = "c.id, c.first_name, c.last_name, c.email, c.phone, c.linkedin_url, c.created_at, c.skills, c.experience_years"
+
+
+def encode_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, fields):
+    """Decodes a page cursor that must hold exactly `fields` (name -> type). Raises ValueError otherwise."""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(data, dict) or set(data) != set(fields):
+        raise ValueError("Invalid cursor")
+    for name, kind in fields.items():
+        if isinstance(data[name], bool) or not isinstance(data[name], kind):
+            raise ValueError("Invalid cursor")
+    return data
+
+
+class CandidateSearchService:
+    """
+    Hybrid candidate search.
+
+    A lexical stage (full-text + trigram indexes on candidates and resumes, see
+    migrate_search_indexes.py) and a semantic stage (the FAISS resume store)
+    each produce a ranked list of at most SEARCH_CANDIDATE_POOL candidate ids.
+    The lists are fused with reciprocal-rank fusion and paginated with a keyset
+    cursor over (fused score, id). Every call returns per-stage timings in ms.
+    """
+
+    @staticmethod
+    def search(query, min_experience=None, limit=None, cursor=None):
+        config = current_app.config
+        limit = limit or config.get('SEARCH_PAGE_SIZE', 50)
+        limit = max(1, min(limit, config.get('SEARCH_MAX_PAGE_SIZE', 200)))
+        timings = {}
+
+        if not query:
+            after = decode_cursor(cursor, {'created_at': str, 'id': int})
+            if after:
+                try:
+                    after['created_at'] = datetime.fromisoformat(after['created_at'])
+                except ValueError:
+                    raise ValueError("Invalid cursor")
+            start = time.perf_counter()
+            rows, next_cursor = CandidateSearchService._list_recent(min_experience, limit, after)
+            timings['list'] = CandidateSearchService._elapsed(start)
+            return [CandidateSearchService._as_dict(r) for r in rows], next_cursor, timings
+
+        after = decode_cursor(cursor, {'score': (int, float), 'id': int})
+        pool = config.get('SEARCH_CANDIDATE_POOL', 200)
+
+        start = time.perf_counter()
+        lexical = CandidateSearchService._lexical(query, pool)
+        timings['lexical'] = CandidateSearchService._elapsed(start)
+
+        start = time.perf_counter()
+        semantic = CandidateSearchService._semantic(query, pool)
+        timings['semantic'] = CandidateSearchService._elapsed(start)
+
+        start = time.perf_counter()
+        fused = CandidateSearchService.reciprocal_rank_fusion([lexical, semantic], config.get('SEARCH_RRF_K', 60))
+        if after:
+            fused = [(cid, score) for cid, score in fused if (score, cid) < (after['score'], after['id'])]
+        timings['fusion'] = CandidateSearchService._elapsed(start)
+
+        start = time.perf_counter()
+        rows = CandidateSearchService._hydrate([cid for cid, _ in fused], min_experience)
+        page = []
+        next_cursor = None
+        for cid, score in fused:
+            if cid not in rows:
+                continue
+            if len(page) == limit:
+                last_id, last_score = page[-1][0], page[-1][1]
+                next_cursor = encode_cursor({'score': last_score, 'id': last_id})
+                break
+            page.append((cid, score))
+        results = [dict(CandidateSearchService._as_dict(rows[cid]), score=round(score, 6)) for cid, score in page]
+        timings['hydrate'] = CandidateSearchService._elapsed(start)
+
+        return results, next_cursor, timings
+
+    @staticmethod
+    def reciprocal_rank_fusion(rankings, k=60):
+        """Fuses ranked id lists: score(id) = sum over lists of 1 / (k + rank). Sorted by (score, id) desc."""
+        scores = {}
+        for ranking in rankings:
+            for rank, cid in enumerate(ranking, start=1):
+                scores[cid] = scores.get(cid, 0.0) + 1.0 / (k + rank)
+        return sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    @staticmethod
+    def _lexical(query, pool):
+        rows = Database.query(
+            """
+            WITH q AS (
+                SELECT websearch_to_tsquery('simple', %s) AS simple_q, websearch_to_tsquery('english', %s) AS english_q
+            ),
+            hits AS (
+                SELECT c.id, ts_rank_cd(c.search_document, q.simple_q) + similarity(c.first_name || ' ' || c.last_name, %s) AS rank
+                FROM candidates c, q
+                WHERE c.search_document @@ q.simple_q OR (c.first_name || ' ' || c.last_name) %% %s
+                UNION ALL
+                SELECT r.candidate_id, 0.5 * ts_rank_cd(r.search_document, q.english_q)
+                FROM resumes r, q
+                WHERE r.search_document @@ q.english_q
+            )
+            SELECT id FROM hits
+            GROUP BY id
+            ORDER BY SUM(rank) DESC, id DESC
+            LIMIT %s
+            """,
+            (query, query, query, query, pool),
+            fetchall=True
+        )
+        return [r[0] for r in rows]
+
+    @staticmethod
+    def _semantic(query, pool):
+        try:
+            from app.services.rag.rag_service import RAGService
+            hits = RAGService.get_instance().search(query, k=pool)
+        except Exception as e:
+            print(f"WARNING: Semantic candidate search unavailable ({e}). Using lexical results only.")
+            return []
+
+        resume_ids = [h['document']['id'] for h in hits if h['document']['source'] == 'resume']
+        if not resume_ids:
+            return []
+        owners = dict(Database.query(
+            "SELECT id, candidate_id FROM resumes WHERE id = ANY(%s)",
+            (resume_ids,),
+            fetchall=True
+        ))
+        ranking = []
+        for resume_id in resume_ids:
+            cid = owners.get(resume_id)
+            if cid is not None and cid not in ranking:
+                ranking.append(cid)
+        return ranking
+
+    @staticmethod
+    def _hydrate(candidate_ids, min_experience):
+        if not candidate_ids:
+            return {}
+        sql = f"SELECT {CANDIDATE_COLUMNS} FROM candidates c WHERE c.id = ANY(%s)"
+        params = [candidate_ids]
+        if min_experience is not None:
+            sql += " AND c.experience_years >= %s"
+            params.append(min_experience)
+        rows = Database.query(sql, tuple(params), fetchall=True)
+        return {r[0]: r for r in rows}
+
+    @staticmethod
+    def _list_recent(min_experience, limit, after):
+        sql = f"SELECT {CANDIDATE_COLUMNS} FROM candidates c WHERE 1=1"
+        params = []
+        if min_experience is not None:
+            sql += " AND c.experience_years >= %s"
+            params.append(min_experience)
+        if after:
+            sql += " AND (c.created_at, c.id) < (%s, %s)"
+            params.extend([after['created_at'], after['id']])
+        sql += " ORDER BY c.created_at DESC, c.id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        rows = Database.query(sql, tuple(params), fetchall=True)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor({'created_at': rows[-1][6].isoformat(), 'id': rows[-1][0]})
+        return rows, next_cursor
+
+    @staticmethod
+    def _as_dict(r):
+        return {
+            'id': r[0], 'first_name': r[1], 'last_name': r[2],
+            'email': r[3], 'phone': r[4], 'linkedin_url': r[5],
+            'created_at': r[6], 'skills': r[7], 'experience_years': r[8]
+        }
+
+    @staticmethod
+    def _elapsed(start):
+        return round((time.perf_counter() - start) * 1000, 2)
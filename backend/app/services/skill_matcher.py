@@ -0,0 +1,201 @@
+from collections import deque
+import numpy as np
+
+# Canonical skill name -> aliases as they appear in resumes and JDs (matched case-insensitively
+# on word boundaries). Ambiguous English words like "go" or "r" are only listed in unambiguous forms.
+SKILL_DICTIONARY = {
+    'Python': ['python'],
+    'Java': ['java'],
+    'JavaScript': ['javascript', 'js', 'ecmascript'],
+    'TypeScript': ['typescript', 'ts'],
+    'C': ['c language', 'ansi c'],
+    'C++': ['c++', 'cpp'],
+    'C#': ['c#', 'csharp', 'c sharp'],
+    'Go': ['golang', 'go lang'],
+    'Rust': ['rust'],
+    'Ruby': ['ruby'],
+    'PHP': ['php'],
+    'Kotlin': ['kotlin'],
+    'Swift': ['swift'],
+    'Scala': ['scala'],
+    'R': ['r programming', 'rstudio'],
+    'SQL': ['sql'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3'],
+    'React': ['react', 'react.js', 'reactjs'],
+    'Angular': ['angular', 'angularjs'],
+    'Vue.js': ['vue', 'vue.js', 'vuejs'],
+    'Next.js': ['next.js', 'nextjs'],
+    'Node.js': ['node', 'node.js', 'nodejs'],
+    'Express': ['express.js', 'expressjs'],
+    'Django': ['django'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Spring': ['spring', 'spring boot', 'springboot'],
+    '.NET': ['.net', 'dotnet', 'asp.net'],
+    'PostgreSQL': ['postgresql', 'postgres'],
+    'MySQL': ['mysql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'],
+    'Elasticsearch': ['elasticsearch', 'elastic search'],
+    'Kafka': ['kafka'],
+    'RabbitMQ': ['rabbitmq'],
+    'GraphQL': ['graphql'],
+    'REST': ['rest api', 'rest apis', 'restful'],
+    'AWS': ['aws', 'amazon web services'],
+    'Azure': ['azure'],
+    'GCP': ['gcp', 'google cloud'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'Terraform': ['terraform'],
+    'Ansible': ['ansible'],
+    'Jenkins': ['jenkins'],
+    'CI/CD': ['ci/cd', 'cicd', 'continuous integration'],
+    'Git': ['git', 'github', 'gitlab'],
+    'Linux': ['linux', 'unix'],
+    'Microservices': ['microservices', 'micro services'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'Deep Learning': ['deep learning'],
+    'AI': ['ai', 'artificial intelligence'],
+    'NLP': ['nlp', 'natural language processing'],
+    'Computer Vision': ['computer vision'],
+    'Data Science': ['data science'],
+    'Data Analysis': ['data analysis', 'data analytics'],
+    'TensorFlow': ['tensorflow'],
+    'PyTorch': ['pytorch'],
+    'scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'Spark': ['spark', 'pyspark', 'apache spark'],
+    'Hadoop': ['hadoop'],
+    'Airflow': ['airflow'],
+    'Tableau': ['tableau'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Excel': ['ms excel', 'microsoft excel', 'advanced excel'],
+    'Predictive Modeling': ['predictive modeling', 'predictive modelling'],
+    'Classification': ['classification'],
+    'Clustering': ['clustering'],
+    'Statistics': ['statistics', 'statistical analysis'],
+    'Agile': ['agile', 'scrum', 'kanban'],
+    'JIRA': ['jira'],
+    'Figma': ['figma'],
+    'Selenium': ['selenium'],
+    'Testing': ['unit testing', 'test automation', 'pytest', 'junit'],
+    'Android': ['android'],
+    'iOS': ['ios'],
+    'Flutter': ['flutter'],
+    'React Native': ['react native'],
+}
+
+
+class SkillMatcher:
+    """
+    Finds dictionary skills in text with an Aho-Corasick automaton.
+
+    Every alias of every skill is compiled into one automaton, so a text is
+    scanned once no matter how large the vocabulary is. Matches only count on
+    word boundaries ("java" does not match inside "javascript", nor "js"
+    inside "node.js").
+    """
+    _default = None
+
+    def __init__(self, dictionary=None):
+        dictionary = dictionary or SKILL_DICTIONARY
+        self.skills = list(dictionary)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # per state: (skill index, pattern length)
+        for skill_idx, skill in enumerate(self.skills):
+            for alias in set(a.lower() for a in dictionary[skill]):
+                self._insert(alias, skill_idx)
+        self._build_failure_links()
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _insert(self, pattern, skill_idx):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append((skill_idx, len(pattern)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and ch not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find(self, text):
+        """Returns the set of skill indices that occur in the text."""
+        text = (text or '').lower()
+        found = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                after = text[i + 1] if i + 1 < n else ' '
+                if after.isalnum():
+                    continue
+                for skill_idx, length in output[state]:
+                    start = i - length + 1
+                    if self._starts_word(text, start):
+                        found.add(skill_idx)
+        return found
+
+    @staticmethod
+    def _starts_word(text, start):
+        if start == 0:
+            return True
+        before = text[start - 1]
+        if before.isalnum():
+            return False
+        # "js" in "node.js" or "net" in "asp.net" is part of a dotted name, not a word
+        return not (before == '.' and start >= 2 and text[start - 2].isalnum())
+
+    def names(self, text):
+        return [self.skills[i] for i in sorted(self.find(text))]
+
+    def vector(self, text):
+        """Boolean vector over the vocabulary of the skills found in the text."""
+        vector = np.zeros(len(self.skills), dtype=bool)
+        vector[list(self.find(text))] = True
+        return vector
+
+    def matrix(self, texts):
+        """Boolean [len(texts), vocabulary] skill presence matrix, one scan per text."""
+        matrix = np.zeros((len(texts), len(self.skills)), dtype=bool)
+        for row, text in enumerate(texts):
+            matrix[row, list(self.find(text))] = True
+        return matrix
+
+    def match_requirements(self, texts, requirements_text):
+        """
+        Matched and missing requirement skills for many texts against one JD.
+        Returns (required_names, matched, missing) where matched/missing are
+        boolean [len(texts), len(required_names)] arrays.
+        """
+        required = self.vector(requirements_text)
+        columns = np.flatnonzero(required)
+        presence = self.matrix(texts)[:, columns]
+        return [self.skills[c] for c in columns], presence, ~presence
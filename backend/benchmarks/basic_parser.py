@@ -0,0 +1,313 @@
+"""
+Micro-benchmark of the regex fallback parser: the previous multi-pass
+implementation (kept below as LegacyParser, debug prints removed) vs the
+single-pass ResumeScanner, on a generated corpus of resumes. Also reports how
+often both agree on each extracted field.
+
+    python benchmarks/basic_parser.py --docs 500 --repeat 5
+"""
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+sys.path.append(os.getcwd())
+
+from app.services.parsing.basic_parser import ResumeScanner
+
+FIRST_NAMES = ['Asha', 'Rahul', 'Maria', 'John', 'Wei', 'Fatima', 'Carlos', 'Priya']
+LAST_NAMES = ['Sharma', 'Smith', 'Garcia', 'Chen', 'Khan', 'Okafor', 'Iyer']
+TITLES = ['Software Engineer', 'Data Scientist', 'Backend Developer', 'DevOps Engineer', 'Product Analyst']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli']
+SKILLS = ['Python', 'Java', 'React', 'Node.js', 'SQL', 'AWS', 'Docker', 'Kubernetes', 'Pandas', 'Tableau', 'Git', 'Agile']
+FILLER = "Designed and shipped features used by thousands of customers, improving latency and reliability across services."
+
+
+def make_resume(rng, jobs):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        rng.choice(TITLES),
+        f"{first.lower()}.{last.lower()}@example.com | +91 9{rng.randint(1000, 9999)}6 8{rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"Engineer with {rng.randint(1, 15)}+ years of experience building data-heavy products.",
+        "",
+        "Technical Skills",
+        ", ".join(rng.sample(SKILLS, 6)),
+        "",
+        "Work Experience",
+    ]
+    for _ in range(jobs):
+        start = rng.randint(2005, 2020)
+        lines.append(f"{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | {start} - {start + rng.randint(1, 4)}")
+        lines.extend(f"- {FILLER}" for _ in range(rng.randint(3, 8)))
+    lines += [
+        "",
+        "Education",
+        "Bachelor of Technology in Computer Science",
+        "Indian Institute of Technology",
+        str(rng.randint(2000, 2018)),
+        "",
+        "Projects",
+        f"Built a resume parser in {rng.choice(SKILLS)}. {FILLER}",
+    ]
+    return "\n".join(lines)
+
+
+def timed(fn, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [fn(text) for text in corpus]
+    return (time.perf_counter() - start) / (repeat * len(corpus)) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the regex fallback resume parser.")
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [make_resume(rng, rng.randint(1, 12)) for _ in range(args.docs)]
+    avg_chars = sum(map(len, corpus)) / len(corpus)
+    print(f"{len(corpus)} resumes, {avg_chars:.0f} chars on average")
+
+    scanner = ResumeScanner()
+    legacy_us, legacy = timed(LegacyParser.parse_basic, corpus, args.repeat)
+    scanner_us, scanned = timed(scanner.scan, corpus, args.repeat)
+    print(f"  legacy:  {legacy_us:8.1f} us/resume")
+    print(f"  scanner: {scanner_us:8.1f} us/resume ({legacy_us / scanner_us:.1f}x faster)")
+
+    for field in ('first_name', 'last_name', 'email', 'phone', 'experience_years', 'education', 'experience', 'projects'):
+        same = sum(a[field] == b[field] for a, b in zip(legacy, scanned))
+        print(f"  {field:<17} identical in {same}/{len(corpus)}")
+
+
+class LegacyParser:
+    @staticmethod
+    def parse_basic(text):
+        lines = [l.strip() for l in text.split('\n') if l.strip()]
+        
+        # Improved Name Extraction Heuristic
+        first_name = ""
+        last_name = ""
+        
+        # Iterate through first few lines to find a likely name
+        # Skip lines that look like headers or contact info
+        for i in range(min(10, len(lines))):
+            line = lines[i]
+            # Check if line is not a common header or email/phone
+            if LegacyParser._is_likely_name(line):
+                name_parts = line.split(' ')
+                if len(name_parts) >= 2:
+                    first_name = name_parts[0]
+                    last_name = " ".join(name_parts[1:])
+                    break
+                elif len(name_parts) == 1:
+                    first_name = name_parts[0]
+                    # If single name, maybe look at next line? But standard is full name on one line.
+                    break
+        
+        # Heuristic for experience
+        exp_match = re.search(r'(\d+)\+?\s*years?', text, re.IGNORECASE)
+        experience_years = int(exp_match.group(1)) if exp_match else 0
+
+        # Extract sections
+        sections = LegacyParser._extract_sections(text)
+        
+        # Parse sections
+        education = LegacyParser._parse_education_section(sections.get('education', ''))
+        experience = LegacyParser._parse_experience_section(sections.get('experience', ''))
+        projects = LegacyParser._parse_projects_section(sections.get('projects', ''))
+
+        data = {
+            'text': text,
+            'email': LegacyParser._extract_email(text),
+            'phone': LegacyParser._extract_phone(text),
+            'skills': LegacyParser._extract_skills(text),
+            'first_name': first_name,
+            'last_name': last_name,
+            'experience_years': experience_years,
+            'headline': f"{first_name} {last_name} - Resume", # Default headline
+            'summary': text[:500] + "...",
+            'education': education,
+            'experience': experience,
+            'projects': projects,
+            'languages': []
+        }
+        return data
+
+    @staticmethod
+    def _is_likely_name(line):
+        """Check if a line is likely a name (not email, phone, header, or too long)"""
+        if len(line.split(' ')) > 5: return False # Names usually aren't sentences
+        if '@' in line: return False # Email
+        if re.search(r'\d', line): return False # Phone or address usually has digits
+        
+        keywords = ['resume', 'curriculum', 'vitae', 'cv', 'profile', 'summary', 'education', 'experience', 'skills', 'projects', 'contact']
+        if line.lower() in keywords: return False
+        
+        # Check for capitalization (heuristic: Name usually Title Case or ALL CAPS)
+        # But some PDFs extraction might be messy. 
+        # Let's assume non-keyword short line at top is name.
+        return True
+
+    @staticmethod
+    def _extract_sections(text):
+        sections = {'education': '', 'experience': '', 'projects': '', 'skills': ''}
+        current_section = None
+        lines = text.split('\n')
+        
+        keywords = {
+            'education': ['education', 'academic', 'qualifications', 'education history'],
+            'experience': ['experience', 'work history', 'employment', 'professional experience', 'work experience'],
+            'projects': ['projects', 'personal projects', 'academic projects'],
+            'skills': ['skills', 'core skills', 'technical skills', 'technologies', 'competencies']
+        }
+        
+        for line in lines:
+            line_clean = line.strip().lower()
+            # Check if line is a header (short and contains keyword)
+            is_header = False
+            if len(line_clean) < 40:
+                for section, keys in keywords.items():
+                    if any(k == line_clean or k in line_clean for k in keys):
+                        current_section = section
+                        is_header = True
+                        break
+            
+            if is_header:
+                continue
+                
+            if current_section:
+                sections[current_section] += line + "\n"
+        
+        return sections
+
+    @staticmethod
+    def _parse_education_section(text):
+        if not text: return []
+        entries = []
+        # Simple heuristic: Look for degree keywords or institution types
+        degrees = ['bachelor', 'master', 'b.tech', 'm.tech', 'phd', 'diploma', 'bsc', 'msc', 'bca', 'mca', 'university', 'college', 'institute', 'school']
+        lines = text.split('\n')
+        current_entry = {}
+        
+        for line in lines:
+            line_lower = line.lower()
+            if any(d in line_lower for d in degrees):
+                if current_entry: entries.append(current_entry)
+                current_entry = {'degree': line.strip(), 'school': '', 'year': ''}
+            elif current_entry:
+                # Assume next line is school or year
+                if re.search(r'\d{4}', line):
+                    current_entry['year'] = line.strip()
+                elif not current_entry['school']:
+                    current_entry['school'] = line.strip()
+        
+        if current_entry: entries.append(current_entry)
+        
+        # If no structure found but text exists, return raw text as one entry
+        if not entries and text.strip():
+            return [{'degree': 'Education Details', 'school': text[:200], 'year': ''}]
+            
+        return entries
+
+    @staticmethod
+    def _parse_experience_section(text):
+        if not text: return []
+        entries = []
+        # Look for date ranges
+        date_pattern = r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*\d{4})|(\d{4}\s*-\s*(?:present|current|\d{4}))'
+        lines = text.split('\n')
+        current_entry = {}
+        
+        for line in lines:
+            # Check for pipe separated lines which often contain Role | Company | Date
+            if '|' in line:
+                parts = [p.strip() for p in line.split('|')]
+                # Try to find date in parts
+                date_part = next((p for p in parts if re.search(date_pattern, p, re.IGNORECASE)), None)
+                if date_part:
+                    if current_entry: entries.append(current_entry)
+                    # Guess: First part is Role, Second is Company (or vice versa)
+                    role = parts[0]
+                    company = parts[1] if len(parts) > 1 else ""
+                    current_entry = {'title': role, 'company': company, 'duration': date_part, 'description': ''}
+                    continue
+
+            if re.search(date_pattern, line, re.IGNORECASE):
+                if current_entry: entries.append(current_entry)
+                current_entry = {'title': 'Role', 'company': line.strip(), 'duration': '', 'description': ''}
+                match = re.search(date_pattern, line, re.IGNORECASE)
+                if match:
+                    current_entry['duration'] = match.group(0)
+            elif current_entry:
+                if not current_entry['title'] or current_entry['title'] == 'Role':
+                    current_entry['title'] = line.strip()
+                else:
+                    current_entry['description'] += line.strip() + " "
+        
+        if current_entry: entries.append(current_entry)
+        
+        if not entries and text.strip():
+            return [{'title': 'Work Experience', 'company': '', 'duration': '', 'description': text[:500]}]
+            
+        return entries
+
+    @staticmethod
+    def _parse_projects_section(text):
+        if not text: return []
+        return [{'title': 'Project Details', 'description': text[:500], 'link': ''}]
+
+    @staticmethod
+    def _extract_email(text):
+        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+        match = re.search(email_pattern, text)
+        return match.group(0) if match else None
+
+    @staticmethod
+    def _extract_phone(text):
+        # Improved phone regex to handle more formats including spaces and 5-5 split
+        # Matches: +91 97696 86972, 97696 86972, +1-555-555-5555
+        phone_pattern = r'(\+\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}|(\+\d{1,3}[\s.-]?)?\d{5}[\s.-]?\d{5}'
+        match = re.search(phone_pattern, text)
+        return match.group(0) if match else None
+
+    @staticmethod
+    def _extract_skills(text):
+        # 1. Try to find a "Skills" section and extract from there
+        sections = LegacyParser._extract_sections(text)
+        skills_text = sections.get('skills', '') # We need to update _extract_sections to find 'skills'
+        
+        found_skills = set()
+        
+        if skills_text:
+            # Split by common delimiters
+            potential_skills = re.split(r'[,|•\n]', skills_text)
+            for s in potential_skills:
+                s = s.strip()
+                if 2 < len(s) < 30: # Reasonable length for a skill
+                    found_skills.add(s)
+        
+        # 2. Also scan for common keywords in the whole text (fallback/augmentation)
+        common_skills = [
+            'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker', 
+            'kubernetes', 'c++', 'c#', 'go', 'rust', 'typescript', 'html', 'css',
+            'machine learning', 'ai', 'data science', 'git', 'linux', 'agile',
+            'predictive modeling', 'classification', 'clustering', 'tableau', 'power bi'
+        ]
+        text_lower = text.lower()
+        for skill in common_skills:
+            if skill in text_lower:
+                found_skills.add(skill) # Add proper case if we had a map, but here just lowercase match
+                
+        return list(found_skills)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+PDF text extraction benchmark: the old `text += page.get_text()` loop vs the
+streaming extractor (serial, head-only and page-parallel).
+
+Generates synthetic resumes with PyMuPDF, so it needs neither the database
+nor sample files:
+
+    python benchmarks/pdf_extract.py --pages 1 40 --repeat 20 --workers 4
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+import fitz  # PyMuPDF
+
+sys.path.append(os.getcwd())
+
+from app.services.parsing import pdf_text
+
+LINE = "Senior Software Engineer, Acme Corp (2018 - 2023). Built Python/Django services on AWS, led a team of 5."
+
+
+def make_pdf(path, pages):
+    with fitz.open() as doc:
+        for number in range(pages):
+            page = doc.new_page()
+            text = "\n".join(f"{number}.{row} {LINE}" for row in range(45))
+            page.insert_textbox(page.rect + (36, 36, -36, -36), text, fontsize=8)
+        doc.save(path)
+
+
+def legacy_extract(path):
+    text = ""
+    with fitz.open(path) as doc:
+        for page in doc:
+            text += page.get_text()
+    return text
+
+
+def timed(fn, repeat):
+    fn()  # warm up (and start the pool for the parallel case)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction strategies.")
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 40], help="Document sizes to test")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--head-chars', type=int, default=4000, help="max_chars for the head-only case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'pages':>5} {'strategy':<22} {'ms/doc':>9} {'chars':>9} {'speedup':>8}")
+        for pages in args.pages:
+            path = os.path.join(tmp, f"resume_{pages}.pdf")
+            make_pdf(path, pages)
+            strategies = [
+                ('legacy (+= loop)', lambda: legacy_extract(path)),
+                ('streaming', lambda: pdf_text.extract_text(path)),
+                (f'head ({args.head_chars} chars)', lambda: pdf_text.extract_text(path, max_chars=args.head_chars)),
+                (f'parallel x{args.workers}', lambda: pdf_text.extract_text(path, workers=args.workers, parallel_min_pages=2)),
+            ]
+            baseline = None
+            for name, fn in strategies:
+                ms, chars = timed(fn, args.repeat)
+                baseline = baseline or ms
+                print(f"{pages:>5} {name:<22} {ms:>9.2f} {chars:>9} {baseline / ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
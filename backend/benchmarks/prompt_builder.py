@@ -0,0 +1,64 @@
+"""
+Resume prompt size and coverage: the old `LLM_PROMPT` with `text[:4000]` vs
+the token-budgeted prompt builder, on generated resumes of growing length.
+Coverage is the share of jobs (Role | Company | Date lines) and of sections
+(education, projects) that reach the LLM. No LLM calls are made.
+
+    python benchmarks/prompt_builder.py --docs 300 --budget 1500
+"""
+import sys
+import os
+import random
+import argparse
+
+sys.path.append(os.getcwd())
+
+from benchmarks.basic_parser import make_resume
+from app.services.parsing import prompt_builder
+from app.services.parsing.resume_parser import LLM_PROMPT
+
+
+def coverage(text, prompts):
+    sent = '\n'.join(prompts)
+    jobs = [line for line in text.split('\n') if line.count(' | ') == 2]
+    sections = [s for s in ('Education', 'Projects') if s in text]
+    return (
+        sum(1 for job in jobs if job in sent) / len(jobs) if jobs else 1.0,
+        sum(1 for s in sections if f"\n{s}\n" in sent) / len(sections) if sections else 1.0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare resume LLM prompt strategies.")
+    parser.add_argument('--docs', type=int, default=300)
+    parser.add_argument('--budget', type=int, default=1500, help="LLM_RESUME_TOKEN_BUDGET")
+    parser.add_argument('--map-reduce-tokens', type=int, default=4000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    buckets = {'short (1-2 jobs)': (1, 2), 'medium (3-6 jobs)': (3, 6), 'long (7-12 jobs)': (7, 12), 'very long (20-30 jobs)': (20, 30)}
+    print(f"tokens counted with {'tiktoken' if prompt_builder.tiktoken else 'the built-in estimate'}")
+    print(f"{'resumes':<24} {'prompt':<24} {'prompt tok':>10} {'calls':>6} {'jobs sent':>10} {'sections':>9}")
+    for label, (low, high) in buckets.items():
+        corpus = [make_resume(rng, rng.randint(low, high)) for _ in range(args.docs // len(buckets))]
+        rows = {'text[:4000]': [], 'builder': []}
+        strategies = {}
+        for text in corpus:
+            legacy = [LLM_PROMPT.replace('{text}', text[:4000])]
+            rows['text[:4000]'].append((sum(map(prompt_builder.count_tokens, legacy)), 1) + coverage(text, legacy))
+            plan = prompt_builder.build_prompts(
+                text, LLM_PROMPT, budget=args.budget, map_reduce_tokens=args.map_reduce_tokens, provider='openai'
+            )
+            strategies[plan['strategy']] = strategies.get(plan['strategy'], 0) + 1
+            rows['builder'].append((plan['prompt_tokens'], len(plan['prompts'])) + coverage(text, plan['prompts']))
+        for name, values in rows.items():
+            n = len(values)
+            tokens, calls, jobs, sections = (sum(v[i] for v in values) / n for i in range(4))
+            if name == 'builder':
+                name += f" ({max(strategies, key=strategies.get)})"
+            print(f"{label:<24} {name:<24} {tokens:>10.0f} {calls:>6.2f} {jobs:>10.0%} {sections:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
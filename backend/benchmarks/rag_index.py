@@ -0,0 +1,88 @@
+"""
+Recall@k / QPS benchmark of the ANN index types against the flat baseline.
+
+Runs on synthetic clustered vectors shaped like MiniLM embeddings so it needs
+neither the database nor the sentence-transformers model:
+
+    python benchmarks/rag_index.py --n 200000 --queries 1000 --k 10
+"""
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from app.services.rag.faiss_index import create_index, search_params, train_index
+
+
+def make_vectors(n, dimension, projection, rng):
+    # Sentence embeddings live close to a low-dimensional manifold, so sample
+    # a low-rank latent and project it up rather than using isotropic noise.
+    latent = rng.standard_normal((n, projection.shape[0])).astype('float32')
+    vectors = latent @ projection + 0.05 * rng.standard_normal((n, dimension)).astype('float32')
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def timed_search(index, queries, k, params=None):
+    start = time.perf_counter()
+    if params is not None:
+        _, indices = index.search(queries, k, params=params)
+    else:
+        _, indices = index.search(queries, k)
+    return indices, len(queries) / (time.perf_counter() - start)
+
+
+def recall_at_k(found, truth):
+    k = truth.shape[1]
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--nlist', type=int, default=1024)
+    parser.add_argument('--pq-m', type=int, default=48)
+    parser.add_argument('--hnsw-m', type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    projection = rng.standard_normal((32, args.dimension)).astype('float32')
+    data = make_vectors(args.n, args.dimension, projection, rng)
+    queries = make_vectors(args.queries, args.dimension, projection, rng)
+
+    flat = create_index('flat', args.dimension)
+    flat.add(data)
+    truth, flat_qps = timed_search(flat, queries, args.k)
+
+    print(f"{'index':<8} {'setting':<14} {'recall@' + str(args.k):>10} {'QPS':>10} {'build s':>8}")
+    print(f"{'flat':<8} {'-':<14} {1.0:>10.3f} {flat_qps:>10.0f} {'-':>8}")
+
+    configs = [
+        ('ivfpq', 'nprobe', [1, 4, 16, 64]),
+        ('hnsw', 'efSearch', [16, 32, 64, 128]),
+    ]
+    for index_type, knob, values in configs:
+        start = time.perf_counter()
+        index = create_index(index_type, args.dimension, nlist=args.nlist, pq_m=args.pq_m, hnsw_m=args.hnsw_m)
+        train_index(index, data)
+        index.add(data)
+        build_seconds = time.perf_counter() - start
+
+        for value in values:
+            if knob == 'nprobe':
+                params = search_params(index, nprobe=value)
+            else:
+                params = search_params(index, ef_search=value)
+            found, qps = timed_search(index, queries, args.k, params)
+            print(f"{index_type:<8} {f'{knob}={value}':<14} {recall_at_k(found, truth):>10.3f} {qps:>10.0f} {build_seconds:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import sys
+import os
+import io
+import csv
+import json
+import time
+import hashlib
+import zipfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc', '.rtf', '.html', '.htm', '.txt')
+
+STAGING_COLUMNS = (
+    'source', 'content_hash', 'email', 'first_name', 'last_name', 'phone', 'skills', 'experience_years',
+    'headline', 'summary', 'education', 'experience', 'projects', 'languages', 'file_path', 'file_name', 'parsed_text'
+)
+
+
+def max_file_bytes():
+    """The largest file any extraction backend accepts; bigger files fail without being read."""
+    from app.services.parsing.extractors import EXTRACTORS
+    return max(extractor.max_bytes for extractor in EXTRACTORS)
+
+
+def iter_sources(path, done):
+    """
+    Yields (name, file_path, data, error) for every resume under a directory
+    or in a zip archive, skipping names already in the checkpoint. Directory
+    entries are read by the worker (data is None); zip members are read here,
+    one at a time, since the archive can't be shared across processes. A
+    member over max_file_bytes() is not read (it could be a zip bomb) and
+    comes with an error instead.
+    """
+    if zipfile.is_zipfile(path):
+        limit = max_file_bytes()
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or not name.lower().endswith(RESUME_EXTENSIONS) or name in done:
+                    continue
+                if info.file_size > limit:
+                    yield name, name, None, f"file of {info.file_size} bytes is over the {limit} byte limit"
+                    continue
+                yield name, name, archive.read(info), None
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.lower().endswith(RESUME_EXTENSIONS):
+                continue
+            file_path = os.path.join(root, filename)
+            name = os.path.relpath(file_path, path)
+            if name not in done:
+                yield name, file_path, None, None
+
+
+# Content hashes already in the database, set in each worker by init_worker
+_known_hashes = frozenset()
+
+
+def init_worker(known):
+    global _known_hashes
+    _known_hashes = known
+
+
+def extract_one(name, file_path, data, error, blob_folder, require_email):
+    """
+    Worker: hash, extract and regex-parse one resume, then store it. Never
+    raises. The blob is only written for a resume that can be imported, i.e.
+    one with text (and, with `require_email`, an email the regex parser found).
+    """
+    from app.services.blob_store import BlobStore
+    from app.services.parsing.resume_parser import ResumeParser
+
+    result = {'source': name, 'file_name': os.path.basename(name), 'bytes': 0}
+    if error:
+        result['error'] = error
+        return result
+    try:
+        if data is None:
+            size = os.path.getsize(file_path)
+            if size > max_file_bytes():
+                result['error'] = f"file of {size} bytes is over the {max_file_bytes()} byte limit"
+                return result
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        result['bytes'] = len(data)
+        result['content_hash'] = hashlib.sha256(data).hexdigest()
+        if result['content_hash'] in _known_hashes:
+            # Re-import of a file we already have: skip extraction and parsing entirely
+            return result
+
+        text = ResumeParser.extract_text(name, data=data)
+        if not text.strip():
+            result['error'] = 'no text extracted'
+            return result
+        result['text'] = text
+        result['parsed'] = ResumeParser.parse_basic(text)
+        if require_email and not result['parsed'].get('email'):
+            return result
+        result['file_path'], _, deduplicated = BlobStore(blob_folder).save_bytes(data, name)
+        result['new_blob'] = not deduplicated
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def bounded_imap(executor, fn, items, max_in_flight, *extra):
+    """Like executor.map over tuples, unordered, with at most max_in_flight tasks pending (bounds zip memory)."""
+    pending = set()
+    for item in items:
+        pending.add(executor.submit(fn, *item, *extra))
+        if len(pending) >= max_in_flight:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+    for future in pending:
+        yield future.result()
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(line.rstrip('\n') for line in f if line.strip())
+
+
+def append_checkpoint(path, names):
+    with open(path, 'a', encoding='utf-8') as f:
+        for name in names:
+            f.write(name + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def staging_row(result):
+    parsed = result['parsed']
+    skills = parsed.get('skills') or []
+    return (
+        result['source'],
+        result['content_hash'],
+        parsed['email'].strip().lower()[:255],
+        (parsed.get('first_name') or 'Unknown')[:100],
+        (parsed.get('last_name') or '')[:100],
+        (parsed.get('phone') or '')[:50] or None,
+        ', '.join(skills) if isinstance(skills, list) else skills,
+        parsed.get('experience_years') or 0,
+        parsed.get('headline'),
+        parsed.get('summary'),
+        json.dumps(parsed.get('education', [])),
+        json.dumps(parsed.get('experience', [])),
+        json.dumps(parsed.get('projects', [])),
+        json.dumps(parsed.get('languages', [])),
+        result['file_path'],
+        result['file_name'][:255],
+        result['text'].replace('\x00', '')
+    )
+
+
+def copy_batch(rows):
+    """
+    COPYs one batch into a temp staging table, then inserts new candidates
+    (existing emails are kept as they are) and one resume per row, skipping
+    content hashes already stored. Staged emails are lowercased, so existing
+    candidates are matched on lower(email). Commits once. Returns
+    (candidates, resumes) inserted.
+    """
+    from app.db import Database
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['\\N' if value is None else value for value in row])
+    buffer.seek(0)
+
+    with Database.transaction() as cursor:
+        cursor.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS resume_import_staging (
+                source TEXT, content_hash CHAR(64), email VARCHAR(255), first_name VARCHAR(100), last_name VARCHAR(100),
+                phone VARCHAR(50), skills TEXT, experience_years INTEGER, headline TEXT, summary TEXT,
+                education TEXT, experience TEXT, projects TEXT, languages TEXT,
+                file_path VARCHAR(500), file_name VARCHAR(255), parsed_text TEXT
+            ) ON COMMIT DELETE ROWS
+            """
+        )
+        cursor.copy_expert(
+            f"COPY resume_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+        cursor.execute(
+            """
+            INSERT INTO candidates (first_name, last_name, email, phone, skills, experience_years, headline, summary,
+                                    education, experience, projects, languages)
+            SELECT DISTINCT ON (email) first_name, last_name, email, phone, skills, experience_years, headline, summary,
+                   education, experience, projects, languages
+            FROM resume_import_staging s
+            WHERE NOT EXISTS (SELECT 1 FROM candidates c WHERE lower(c.email) = s.email)
+            ORDER BY email, source
+            ON CONFLICT (email) DO NOTHING
+            """
+        )
+        candidates = cursor.rowcount
+        cursor.execute(
+            """
+            INSERT INTO resumes (candidate_id, file_path, file_name, parsed_text, content_hash)
+            SELECT c.id, s.file_path, s.file_name, s.parsed_text, s.content_hash
+            FROM resume_import_staging s
+            CROSS JOIN LATERAL (
+                SELECT e.id FROM candidates e WHERE lower(e.email) = s.email ORDER BY e.id LIMIT 1
+            ) c
+            WHERE NOT EXISTS (SELECT 1 FROM resumes r WHERE r.content_hash = s.content_hash)
+            """
+        )
+        resumes = cursor.rowcount
+    return candidates, resumes
+
+
+def known_hashes():
+    from app.db import Database
+    rows = Database.query("SELECT content_hash FROM resumes WHERE content_hash IS NOT NULL", fetchall=True)
+    return set(r[0] for r in rows)
+
+
+def llm_parse(results, batch_parser):
+    """
+    Replaces the regex parse of each result with an LLM parse, reusing and
+    filling the parse cache. Keeps the regex email when the LLM found none.
+    """
+    from app.services.parsing.parse_cache import ParseCache
+
+    version = ParseCache.version()
+    texts = {}
+    for result in results:
+        cached = ParseCache.get((result['content_hash'], version))
+        if cached:
+            result['parsed'] = dict(cached[1], email=cached[1].get('email') or result['parsed'].get('email'))
+        else:
+            texts[result['content_hash']] = result['text']
+    if not texts:
+        return
+
+    parsed = batch_parser.parse_many(texts)
+    for result in results:
+        if result['content_hash'] not in parsed:
+            continue
+        data, complete = parsed[result['content_hash']]
+        if complete:
+            ParseCache.put((result['content_hash'], version), result['text'], data)
+            result['parsed'] = dict(data, email=data.get('email') or result['parsed'].get('email'))
+
+
+def run_import(path, workers, batch_size, checkpoint, blob_folder, batch_parser=None):
+    from app.services.blob_store import BlobStore
+
+    done = load_checkpoint(checkpoint)
+    if done:
+        print(f"Resuming: {len(done)} files already processed according to {checkpoint}.")
+    seen = known_hashes()
+
+    counts = {'files': 0, 'bytes': 0, 'candidates': 0, 'resumes': 0, 'duplicates': 0, 'no_email': 0, 'failed': 0}
+    parsed = []
+    batch_names = []
+    start = time.time()
+    last_report = [start]
+    db_seconds = [0.0]
+
+    def discard(result):
+        # A blob this run wrote for a resume that won't be imported (the LLM found no email, or
+        # an in-batch duplicate under another extension). No grace period: no row can point at it yet.
+        if result.get('new_blob'):
+            BlobStore(blob_folder, grace_seconds=0).release(result['file_path'])
+
+    def flush():
+        if batch_parser is not None and parsed:
+            llm_parse(parsed, batch_parser)
+        rows = []
+        for result in parsed:
+            if result['parsed'].get('email'):
+                rows.append(staging_row(result))
+            else:
+                counts['no_email'] += 1
+                discard(result)
+        if rows:
+            t = time.time()
+            try:
+                candidates, resumes = copy_batch(rows)
+                counts['candidates'] += candidates
+                counts['resumes'] += resumes
+            except Exception as e:
+                # Skip the batch rather than stop the run: a rerun would hit the same (cached) parse again
+                counts['failed'] += len(rows)
+                print(f"WARNING: Batch of {len(rows)} resumes not imported: {e}")
+                for result in parsed:
+                    if result['parsed'].get('email'):
+                        discard(result)
+            db_seconds[0] += time.time() - t
+        # Only checkpoint what is committed, so an interrupted run redoes at most one batch
+        append_checkpoint(checkpoint, batch_names)
+        parsed.clear()
+        batch_names.clear()
+
+    def report(final=False):
+        now = time.time()
+        if not final and now - last_report[0] < 5:
+            return
+        last_report[0] = now
+        elapsed = (now - start) or 1e-9
+        print(
+            f"  {counts['files']} files ({counts['files'] / elapsed:.1f} files/sec, "
+            f"{counts['bytes'] / elapsed / 1e6:.1f} MB/s): {counts['resumes']} resumes, "
+            f"{counts['candidates']} new candidates, {counts['duplicates']} duplicates, "
+            f"{counts['no_email']} without email, {counts['failed']} failed"
+        )
+
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=init_worker, initargs=(frozenset(seen),)) as executor:
+        for result in bounded_imap(executor, extract_one, iter_sources(path, done), workers * 4,
+                                    blob_folder, batch_parser is None):
+            counts['files'] += 1
+            counts['bytes'] += result['bytes']
+            batch_names.append(result['source'])
+
+            if 'error' in result:
+                counts['failed'] += 1
+                print(f"WARNING: {result['source']}: {result['error']}")
+            elif 'parsed' not in result or result['content_hash'] in seen:
+                counts['duplicates'] += 1
+                discard(result)
+            else:
+                seen.add(result['content_hash'])
+                parsed.append(result)
+
+            if len(batch_names) >= batch_size:
+                flush()
+            report()
+        flush()
+
+    elapsed = time.time() - start
+    print(f"Imported {counts['resumes']} resumes in {elapsed:.1f}s.")
+    report(final=True)
+    print(f"  Database time: {db_seconds[0]:.1f}s, extraction and parsing: {elapsed - db_seconds[0]:.1f}s")
+    if batch_parser is not None:
+        stats = batch_parser.stats()
+        print(
+            f"  LLM: {stats['parsed']} parsed, {stats['fallbacks']} regex fallbacks, {stats['requests']} requests "
+            f"({stats['packed_requests']} packed, {stats['rate_limited']} rate limited), "
+            f"{stats['resumes_per_minute']} resumes/min, ~{stats['input_tokens']} input / ~{stats['output_tokens']} output tokens, "
+            f"estimated cost {stats['estimated_cost']}"
+        )
+    if counts['resumes']:
+        print("Run reindex_resumes.py to add the imported resumes to the vector store.")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import PDF, DOCX, RTF, HTML or text resumes from a directory or zip archive.")
+    parser.add_argument('path', help="Directory or .zip archive of resumes")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    parser.add_argument('--batch-size', type=int, default=500, help="Files per COPY/commit (and checkpoint)")
+    parser.add_argument('--checkpoint', help="Checkpoint file, defaults to <path>.import-checkpoint")
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint and start over")
+    parser.add_argument('--llm', action='store_true', help="Parse with the configured LLM (LLM_BATCH_* settings) instead of the regex parser")
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or os.path.abspath(args.path).rstrip(os.sep) + '.import-checkpoint'
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        batch_parser = None
+        if args.llm:
+            from app.services.parsing.resume_parser import ResumeParser
+            from app.services.parsing.batch_parser import BatchResumeParser
+            if not ResumeParser.llm_enabled():
+                sys.exit("--llm needs LLM_PROVIDER and its API key configured")
+            batch_parser = BatchResumeParser.from_config(app.config)
+        run_import(args.path, args.workers, args.batch_size, checkpoint, app.config['BLOB_FOLDER'], batch_parser)
@@ -0,0 +1,17 @@
+import os
+
+bind = "0.0.0.0:5000"
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+
+# With RAG_PRELOAD_MODEL=true the app (and the embedding model) is imported in
+# the master once and the workers share the weights copy-on-write.
+preload_app = os.environ.get("RAG_PRELOAD_MODEL", "false").lower() == "true"
+
+
+def post_fork(server, worker):
+    # Run the first inference inside the worker, never in the master: torch
+    # thread pools started before fork() can deadlock in the children.
+    from app.services.rag.embeddings import Embedder
+    if Embedder.loaded():
+        Embedder.get_instance().warm_up()
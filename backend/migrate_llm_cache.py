@@ -0,0 +1,37 @@
+import sys
+import os
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+def migrate():
+    print("Running LLM Cache Migration...")
+    try:
+        Database.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key CHAR(64) PRIMARY KEY,
+                provider VARCHAR(50) NOT NULL,
+                model VARCHAR(100),
+                scope_key CHAR(64),
+                embedding BYTEA,
+                response TEXT NOT NULL,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                hits INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_hit_at TIMESTAMP
+            )
+        """)
+        Database.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_scope ON llm_cache(scope_key) WHERE scope_key IS NOT NULL")
+        Database.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)")
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        migrate()
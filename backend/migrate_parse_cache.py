@@ -0,0 +1,32 @@
+import sys
+import os
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+def migrate():
+    print("Running Parse Cache Migration...")
+    try:
+        Database.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                content_hash CHAR(64) NOT NULL,
+                version VARCHAR(32) NOT NULL,
+                extracted_text TEXT,
+                parsed_data TEXT,
+                hits INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_hit_at TIMESTAMP,
+                PRIMARY KEY (content_hash, version)
+            )
+        """)
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        migrate()
@@ -0,0 +1,41 @@
+import sys
+import os
+import hashlib
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def migrate():
+    print("Running Resume Content Hash Migration...")
+    try:
+        Database.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash CHAR(64)")
+        Database.execute("CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes (content_hash)")
+        # bulk_import_resumes.py matches imported (lowercased) emails on lower(email)
+        Database.execute("CREATE INDEX IF NOT EXISTS idx_candidates_email_lower ON candidates (lower(email))")
+
+        # Backfill hashes for existing uploads that are still on disk
+        rows = Database.query("SELECT id, file_path FROM resumes WHERE content_hash IS NULL", fetchall=True)
+        updated = 0
+        for resume_id, file_path in rows:
+            if file_path and os.path.exists(file_path):
+                Database.execute("UPDATE resumes SET content_hash = %s WHERE id = %s", (file_hash(file_path), resume_id))
+                updated += 1
+        print(f"Backfilled content hashes for {updated} of {len(rows)} resumes.")
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        migrate()
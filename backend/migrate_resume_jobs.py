@@ -0,0 +1,40 @@
+import sys
+import os
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+def migrate():
+    print("Running Resume Jobs Migration...")
+    try:
+        Database.execute("""
+            CREATE TABLE IF NOT EXISTS resume_jobs (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER REFERENCES users(id),
+                candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+                file_path VARCHAR(500) NOT NULL,
+                file_name VARCHAR(255) NOT NULL,
+                status VARCHAR(20) DEFAULT 'queued',
+                stage VARCHAR(20),
+                attempts INTEGER DEFAULT 0,
+                error TEXT,
+                result TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        """)
+        Database.execute(
+            "CREATE INDEX IF NOT EXISTS idx_resume_jobs_runnable ON resume_jobs (id) WHERE status IN ('queued', 'running')"
+        )
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        migrate()
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+STATEMENTS = [
+    ("pg_trgm extension", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    ("candidates.search_document", """
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+            to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(skills, '') || ' ' || coalesce(headline, ''))
+        ) STORED
+    """),
+    ("resumes.search_document", """
+        ALTER TABLE resumes ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+            to_tsvector('english', coalesce(parsed_text, ''))
+        ) STORED
+    """),
+    ("idx_candidates_search", "CREATE INDEX IF NOT EXISTS idx_candidates_search ON candidates USING GIN (search_document)"),
+    ("idx_candidates_name_trgm", "CREATE INDEX IF NOT EXISTS idx_candidates_name_trgm ON candidates USING GIN ((first_name || ' ' || last_name) gin_trgm_ops)"),
+    ("idx_candidates_created", "CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates (created_at DESC, id DESC)"),
+    ("idx_resumes_search", "CREATE INDEX IF NOT EXISTS idx_resumes_search ON resumes USING GIN (search_document)"),
+    ("idx_resumes_candidate", "CREATE INDEX IF NOT EXISTS idx_resumes_candidate ON resumes (candidate_id, uploaded_at DESC)"),
+]
+
+def migrate():
+    print("Running Search Index Migration...")
+    for name, sql in STATEMENTS:
+        try:
+            Database.execute(sql)
+            print(f"Applied {name}.")
+        except Exception as e:
+            print(f"Error applying {name}: {e}")
+    print("Migration completed!")
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        migrate()
@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+def migrate():
+    print("Running Vector Index Queue Migration...")
+    try:
+        Database.execute("""
+            CREATE TABLE IF NOT EXISTS vector_index_queue (
+                resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+                queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        migrate()
@@ -37,6 +37,7 @@ CREATE TABLE IF NOT EXISTS candidates (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS idx_candidates_email_lower ON candidates (lower(email)); -- bulk import matches on it
 
 -- Resumes
 CREATE TABLE IF NOT EXISTS resumes (
@@ -45,9 +46,65 @@ CREATE TABLE IF NOT EXISTS resumes (
     file_path VARCHAR(500) NOT NULL,
     file_name VARCHAR(255) NOT NULL,
     parsed_text TEXT,
+    content_hash CHAR(64), -- sha256 of the file, used to skip duplicate imports
     uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes (content_hash);
+
+-- Parse Cache: extracted text + parsed JSON per file content hash and parser version (see ParseCache)
+CREATE TABLE IF NOT EXISTS parse_cache (
+    content_hash CHAR(64) NOT NULL,
+    version VARCHAR(32) NOT NULL,
+    extracted_text TEXT,
+    parsed_data TEXT, -- JSON
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP,
+    PRIMARY KEY (content_hash, version)
+);
+
+-- LLM Response Cache (see LLMCache)
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    provider VARCHAR(50) NOT NULL,
+    model VARCHAR(100),
+    scope_key CHAR(64), -- semantic entries only
+    embedding BYTEA, -- float32 MiniLM vector of the compared text
+    response TEXT NOT NULL,
+    input_tokens INTEGER DEFAULT 0, -- estimated
+    output_tokens INTEGER DEFAULT 0,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_scope ON llm_cache(scope_key) WHERE scope_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at);
+
+-- Resume Processing Queue (see ResumePipeline)
+CREATE TABLE IF NOT EXISTS resume_jobs (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+    file_path VARCHAR(500) NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    status VARCHAR(20) DEFAULT 'queued', -- queued, running, done, failed
+    stage VARCHAR(20), -- extract, parse, merge, embed
+    attempts INTEGER DEFAULT 0,
+    error TEXT,
+    result TEXT, -- JSON
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_resume_jobs_runnable ON resume_jobs (id) WHERE status IN ('queued', 'running');
+
+-- Resumes waiting for the vector store; drained by the single indexer in resume_worker.py
+CREATE TABLE IF NOT EXISTS vector_index_queue (
+    resume_id INTEGER PRIMARY KEY REFERENCES resumes(id) ON DELETE CASCADE,
+    queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Job Postings
 CREATE TABLE IF NOT EXISTS job_postings (
     id SERIAL PRIMARY KEY,
@@ -153,6 +210,22 @@ CREATE TABLE IF NOT EXISTS activity_log (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Search (full-text + trigram), see CandidateSearchService
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(skills, '') || ' ' || coalesce(headline, ''))
+) STORED;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS search_document tsvector GENERATED ALWAYS AS (
+    to_tsvector('english', coalesce(parsed_text, ''))
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_candidates_search ON candidates USING GIN (search_document);
+CREATE INDEX IF NOT EXISTS idx_candidates_name_trgm ON candidates USING GIN ((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_resumes_search ON resumes USING GIN (search_document);
+CREATE INDEX IF NOT EXISTS idx_resumes_candidate ON resumes (candidate_id, uploaded_at DESC);
+
 -- Seed Initial Data
 INSERT INTO roles (name, permissions) VALUES ('admin', 'all'), ('recruiter', 'read,write'), ('candidate', 'read') ON CONFLICT DO NOTHING;
 INSERT INTO pipeline_stages (name, "order") VALUES 
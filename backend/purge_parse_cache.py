@@ -0,0 +1,24 @@
+import sys
+import os
+import argparse
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+
+def purge(max_age):
+    from app.services.parsing.parse_cache import ParseCache
+
+    removed = ParseCache.purge_stale(max_age)
+    print(f"Removed {removed} parse cache entries from other parser versions.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete parse cache entries of other parser versions that are no longer used.")
+    parser.add_argument('--max-age', type=int, help="Seconds since last use, defaults to PARSE_CACHE_STALE_TTL (0 = every other version)")
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        purge(args.max_age)
@@ -0,0 +1,32 @@
+import sys
+import os
+import argparse
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.services.rag.faiss_index import INDEX_TYPES
+
+
+def rebuild(index_type=None):
+    from app.services.rag.rag_service import RAGService
+
+    rag = RAGService.get_instance()
+    target = index_type or rag.index_type
+    print(f"Rebuilding vector index as '{target}' ({rag.index.ntotal} vectors)...")
+
+    import time
+    start = time.time()
+    built = rag.rebuild_index(target)
+    print(f"Built '{built}' index with {rag.index.ntotal} vectors in {time.time() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and rebuild the RAG vector index offline.")
+    parser.add_argument('--index-type', choices=INDEX_TYPES, help="Defaults to RAG_INDEX_TYPE from the app config")
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        rebuild(args.index_type)
@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import argparse
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+from app.db import Database
+
+
+def iter_resumes(page_size):
+    """Yields (resume_id, parsed_text, 'resume') using a server-side cursor so only one page is in memory."""
+    conn = Database.get_db()
+    cursor = conn.cursor(name='reindex_resumes')
+    cursor.itersize = page_size
+    try:
+        cursor.execute(
+            "SELECT id, parsed_text FROM resumes WHERE parsed_text IS NOT NULL AND parsed_text <> '' ORDER BY id"
+        )
+        for row in cursor:
+            yield row[0], row[1], 'resume'
+    finally:
+        cursor.close()
+        conn.rollback()
+
+
+def reindex(batch_size, page_size, reset):
+    from app.services.rag.rag_service import RAGService
+
+    rag = RAGService.get_instance()
+    if reset:
+        print("Clearing the vector store...")
+        rag.reset()
+
+    # Everything waiting for resume_worker.py's indexer is covered by this backfill
+    Database.execute("DELETE FROM vector_index_queue")
+
+    total = Database.query(
+        "SELECT COUNT(*) FROM resumes WHERE parsed_text IS NOT NULL AND parsed_text <> ''",
+        fetchone=True
+    )[0]
+    print(f"Indexing {total} resumes (batch size {batch_size}, page size {page_size})...")
+
+    start = time.time()
+    last_report = [start]
+
+    def report(done):
+        now = time.time()
+        if now - last_report[0] >= 5:
+            last_report[0] = now
+            print(f"  {done}/{total} resumes, {done / (now - start):.1f} docs/sec")
+
+    added = rag.add_documents(iter_resumes(page_size), batch_size=batch_size, progress=report)
+    rag.save_index()
+
+    elapsed = time.time() - start
+    print(f"Indexed {added} resumes in {elapsed:.1f}s ({added / elapsed if elapsed else 0:.1f} docs/sec).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the RAG vector store from resumes.parsed_text.")
+    parser.add_argument('--batch-size', type=int, help="Texts per encoder call, defaults to RAG_ENCODE_BATCH_SIZE")
+    parser.add_argument('--page-size', type=int, default=2000, help="Rows fetched per server-side cursor round-trip")
+    parser.add_argument('--reset', action='store_true', help="Empty the vector store before indexing")
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        reindex(args.batch_size or app.config['RAG_ENCODE_BATCH_SIZE'], args.page_size, args.reset)
@@ -0,0 +1,53 @@
+import sys
+import os
+import argparse
+import multiprocessing
+
+# Add the current directory to sys.path to make imports work
+sys.path.append(os.getcwd())
+
+
+def worker_main(poll_interval):
+    # Each process builds its own app (and DB pool); connections must not cross a fork
+    from app import create_app
+    from app.services.resume_pipeline import ResumePipeline
+
+    app = create_app()
+    with app.app_context():
+        ResumePipeline.run_worker(poll_interval=poll_interval)
+
+
+def indexer_main(poll_interval, processes):
+    # The only process that writes resume vectors; API processes reload them from disk before searching
+    from app import create_app
+    from app.services.resume_pipeline import ResumePipeline
+
+    app = create_app()
+    with app.app_context():
+        ResumePipeline.run_indexer(
+            poll_interval=poll_interval,
+            running=lambda: any(p.is_alive() for p in processes)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued resume uploads (extract, parse, merge, embed).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes to run")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when the queue is empty")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    # Not daemonic: workers start their own extraction sandbox and PDF pool processes
+    processes = [ctx.Process(target=worker_main, args=(args.poll_interval,)) for _ in range(args.workers)]
+    for p in processes:
+        p.start()
+    print(f"Started {len(processes)} resume workers; indexing their embeddings in this process.")
+
+    try:
+        indexer_main(args.poll_interval, processes)
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        print("Stopping resume workers...")
+        for p in processes:
+            p.terminate()
@@ -2,7 +2,7 @@
 
 import { useState } from "react"
 import { useRouter } from "next/navigation"
-import api from "@/lib/api"
+import api, { uploadResume } from "@/lib/api"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import { Label } from "@/components/ui/label"
@@ -35,9 +35,7 @@ export default function NewCandidatePage() {
             uploadData.append("file", file)
             // No candidate_id needed for parsing-only mode
 
-            const res = await api.post("/resume/upload", uploadData, {
-                headers: { "Content-Type": "multipart/form-data" }
-            })
+            const res = await uploadResume(uploadData)
 
             const parsed = res.data.parsed_data
             if (parsed) {
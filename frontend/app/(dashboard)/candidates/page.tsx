@@ -12,22 +12,28 @@ import { Mail, Phone, Linkedin, Calendar, Upload } from "lucide-react"
 export default function CandidatesPage() {
     const [candidates, setCandidates] = useState<any[]>([])
     const [loading, setLoading] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
     const [search, setSearch] = useState("")
     const [experience, setExperience] = useState("")
 
-    const fetchCandidates = async () => {
-        setLoading(true)
+    // The API returns one page at a time; the next page's cursor comes back in the X-Next-Cursor header
+    const fetchCandidates = async (cursor?: string) => {
+        const setBusy = cursor ? setLoadingMore : setLoading
+        setBusy(true)
         try {
             const params = new URLSearchParams()
             if (search) params.append("q", search)
             if (experience) params.append("experience", experience)
+            if (cursor) params.append("cursor", cursor)
 
-            const { data } = await api.get(`/candidates?${params.toString()}`)
-            setCandidates(data)
+            const { data, headers } = await api.get(`/candidates?${params.toString()}`)
+            setCandidates(cursor ? (prev) => [...prev, ...data] : data)
+            setNextCursor(headers["x-next-cursor"] || null)
         } catch (e) {
             console.error("Failed to fetch candidates")
         } finally {
-            setLoading(false)
+            setBusy(false)
         }
     }
 
@@ -79,7 +85,7 @@ export default function CandidatesPage() {
 
             <Card>
                 <CardHeader>
-                    <CardTitle>Results ({candidates.length})</CardTitle>
+                    <CardTitle>Results ({candidates.length}{nextCursor ? "+" : ""})</CardTitle>
                 </CardHeader>
                 <CardContent>
                     {loading ? (
@@ -149,6 +155,13 @@ export default function CandidatesPage() {
                             </TableBody>
                         </Table>
                     )}
+                    {!loading && nextCursor && (
+                        <div className="flex justify-center pt-4">
+                            <Button variant="outline" disabled={loadingMore} onClick={() => fetchCandidates(nextCursor)}>
+                                {loadingMore ? "Loading..." : "Load more"}
+                            </Button>
+                        </div>
+                    )}
                 </CardContent>
             </Card>
         </div>
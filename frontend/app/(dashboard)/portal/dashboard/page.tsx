@@ -1,7 +1,7 @@
 "use client"
 
 import { useEffect, useState } from "react"
-import api from "@/lib/api"
+import api, { uploadResume } from "@/lib/api"
 import { Card, CardHeader, CardTitle, CardContent } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import Link from "next/link"
@@ -94,9 +94,7 @@ export default function CandidateDashboard() {
             const uploadData = new FormData()
             uploadData.append("file", file)
 
-            const res = await api.post("/resume/upload", uploadData, {
-                headers: { "Content-Type": "multipart/form-data" }
-            })
+            const res = await uploadResume(uploadData)
 
             const parsed = res.data.parsed_data
             if (parsed) {
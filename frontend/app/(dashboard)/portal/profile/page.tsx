@@ -8,7 +8,7 @@ import { Textarea } from "@/components/ui/textarea"
 import { Card, CardHeader, CardTitle, CardContent, CardDescription } from "@/components/ui/card"
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar"
 import { useAuth } from "@/context/AuthContext"
-import api from "@/lib/api"
+import api, { uploadResume } from "@/lib/api"
 import { useToast } from "@/components/ui/use-toast"
 import { Loader2, Upload, Plus, Trash2, Briefcase, GraduationCap, Code, User, FileText } from "lucide-react"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
@@ -166,9 +166,7 @@ export default function CandidateProfilePage() {
             const uploadData = new FormData()
             uploadData.append("file", file)
 
-            const res = await api.post("/resume/upload", uploadData, {
-                headers: { "Content-Type": "multipart/form-data" }
-            })
+            const res = await uploadResume(uploadData)
 
             const parsed = res.data.parsed_data
             if (parsed) {
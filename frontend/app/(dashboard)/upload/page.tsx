@@ -2,7 +2,7 @@
 
 import { useState } from "react"
 import { useRouter } from "next/navigation"
-import api from "@/lib/api"
+import api, { uploadResume } from "@/lib/api"
 import { Card, CardHeader, CardTitle, CardContent } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
@@ -36,9 +36,7 @@ export default function UploadPage() {
         data.append("file", file)
 
         try {
-            const res = await api.post("/resume/upload", data, {
-                headers: { "Content-Type": "multipart/form-data" }
-            })
+            const res = await uploadResume(data)
 
             const parsed = res.data.parsed_data
             setParsedData(parsed)
@@ -44,4 +44,25 @@ api.interceptors.response.use(
     }
 );
 
+// Resume uploads are processed asynchronously: the upload returns 202 with a job id,
+// so poll the job until it finishes and resolve with the same shape as before ({ data: { parsed_data, ... } }).
+export async function uploadResume(formData: FormData, pollMs = 1000, timeoutMs = 120000) {
+    const { data: job } = await api.post("/resume/upload", formData, {
+        headers: { "Content-Type": "multipart/form-data" }
+    });
+
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        const { data: status } = await api.get(`/resume/jobs/${job.job_id}`);
+        if (status.status === "done") {
+            return { data: { ...status.result, job_id: job.job_id } };
+        }
+        if (status.status === "failed") {
+            throw new Error(status.error || "Resume processing failed");
+        }
+        await new Promise((resolve) => setTimeout(resolve, pollMs));
+    }
+    throw new Error("Timed out waiting for resume processing");
+}
+
 export default api;